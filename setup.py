@@ -10,12 +10,15 @@ AUTHOR = "Keurfon LUU"
 AUTHOR_EMAIL = "keurfon.luu@mines-paristech.fr"
 URL = "https://github.com/keurfonluu/stochopy"
 LICENSE = "MIT License"
+PYTHON_REQUIRES = ">=3.8"
 REQUIREMENTS = [
     "numpy",
     "matplotlib",
 ]
 CLASSIFIERS = [
     "Programming Language :: Python",
+    "Programming Language :: Python :: 3",
+    "Programming Language :: Python :: 3 :: Only",
     "Development Status :: 5 - Production/Stable",
     "License :: OSI Approved :: MIT License",
     "Natural Language :: English",
@@ -27,6 +30,7 @@ CLASSIFIERS = [
 ENTRY_POINTS = {
     "console_scripts": [
         "stochopy-viewer = stochopy.gui:main",
+        "stochopy-bench = stochopy.bench:main",
     ],
 }
  
@@ -40,6 +44,7 @@ if __name__ == "__main__":
         url = URL,
         license = LICENSE,
         install_requires = REQUIREMENTS,
+        python_requires = PYTHON_REQUIRES,
         classifiers = CLASSIFIERS,
         version = stochopy.__version__,
         packages = find_packages(),
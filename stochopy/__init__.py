@@ -11,7 +11,23 @@ License: MIT
 from .monte_carlo import MonteCarlo
 from .evolutionary_algorithm import Evolutionary
 from .benchmark_functions import BenchmarkFunction
+from .cache import EvaluationCache
+from .surrogate import RBFSurrogate, GaussianProcessSurrogate
+from .callbacks import Recorder
+from .backends import ProcessBackend, ThreadBackend
+from .fault import FaultPolicy
+from .snapshot import Snapshot
+from .stopping import StoppingCriterion, AnyOf, AllOf, EqualFunValues, TolFun, Stagnation, Target
+from .task_farm import TaskFarm
+from .context import WorkerContext
+from .distributed import TCPBackend, run_worker
+from .scheduling import CostModel
 from .gui import StochOGUI
 
-__all__ = [ "MonteCarlo", "Evolutionary", "BenchmarkFunction", "StochOGUI" ]
+__all__ = [ "MonteCarlo", "Evolutionary", "BenchmarkFunction", "EvaluationCache",
+            "RBFSurrogate", "GaussianProcessSurrogate", "Recorder", "ProcessBackend",
+            "ThreadBackend", "FaultPolicy", "Snapshot", "StoppingCriterion", "AnyOf",
+            "AllOf", "EqualFunValues", "TolFun", "Stagnation", "Target", "TaskFarm",
+            "WorkerContext", "TCPBackend", "run_worker",
+            "CostModel", "StochOGUI" ]
 __version__ = "1.7.3"
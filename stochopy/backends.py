@@ -0,0 +1,479 @@
+# -*- coding: utf-8 -*-
+
+"""
+Evaluation backends used to evaluate a batch of models in parallel on a
+single machine.
+
+Author: Keurfon Luu <keurfon.luu@mines-paristech.fr>
+License: MIT
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+import numpy as np
+import asyncio
+import multiprocessing
+import os
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from multiprocessing import shared_memory
+from multiprocessing.connection import wait
+from time import perf_counter
+from .scheduling import get_cost_model, longest_first
+
+__all__ = [ "ProcessBackend", "ThreadBackend", "AsyncBackend", "get_backend" ]
+
+
+class ProcessBackend:
+    """
+    Process pool backend with shared-memory buffers.
+    
+    Models and objective function values are stored in shared-memory blocks
+    reused across generations. Workers read their models and write their
+    objective function values in place, and only the indices of the models
+    are sent through pipes. The inter-process communication per batch is
+    thus proportional to the number of models, not to their dimension.
+    
+    Workers are forked so the objective function does not need to be
+    picklable. On platforms without fork, it must be picklable.
+    
+    Parameters
+    ----------
+    n_workers : int or None, optional, default None
+        Number of worker processes. If None, the number of CPUs is used.
+    chunksize : int or None, optional, default None
+        Number of models sent to a worker at once. Workers get a new chunk as
+        soon as they are done, which balances the load when the cost of the
+        objective function varies. If None, models are split evenly between
+        workers.
+    cost : {None, 'online'}, callable or CostModel, optional, default None
+        Cost of the objective function. If not None, models are dispatched
+        longest first (and packed between workers if chunksize is None).
+        - 'online', costs learnt from past evaluation times.
+        - callable, function returning the estimated cost of a model.
+    """
+    
+    def __init__(self, n_workers = None, chunksize = None, cost = None):
+        if n_workers is not None and (not isinstance(n_workers, int) or n_workers < 1):
+            raise ValueError("n_workers must be None or a positive integer, got %s" % n_workers)
+        else:
+            self._n_workers = n_workers if n_workers is not None else os.cpu_count()
+        if chunksize is not None and (not isinstance(chunksize, int) or chunksize < 1):
+            raise ValueError("chunksize must be None or a positive integer, got %s" % chunksize)
+        else:
+            self._chunksize = chunksize
+        self._cost = get_cost_model(cost)
+        self._func = None
+        self._workers = []
+        self._conns = []
+        self._shm = []
+        self._capacity = 0
+        self._n_dim = 0
+        self._ipc_bytes = 0
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *args):
+        self.close()
+    
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+    
+    def start(self, func):
+        """
+        Start the workers if they are not running yet.
+        
+        Parameters
+        ----------
+        func : callable
+            Objective function.
+        """
+        if self._func is not func:
+            self.close()
+            self._func = func
+    
+    def evaluate(self, models):
+        """
+        Evaluate a batch of models.
+        
+        Parameters
+        ----------
+        models : ndarray of shape (n_models, n_dim)
+            Models to evaluate.
+        
+        Returns
+        -------
+        fit : ndarray of shape (n_models)
+            Objective function values.
+        """
+        n, n_dim = models.shape
+        if n == 0:
+            return np.zeros(0)
+        if not self._workers or n > self._capacity or n_dim != self._n_dim:
+            self._spawn(max(n, self._capacity if n_dim == self._n_dim else 0), n_dim)
+        self._models[:n] = models
+        
+        # Dispatch chunks of indices to idle workers
+        if self._cost is not None:
+            chunks = longest_first(self._cost(models), self._n_workers, self._chunksize)
+        else:
+            chunksize = self._chunksize if self._chunksize is not None \
+                        else int(np.ceil(n / self._n_workers))
+            chunks = [ np.arange(i, min(i + chunksize, n), dtype = np.int64)
+                       for i in range(0, n, chunksize) ]
+        idle = list(self._conns)
+        busy = []
+        error = None
+        while chunks or busy:
+            while chunks and idle:
+                conn = idle.pop()
+                self._send(conn, b"E" + chunks.pop(0).tobytes())
+                busy.append(conn)
+            for conn in wait(busy):
+                msg = self._recv(conn)
+                busy.remove(conn)
+                idle.append(conn)
+                if msg[:1] == b"X" and error is None:
+                    error = msg[1:].decode()
+                    chunks = []
+        if error is not None:
+            raise RuntimeError("objective function failed in worker process:\n%s" % error)
+        if self._cost is not None:
+            self._cost.update(models, np.array(self._times[:n]))
+        return np.array(self._fit[:n])
+    
+    def close(self):
+        """
+        Stop the workers and release the shared-memory blocks.
+        """
+        for conn in self._conns:
+            try:
+                conn.send_bytes(b"Q")
+            except (OSError, ValueError):
+                pass
+        for worker in self._workers:
+            worker.join(timeout = 5.)
+            if worker.is_alive():
+                worker.terminate()
+        for conn in self._conns:
+            conn.close()
+        self._workers, self._conns = [], []
+        self._models = self._fit = self._times = None
+        for shm in self._shm:
+            shm.close()
+            shm.unlink()
+        self._shm = []
+        self._capacity = 0
+    
+    def _spawn(self, capacity, n_dim):
+        self.close()
+        self._capacity, self._n_dim = capacity, n_dim
+        self._shm = [ shared_memory.SharedMemory(create = True, size = max(1, 8 * capacity * n_dim)),
+                      shared_memory.SharedMemory(create = True, size = max(1, 8 * capacity)),
+                      shared_memory.SharedMemory(create = True, size = max(1, 8 * capacity)) ]
+        self._models = np.ndarray((capacity, n_dim), dtype = np.float64, buffer = self._shm[0].buf)
+        self._fit = np.ndarray(capacity, dtype = np.float64, buffer = self._shm[1].buf)
+        self._times = np.ndarray(capacity, dtype = np.float64, buffer = self._shm[2].buf)
+        if "fork" in multiprocessing.get_all_start_methods():
+            ctx = multiprocessing.get_context("fork")
+        else:
+            ctx = multiprocessing.get_context()
+        for i in range(self._n_workers):
+            parent_conn, child_conn = ctx.Pipe()
+            worker = ctx.Process(target = _process_worker,
+                                 args = (child_conn, self._func, self._shm[0].name,
+                                         self._shm[1].name, self._shm[2].name, capacity, n_dim))
+            worker.daemon = True
+            worker.start()
+            child_conn.close()
+            self._workers.append(worker)
+            self._conns.append(parent_conn)
+    
+    def _send(self, conn, msg):
+        conn.send_bytes(msg)
+        self._ipc_bytes += len(msg)
+    
+    def _recv(self, conn):
+        msg = conn.recv_bytes()
+        self._ipc_bytes += len(msg)
+        return msg
+    
+    @property
+    def n_workers(self):
+        """
+        int
+        Number of worker processes.
+        """
+        return self._n_workers
+    
+    @property
+    def ipc_bytes(self):
+        """
+        int
+        Number of bytes sent through pipes since the backend was created.
+        """
+        return self._ipc_bytes
+
+
+class ThreadBackend:
+    """
+    Thread pool backend.
+    
+    Suited to objective functions that release the GIL (NumPy, SciPy or
+    compiled extensions): models are neither pickled nor copied, and the
+    pool is started once and reused across generations.
+    
+    Parameters
+    ----------
+    n_workers : int or None, optional, default None
+        Number of threads. If None, the number of CPUs is used.
+    chunksize : int or None, optional, default None
+        Number of models evaluated by a thread in a single task. Smaller
+        chunks balance the load when the cost of the objective function
+        varies, larger chunks reduce the scheduling overhead. If None, models
+        are split evenly between threads.
+    cost : {None, 'online'}, callable or CostModel, optional, default None
+        Cost of the objective function. If not None, models are dispatched
+        longest first (and packed between threads if chunksize is None).
+        - 'online', costs learnt from past evaluation times.
+        - callable, function returning the estimated cost of a model.
+    """
+    
+    def __init__(self, n_workers = None, chunksize = None, cost = None):
+        if n_workers is not None and (not isinstance(n_workers, int) or n_workers < 1):
+            raise ValueError("n_workers must be None or a positive integer, got %s" % n_workers)
+        else:
+            self._n_workers = n_workers if n_workers is not None else os.cpu_count()
+        if chunksize is not None and (not isinstance(chunksize, int) or chunksize < 1):
+            raise ValueError("chunksize must be None or a positive integer, got %s" % chunksize)
+        else:
+            self._chunksize = chunksize
+        self._cost = get_cost_model(cost)
+        self._func = None
+        self._executor = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *args):
+        self.close()
+    
+    def start(self, func):
+        """
+        Start the thread pool if it is not running yet.
+        
+        Parameters
+        ----------
+        func : callable
+            Objective function.
+        """
+        self._func = func
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers = self._n_workers)
+    
+    def evaluate(self, models):
+        """
+        Evaluate a batch of models.
+        
+        Parameters
+        ----------
+        models : ndarray of shape (n_models, n_dim)
+            Models to evaluate.
+        
+        Returns
+        -------
+        fit : ndarray of shape (n_models)
+            Objective function values.
+        """
+        n = models.shape[0]
+        fit = np.zeros(n)
+        if n == 0:
+            return fit
+        if self._executor is None:
+            self.start(self._func)
+        if self._cost is not None:
+            chunks = longest_first(self._cost(models), self._n_workers, self._chunksize)
+            times = np.zeros(n)
+        else:
+            chunksize = self._chunksize if self._chunksize is not None \
+                        else int(np.ceil(n / self._n_workers))
+            chunks = [ range(i, min(i + chunksize, n)) for i in range(0, n, chunksize) ]
+            times = None
+        futures = [ self._executor.submit(self._evaluate_chunk, models, fit, times, idx)
+                    for idx in chunks ]
+        for future in futures:
+            future.result()
+        if self._cost is not None:
+            self._cost.update(models, times)
+        return fit
+    
+    def close(self):
+        """
+        Shut the thread pool down.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait = True)
+            self._executor = None
+    
+    def _evaluate_chunk(self, models, fit, times, idx):
+        for i in idx:
+            starttime = perf_counter()
+            fit[i] = self._func(models[i])
+            if times is not None:
+                times[i] = perf_counter() - starttime
+    
+    @property
+    def n_workers(self):
+        """
+        int
+        Number of threads.
+        """
+        return self._n_workers
+
+
+class AsyncBackend:
+    """
+    Asyncio backend for coroutine objective functions.
+    
+    The solver runs in a separate thread and every batch of models is
+    evaluated concurrently on the event loop the backend was created from.
+    The number of pending evaluations is capped by a semaphore, so that
+    hundreds of I/O-bound evaluations do not require as many threads or
+    processes.
+    
+    Parameters
+    ----------
+    max_concurrency : int or None, optional, default None
+        Maximum number of concurrent evaluations. If None, all the models of
+        a batch are evaluated concurrently.
+    loop : event loop or None, optional, default None
+        Event loop on which coroutines are scheduled. If None, the running
+        event loop is used.
+    """
+    
+    def __init__(self, max_concurrency = None, loop = None):
+        if max_concurrency is not None and (not isinstance(max_concurrency, int) or max_concurrency < 1):
+            raise ValueError("max_concurrency must be None or a positive integer, got %s" % max_concurrency)
+        else:
+            self._max_concurrency = max_concurrency
+        self._loop = loop if loop is not None else asyncio.get_running_loop()
+        self._func = None
+    
+    def start(self, func):
+        """
+        Set the objective function.
+        
+        Parameters
+        ----------
+        func : callable
+            Objective function returning an awaitable.
+        """
+        self._func = func
+    
+    def evaluate(self, models):
+        """
+        Evaluate a batch of models. Must not be called from the thread running
+        the event loop.
+        
+        Parameters
+        ----------
+        models : ndarray of shape (n_models, n_dim)
+            Models to evaluate.
+        
+        Returns
+        -------
+        fit : ndarray of shape (n_models)
+            Objective function values.
+        """
+        future = asyncio.run_coroutine_threadsafe(self._gather(models), self._loop)
+        return np.array(future.result(), dtype = np.float64)
+    
+    def close(self):
+        """
+        Nothing to release.
+        """
+        pass
+    
+    async def _gather(self, models):
+        if self._max_concurrency is None:
+            return await asyncio.gather(*[ self._func(x) for x in models ])
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+        async def bounded(x):
+            async with semaphore:
+                return await self._func(x)
+        return await asyncio.gather(*[ bounded(x) for x in models ])
+    
+    @property
+    def max_concurrency(self):
+        """
+        int or None
+        Maximum number of concurrent evaluations.
+        """
+        return self._max_concurrency
+
+
+def _process_worker(conn, func, name_models, name_fit, name_times, capacity, n_dim):
+    shm_models = shared_memory.SharedMemory(name = name_models)
+    shm_fit = shared_memory.SharedMemory(name = name_fit)
+    shm_times = shared_memory.SharedMemory(name = name_times)
+    models = np.ndarray((capacity, n_dim), dtype = np.float64, buffer = shm_models.buf)
+    fit = np.ndarray(capacity, dtype = np.float64, buffer = shm_fit.buf)
+    times = np.ndarray(capacity, dtype = np.float64, buffer = shm_times.buf)
+    try:
+        while True:
+            try:
+                msg = conn.recv_bytes()
+            except EOFError:
+                break
+            if msg[:1] == b"Q":
+                break
+            idx = np.frombuffer(msg[1:], dtype = np.int64)
+            try:
+                for i in idx:
+                    starttime = perf_counter()
+                    fit[i] = func(models[i])
+                    times[i] = perf_counter() - starttime
+            except Exception:
+                conn.send_bytes(b"X" + traceback.format_exc().encode())
+            else:
+                conn.send_bytes(b"D")
+    finally:
+        del models, fit, times
+        shm_models.close()
+        shm_fit.close()
+        shm_times.close()
+
+
+def get_backend(backend):
+    """
+    Return a backend instance given its name or instance.
+    
+    Parameters
+    ----------
+    backend : {None, 'processes', 'threads'} or backend object
+        Evaluation backend.
+    
+    Returns
+    -------
+    backend : backend object or None
+        Backend instance.
+    owned : bool
+        True if the backend has been created from its name and should be
+        closed by its user.
+    """
+    if backend is None:
+        return None, False
+    elif isinstance(backend, str):
+        if backend == "processes":
+            return ProcessBackend(), True
+        elif backend == "threads":
+            return ThreadBackend(), True
+        else:
+            raise ValueError("backend must be either None, 'processes', 'threads' or a backend object, got %s" % backend)
+    elif hasattr(backend, "evaluate") and hasattr(backend, "start"):
+        return backend, False
+    else:
+        raise ValueError("backend must be either None, 'processes', 'threads' or a backend object")
@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+
+"""
+Performance benchmark suite of StochOPy solvers and samplers. Run it from
+the command line with 'python -m stochopy.bench run' or 'stochopy-bench run',
+compare two result files with 'stochopy-bench compare', run the anytime
+(ERT/ECDF) benchmark with 'stochopy-bench bbob', compare the evaluation
+backends with 'stochopy-bench scaling', measure the memory allocated by the
+solver loops with 'stochopy-bench allocations', compare the overhead of
+the CMA-ES variants with 'stochopy-bench covariance', and compare the
+schedules of the MPI task farm with 'mpiexec -n 5 stochopy-bench farm'.
+
+Author: Keurfon Luu <keurfon.luu@mines-paristech.fr>
+License: MIT
+"""
+
+from .suite import run_suite, compare, save, load, main
+from .bbob import run_bbob, ert, ecdf, summarize
+from .scaling import run_scaling
+from .allocations import run_allocations
+from .covariance import run_covariance
+from .farm import run_farm
+
+__all__ = [ "run_suite", "compare", "save", "load", "main",
+            "run_bbob", "ert", "ecdf", "summarize", "run_scaling",
+            "run_allocations", "run_covariance", "run_farm" ]
@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+
+"""
+Memory traffic benchmark of the solver loops. The transient memory allocated
+by the update step of each generation (sampling, constraint, selection and
+adaptation, objective function excluded) and the solver overhead per
+generation are measured as the number of dimensions grows.
+
+Author: Keurfon Luu <keurfon.luu@mines-paristech.fr>
+License: MIT
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+import numpy as np
+import tracemalloc
+from ..evolutionary_algorithm import Evolutionary
+
+__all__ = [ "run_allocations" ]
+
+
+SOLVERS = [ "de", "cpso", "cmaes", "cholesky-cmaes", "vdcma", "lmmaes" ]
+N_DIMS = [ 10, 100, 1000 ]
+
+
+class _TracedSphere:
+    """
+    Sphere function that records, at the first evaluation of each
+    generation, the peak traced memory allocated since the first evaluation
+    of the previous generation. Tracing is restarted at each generation so
+    that the peak starts from zero (tracemalloc.reset_peak requires Python
+    3.9).
+    """
+    
+    def __init__(self, popsize):
+        self._popsize = popsize
+        self._n_eval = 0
+        self.transient = []
+    
+    def __call__(self, x):
+        if self._n_eval % self._popsize == 0:
+            if self._n_eval > 0:
+                self.transient.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+            tracemalloc.start()
+        self._n_eval += 1
+        return np.dot(x, x)
+
+
+def _solver(solver, func, n_dim, popsize, max_iter, random_state):
+    return Evolutionary(func, lower = np.full(n_dim, -5.12), upper = np.full(n_dim, 5.12),
+                        popsize = popsize, max_iter = max_iter, eps1 = 0., eps2 = -np.inf,
+                        constrain = True, random_state = random_state)
+
+
+def run_allocations(solvers = SOLVERS, n_dims = N_DIMS, popsize = 20, max_iter = 50,
+                    random_state = 42, verbose = False):
+    """
+    Measure the transient memory and the overhead of a generation.
+    
+    Parameters
+    ----------
+    solvers : list, optional
+        Solvers among 'de', 'cpso', 'cmaes', 'cholesky-cmaes', 'vdcma' and
+        'lmmaes'.
+    n_dims : list, optional
+        Numbers of dimensions.
+    popsize : int, optional, default 20
+        Population size.
+    max_iter : int, optional, default 50
+        Number of generations.
+    random_state : int, optional, default 42
+        Seed of the solvers.
+    verbose : bool, optional, default False
+        Print the records.
+    
+    Returns
+    -------
+    results : list of dict
+        One record per solver and number of dimensions with keys 'solver',
+        'n_dim', 'transient_bytes' (median peak memory allocated by a
+        generation, traced by tracemalloc) and
+        'time_per_gen' (mean solver overhead of a generation in seconds,
+        measured without tracing).
+    """
+    for solver in solvers:
+        if solver not in SOLVERS:
+            raise ValueError("solvers must be in %s, got %s" % (SOLVERS, solver))
+    if not isinstance(popsize, int) or popsize < 5:
+        raise ValueError("popsize must be an integer greater than 4, got %s" % popsize)
+    if not isinstance(max_iter, int) or max_iter < 3:
+        raise ValueError("max_iter must be an integer greater than 2, got %s" % max_iter)
+    
+    results = []
+    for solver in solvers:
+        for n_dim in n_dims:
+            # Transient memory, the first generation allocates the work arrays
+            func = _TracedSphere(popsize)
+            ea = _solver(solver, func, n_dim, popsize, max_iter, random_state)
+            tracemalloc.start()
+            try:
+                ea.optimize(solver = solver)
+            finally:
+                tracemalloc.stop()
+            transient = int(np.median(func.transient[1:]))
+            
+            # Overhead per generation
+            ea = _solver(solver, lambda x: np.dot(x, x), n_dim, popsize, max_iter, random_state)
+            ea.optimize(solver = solver)
+            time_per_gen = float(np.mean(ea.time_serial))
+            
+            record = dict(solver = solver, n_dim = n_dim, transient_bytes = transient,
+                          time_per_gen = time_per_gen)
+            if verbose:
+                print(_format_record(record))
+            results.append(record)
+    return results
+
+
+def _format_record(record):
+    return "%-14s %6d dims %12.1f KiB/gen %10.1f us/gen" \
+           % (record["solver"], record["n_dim"], record["transient_bytes"] / 2.**10,
+              1e6 * record["time_per_gen"])
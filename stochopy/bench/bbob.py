@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+
+"""
+Anytime performance benchmark of StochOPy solvers in the style of COCO/BBOB.
+Each solver is run on several instances of the benchmark functions and the
+number of function evaluations required to reach a set of target precisions
+is recorded. Runs are summarized by the Expected Running Time (ERT) and the
+Empirical Cumulative Distribution Function (ECDF) of the running times.
+
+Author: Keurfon Luu <keurfon.luu@mines-paristech.fr>
+License: MIT
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+import numpy as np
+import os
+from multiprocessing import Pool
+from ..benchmark_functions import BenchmarkFunction
+from ..evolutionary_algorithm import Evolutionary
+
+__all__ = [ "run_bbob", "ert", "ecdf", "summarize" ]
+
+
+SOLVERS = [ "de", "pso", "cpso", "cmaes", "cholesky-cmaes", "vdcma", "lmmaes" ]
+FUNCTIONS = [ "ackley", "bent-cigar", "discus", "ellipsoid", "griewank", "quartic",
+              "rastrigin", "rosenbrock", "sphere", "styblinski-tang" ]
+N_DIMS = [ 2, 5, 10, 20 ]
+TARGETS = np.logspace(2, -8, 11)
+
+
+class _TargetTracker:
+    """
+    Objective function wrapper that records the number of evaluations at
+    which each target precision is first reached.
+    """
+    
+    def __init__(self, func, fmin, targets):
+        self._func = func
+        self._fmin = fmin
+        self._targets = np.sort(targets)[::-1]
+        self._next = 0
+        self.hits = np.zeros(len(targets), dtype = int)
+        self.n_eval = 0
+        self.fbest = np.inf
+    
+    def __call__(self, x):
+        f = self._func(x)
+        self.n_eval += 1
+        if f < self.fbest:
+            self.fbest = f
+            while self._next < len(self._targets) and f - self._fmin <= self._targets[self._next]:
+                self.hits[self._next] = self.n_eval
+                self._next += 1
+        return f
+
+
+def _default_popsize(n_dim):
+    return 4 + int(np.floor(3. * np.log(n_dim)))
+
+
+def _run_instance(task):
+    solver, function, n_dim, popsize, instance, budget, targets, restart, transform, random_state = task
+    bf = BenchmarkFunction(function, n_dim = n_dim, random_state = random_state + instance, **transform)
+    func = _TargetTracker(bf.get()["func"], bf.fmin, targets)
+    popsize = popsize if popsize is not None else _default_popsize(n_dim)
+    max_eval = int(budget * n_dim)
+    ea = Evolutionary(func, lower = bf.get()["lower"], upper = bf.get()["upper"],
+                      popsize = popsize, max_iter = max_eval // popsize + 1,
+                      eps2 = bf.fmin + np.min(targets), max_eval = max_eval,
+                      random_state = random_state + instance)
+    if solver in [ "cmaes", "cholesky-cmaes", "vdcma", "lmmaes" ]:
+        ea.optimize(solver = solver, restart = restart)
+    else:
+        ea.optimize(solver = solver)
+    return dict(solver = solver, function = function, n_dim = n_dim, popsize = popsize,
+                instance = instance, n_eval = func.n_eval, fbest = float(func.fbest - bf.fmin),
+                hits = [ int(h) if h > 0 else None for h in func.hits ])
+
+
+def run_bbob(solvers = SOLVERS, functions = FUNCTIONS, n_dims = N_DIMS, popsizes = [ None ],
+             n_instances = 15, budget = 1000, targets = TARGETS, restart = None,
+             shift = False, rotate = False, n_jobs = None, random_state = 0):
+    """
+    Run every solver on every instance of the benchmark functions.
+    
+    Parameters
+    ----------
+    solvers : list, optional
+        Evolutionary solvers to benchmark.
+    functions : list, optional
+        Names of benchmark functions (see BenchmarkFunction).
+    n_dims : list, optional
+        Search space dimensions.
+    popsizes : list, optional, default [ None ]
+        Population sizes. None stands for 4 + floor(3 ln(n_dim)).
+    n_instances : int, optional, default 15
+        Number of independent runs (random seeds) per problem.
+    budget : int, optional, default 1000
+        Maximum number of function evaluations per run divided by n_dim.
+    targets : ndarray, optional
+        Target precisions (difference to the global minimum).
+    restart : {None, 'ipop', 'bipop'}, optional, default None
+        Restart strategy of CMA-ES and VD-CMA.
+    shift : bool, optional, default False
+        Randomly shift the global minimizer of each instance.
+    rotate : bool, optional, default False
+        Randomly rotate each instance.
+    n_jobs : int or None, optional, default None
+        Number of worker processes. If None, the number of CPUs is used.
+    random_state : int, optional, default 0
+        Seed of the first instance. Instance i uses random_state + i for the
+        solver and for the shift and rotation of the function.
+    
+    Returns
+    -------
+    runs : list of dict
+        One record per run with keys 'solver', 'function', 'n_dim',
+        'popsize', 'instance', 'n_eval', 'fbest' (final precision) and
+        'hits' (number of evaluations to reach each target, in decreasing
+        order of precision threshold, None if not reached).
+    """
+    if not isinstance(n_instances, int) or n_instances < 1:
+        raise ValueError("n_instances must be a positive integer, got %s" % n_instances)
+    if not isinstance(budget, (int, float)) or budget <= 0:
+        raise ValueError("budget must be positive, got %s" % budget)
+    if n_jobs is not None and (not isinstance(n_jobs, int) or n_jobs < 1):
+        raise ValueError("n_jobs must be None or a positive integer, got %s" % n_jobs)
+    targets = np.sort(np.asarray(targets, dtype = float))[::-1]
+    transform = dict(shift = shift, rotate = rotate)
+    tasks = [ (solver, function, n_dim, popsize, instance, budget, targets, restart, transform, random_state)
+              for solver in solvers for function in functions for n_dim in n_dims
+              for popsize in popsizes for instance in range(n_instances) ]
+    
+    n_jobs = n_jobs if n_jobs is not None else os.cpu_count()
+    if n_jobs == 1:
+        runs = [ _run_instance(task) for task in tasks ]
+    else:
+        with Pool(n_jobs) as pool:
+            runs = pool.map(_run_instance, tasks, chunksize = 1)
+    return runs
+
+
+def ert(runs):
+    """
+    Expected Running Time to reach each target.
+    
+    The ERT is the total number of function evaluations performed by all
+    the runs (up to the target for successful runs) divided by the number of
+    successful runs.
+    
+    Parameters
+    ----------
+    runs : list of dict
+        Runs of a single problem as returned by run_bbob.
+    
+    Returns
+    -------
+    ert : ndarray of shape (n_targets)
+        Expected Running Time (inf if no run reached the target).
+    success_rate : ndarray of shape (n_targets)
+        Fraction of runs that reached the target.
+    """
+    hits = np.array([ [ h if h is not None else 0 for h in run["hits"] ] for run in runs ])
+    n_eval = np.array([ run["n_eval"] for run in runs ])
+    success = hits > 0
+    n_succ = success.sum(axis = 0)
+    total = np.where(success, hits, n_eval[:,None]).sum(axis = 0)
+    with np.errstate(divide = "ignore"):
+        return np.where(n_succ > 0, total / np.maximum(n_succ, 1), np.inf), n_succ / len(runs)
+
+
+def ecdf(runs, budgets):
+    """
+    Empirical Cumulative Distribution Function of the running times.
+    
+    Parameters
+    ----------
+    runs : list of dict
+        Runs as returned by run_bbob, possibly over several problems.
+    budgets : ndarray
+        Numbers of function evaluations divided by n_dim at which the ECDF
+        is computed.
+    
+    Returns
+    -------
+    ecdf : ndarray of shape (len(budgets))
+        Fraction of (run, target) pairs solved within each budget.
+    """
+    budgets = np.asarray(budgets, dtype = float)
+    times = np.array([ np.array([ h if h is not None else np.inf for h in run["hits"] ]) / run["n_dim"]
+                       for run in runs ]).ravel()
+    return np.mean(times[:,None] <= budgets[None,:], axis = 0)
+
+
+def summarize(runs, targets = TARGETS, n_budgets = 51):
+    """
+    Summarize runs by problem (ERT) and by solver and dimension (ECDF
+    aggregated over functions).
+    
+    Parameters
+    ----------
+    runs : list of dict
+        Runs as returned by run_bbob.
+    targets : ndarray, optional
+        Target precisions used by run_bbob.
+    n_budgets : int, optional, default 51
+        Number of budgets (log-spaced) at which ECDF are computed.
+    
+    Returns
+    -------
+    summary : dict
+        Dictionary with keys 'targets', 'ert' (one record per solver,
+        function, n_dim and popsize) and 'ecdf' (one record per solver,
+        n_dim and popsize with keys 'budgets' and 'fractions').
+    """
+    targets = np.sort(np.asarray(targets, dtype = float))[::-1]
+    problems, groups = {}, {}
+    for run in runs:
+        problems.setdefault((run["solver"], run["function"], run["n_dim"], run["popsize"]), []).append(run)
+        groups.setdefault((run["solver"], run["n_dim"], run["popsize"]), []).append(run)
+    
+    max_budget = max(run["n_eval"] / run["n_dim"] for run in runs)
+    budgets = np.logspace(0, np.log10(max(max_budget, 1.)), n_budgets)
+    ert_records, ecdf_records = [], []
+    for (solver, function, n_dim, popsize), problem_runs in sorted(problems.items()):
+        values, success_rate = ert(problem_runs)
+        ert_records.append(dict(solver = solver, function = function, n_dim = n_dim, popsize = popsize,
+                                ert = [ float(v) if np.isfinite(v) else None for v in values ],
+                                success_rate = success_rate.tolist()))
+    for (solver, n_dim, popsize), group_runs in sorted(groups.items()):
+        ecdf_records.append(dict(solver = solver, n_dim = n_dim, popsize = popsize,
+                                 budgets = budgets.tolist(),
+                                 fractions = ecdf(group_runs, budgets).tolist()))
+    return dict(targets = targets.tolist(), ert = ert_records, ecdf = ecdf_records)
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+
+"""
+Scaling benchmark of the covariance matrix adaptation of the CMA-ES
+variants. The overhead of a generation and the time spent adapting the
+search distribution (covariance update and eigendecomposition) are measured
+as the number of dimensions grows.
+
+Author: Keurfon Luu <keurfon.luu@mines-paristech.fr>
+License: MIT
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+import numpy as np
+from ..evolutionary_algorithm import Evolutionary
+
+__all__ = [ "run_covariance" ]
+
+
+SOLVERS = [ "cmaes", "cholesky-cmaes", "vdcma", "lmmaes" ]
+N_DIMS = [ 10, 100, 500, 1000 ]
+
+
+def run_covariance(solvers = SOLVERS, n_dims = N_DIMS, popsize = None, max_iter = 30,
+                   random_state = 42, verbose = False):
+    """
+    Measure the overhead of a generation of CMA-ES variants.
+    
+    Parameters
+    ----------
+    solvers : list, optional
+        Solvers among 'cmaes', 'cholesky-cmaes', 'vdcma' and 'lmmaes'.
+    n_dims : list, optional
+        Numbers of dimensions.
+    popsize : int or None, optional, default None
+        Population size. If None, 4 + floor(3 ln(n_dim)).
+    max_iter : int, optional, default 30
+        Number of generations.
+    random_state : int, optional, default 42
+        Seed of the solvers.
+    verbose : bool, optional, default False
+        Print the records.
+    
+    Returns
+    -------
+    results : list of dict
+        One record per solver and number of dimensions with keys 'solver',
+        'n_dim', 'popsize', 'time_per_gen' (mean solver overhead of a
+        generation in seconds), 'adaptation_per_gen' (mean time of a
+        generation spent in the covariance update and eigendecomposition in
+        seconds) and 'speedup' (ratio of the overhead of 'cmaes' to the
+        overhead of the solver, None if 'cmaes' is not benchmarked).
+    """
+    for solver in solvers:
+        if solver not in SOLVERS:
+            raise ValueError("solvers must be in %s, got %s" % (SOLVERS, solver))
+    if popsize is not None and (not isinstance(popsize, int) or popsize < 4):
+        raise ValueError("popsize must be None or an integer greater than 3, got %s" % popsize)
+    if not isinstance(max_iter, int) or max_iter < 2:
+        raise ValueError("max_iter must be an integer greater than 1, got %s" % max_iter)
+    
+    results = []
+    for n_dim in n_dims:
+        records = []
+        for solver in solvers:
+            n_pop = popsize if popsize is not None else 4 + int(3 * np.log(n_dim))
+            ea = Evolutionary(lambda x: np.dot(x, x), lower = np.full(n_dim, -5.12),
+                              upper = np.full(n_dim, 5.12), popsize = n_pop,
+                              max_iter = max_iter, eps1 = 0., eps2 = -np.inf,
+                              profile = True, random_state = random_state)
+            ea.optimize(solver = solver)
+            profile = ea.profile
+            records.append(dict(solver = solver, n_dim = n_dim, popsize = n_pop,
+                                time_per_gen = float(np.mean(ea.time_serial)),
+                                adaptation_per_gen = float(np.mean(profile["covariance"]
+                                                                   + profile["eigendecomposition"]))))
+        
+        # Speedup relative to CMA-ES
+        reference = [ r["time_per_gen"] for r in records if r["solver"] == "cmaes" ]
+        for record in records:
+            record["speedup"] = reference[0] / record["time_per_gen"] if reference else None
+            if verbose:
+                print(_format_record(record))
+        results += records
+    return results
+
+
+def _format_record(record):
+    speedup = "%8.2fx" % record["speedup"] if record["speedup"] is not None else "%9s" % "-"
+    return "%-14s %6d dims %10.1f us/gen %10.1f us/adaptation %s" \
+           % (record["solver"], record["n_dim"], 1e6 * record["time_per_gen"],
+              1e6 * record["adaptation_per_gen"], speedup)
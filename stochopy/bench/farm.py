@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+
+"""
+Load balancing benchmark of the MPI task farm. CMA-ES is run on an
+objective function whose cost varies between models (log-normal delay) with
+the static and dynamic schedules, and the fraction of the time spent by the
+processes in the objective function is compared. Run it with
+'mpiexec -n 5 stochopy-bench farm'.
+
+Author: Keurfon Luu <keurfon.luu@mines-paristech.fr>
+License: MIT
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+import numpy as np
+import time
+import zlib
+from time import perf_counter
+from ..evolutionary_algorithm import Evolutionary
+from ..task_farm import TaskFarm
+
+__all__ = [ "run_farm" ]
+
+
+SCHEDULES = [ "static", "dynamic" ]
+
+
+class _VariableCostObjective:
+    """
+    Sphere function that waits for a log-normal delay. The delay only
+    depends on the model so that both schedules see the same costs.
+    """
+    
+    def __init__(self, cost, sigma):
+        self._cost = cost
+        self._sigma = sigma
+    
+    def __call__(self, x):
+        seed = zlib.crc32(np.ascontiguousarray(x).tobytes())
+        z = np.random.RandomState(seed).randn()
+        time.sleep(self._cost * np.exp(self._sigma * z - 0.5 * self._sigma**2))
+        return float(np.sum(x**2))
+
+
+def run_farm(schedules = SCHEDULES, popsize = 32, n_dim = 10, max_iter = 10, cost = 0.01,
+             sigma = 1., chunksize = 1, random_state = 42, verbose = False):
+    """
+    Compare the schedules of the MPI task farm. Must be called by every
+    process.
+    
+    Parameters
+    ----------
+    schedules : list, optional
+        Schedules among 'static' and 'dynamic'.
+    popsize : int, optional, default 32
+        Population size.
+    n_dim : int, optional, default 10
+        Number of dimensions.
+    max_iter : int, optional, default 10
+        Number of generations.
+    cost : scalar, optional, default 0.01
+        Mean time of an evaluation in seconds.
+    sigma : scalar, optional, default 1.
+        Standard deviation of the logarithm of the evaluation time.
+    chunksize : int, optional, default 1
+        Number of models taken by a process at once with the dynamic schedule.
+    random_state : int, optional, default 42
+        Seed of the solver.
+    verbose : bool, optional, default False
+        Print the records on the root process.
+    
+    Returns
+    -------
+    results : list of dict
+        One record per schedule with keys 'schedule', 'n_processes',
+        'popsize', 'time_per_gen' (wall time of a generation in seconds),
+        'efficiency' (fraction of the time of the processes spent in the
+        objective function during evaluations), 'busy' and 'idle' (time
+        of each process in seconds), 'n_tasks' (number of models evaluated
+        by each process) and 'speedup' (ratio of the time of the static
+        schedule to the time of the schedule, None if 'static' is not
+        benchmarked).
+    """
+    for schedule in schedules:
+        if schedule not in SCHEDULES:
+            raise ValueError("schedules must be in %s, got %s" % (SCHEDULES, schedule))
+    if not isinstance(max_iter, int) or max_iter < 2:
+        raise ValueError("max_iter must be an integer greater than 1, got %s" % max_iter)
+    if not isinstance(cost, (float, int)) or cost < 0.:
+        raise ValueError("cost must be positive, got %s" % cost)
+    func = _VariableCostObjective(cost, sigma)
+    
+    results = []
+    for schedule in schedules:
+        farm = TaskFarm(schedule, chunksize = chunksize)
+        ea = Evolutionary(func, lower = np.full(n_dim, -5.12), upper = np.full(n_dim, 5.12),
+                          popsize = popsize, max_iter = max_iter, eps1 = 0., eps2 = -np.inf,
+                          mpi = farm, random_state = random_state)
+        starttime = perf_counter()
+        ea.optimize(solver = "cmaes")
+        elapsed = perf_counter() - starttime
+        results.append(dict(schedule = schedule, n_processes = len(farm.busy),
+                            popsize = popsize, time_per_gen = elapsed / ea.n_iter,
+                            efficiency = float(farm.efficiency),
+                            busy = farm.busy.tolist(), idle = farm.idle.tolist(),
+                            n_tasks = farm.n_tasks.tolist()))
+    
+    # Speedup relative to the static schedule
+    reference = [ r["time_per_gen"] for r in results if r["schedule"] == "static" ]
+    for record in results:
+        record["speedup"] = reference[0] / record["time_per_gen"] if reference else None
+        if verbose and farm.rank == 0:
+            print(_format_record(record))
+    return results
+
+
+def _format_record(record):
+    speedup = "%8.2fx" % record["speedup"] if record["speedup"] is not None else "%9s" % "-"
+    return "%-8s %3d processes %10.4f s/gen efficiency %6.1f%% %s" \
+           % (record["schedule"], record["n_processes"], record["time_per_gen"],
+              100. * record["efficiency"], speedup)
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+
+"""
+Scaling benchmark of the evaluation backends. The throughput of the thread
+and process backends is measured against a serial loop on objective
+functions that release the GIL (NumPy), hold it (pure Python) or wait for
+I/O (sleep), to choose the cheaper backend for a given objective function.
+
+Author: Keurfon Luu <keurfon.luu@mines-paristech.fr>
+License: MIT
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+import numpy as np
+import time
+from time import perf_counter
+from ..backends import ProcessBackend, ThreadBackend
+
+__all__ = [ "run_scaling" ]
+
+
+OBJECTIVES = [ "numpy", "python", "sleep" ]
+BACKENDS = [ "threads", "processes" ]
+N_WORKERS = [ 1, 2, 4 ]
+
+
+class _NumpyObjective:
+    """
+    Two dense matrix-vector products, releases the GIL.
+    """
+    
+    def __init__(self, size):
+        self._A = np.random.RandomState(0).randn(size, size) / np.sqrt(size)
+        self._size = size
+    
+    def __call__(self, x):
+        y = np.resize(x, self._size)
+        return float(np.sum(np.tanh(self._A @ (self._A @ y))))
+
+
+class _PythonObjective:
+    """
+    Pure Python loop, holds the GIL.
+    """
+    
+    def __init__(self, size):
+        self._n = size * 50
+    
+    def __call__(self, x):
+        s = float(x[0])
+        for i in range(self._n):
+            s = 0.5 * s + 1.
+        return s
+
+
+class _SleepObjective:
+    """
+    Waits for size microseconds, stands for I/O.
+    """
+    
+    def __init__(self, size):
+        self._delay = size * 1e-6
+    
+    def __call__(self, x):
+        time.sleep(self._delay)
+        return float(np.sum(x**2))
+
+
+_OBJECTIVES = { "numpy": _NumpyObjective, "python": _PythonObjective, "sleep": _SleepObjective }
+
+
+def _throughput(evaluate, models, n_batches):
+    starttime = perf_counter()
+    evaluate(models)
+    startup = perf_counter() - starttime
+    starttime = perf_counter()
+    for i in range(n_batches):
+        evaluate(models)
+    elapsed = perf_counter() - starttime
+    return n_batches * len(models) / elapsed, startup
+
+
+def run_scaling(objectives = OBJECTIVES, backends = BACKENDS, n_workers = N_WORKERS,
+                popsize = 64, n_dim = 10, size = 500, n_batches = 10, chunksize = None,
+                verbose = False):
+    """
+    Measure the throughput of the evaluation backends.
+    
+    Parameters
+    ----------
+    objectives : list, optional
+        Objective functions among 'numpy' (releases the GIL), 'python'
+        (holds the GIL) and 'sleep' (I/O-bound).
+    backends : list, optional
+        Backends among 'threads' and 'processes'.
+    n_workers : list, optional
+        Numbers of workers.
+    popsize : int, optional, default 64
+        Number of models per batch.
+    n_dim : int, optional, default 10
+        Number of dimensions of the models.
+    size : int, optional, default 500
+        Cost of the objective functions (matrix size for 'numpy', number of
+        iterations / 50 for 'python' and delay in microseconds for 'sleep').
+    n_batches : int, optional, default 10
+        Number of timed batches, after one untimed batch that starts the
+        workers.
+    chunksize : int or None, optional, default None
+        Chunk size passed to the backends.
+    verbose : bool, optional, default False
+        Print the records of each objective function.
+    
+    Returns
+    -------
+    results : list of dict
+        One record per objective, backend and number of workers with keys
+        'objective', 'backend', 'n_workers', 'evals_per_sec', 'speedup'
+        (relative to a serial loop) and 'startup' (time of the first batch
+        in seconds, including the start of the workers).
+    """
+    if not isinstance(popsize, int) or popsize < 1:
+        raise ValueError("popsize must be a positive integer, got %s" % popsize)
+    if not isinstance(n_batches, int) or n_batches < 1:
+        raise ValueError("n_batches must be a positive integer, got %s" % n_batches)
+    for backend in backends:
+        if backend not in BACKENDS:
+            raise ValueError("backends must be in %s, got %s" % (BACKENDS, backend))
+    models = np.random.RandomState(0).uniform(-1., 1., (popsize, n_dim))
+    
+    results = []
+    for objective in objectives:
+        func = _OBJECTIVES[objective](size)
+        serial = lambda models: np.array([ func(x) for x in models ])
+        evals_per_sec, startup = _throughput(serial, models, n_batches)
+        baseline = evals_per_sec
+        records = [ dict(objective = objective, backend = "serial", n_workers = 1,
+                         evals_per_sec = evals_per_sec, speedup = 1., startup = startup) ]
+        for backend in backends:
+            for n in n_workers:
+                cls = ThreadBackend if backend == "threads" else ProcessBackend
+                with cls(n_workers = n, chunksize = chunksize) as pool:
+                    pool.start(func)
+                    evals_per_sec, startup = _throughput(pool.evaluate, models, n_batches)
+                records.append(dict(objective = objective, backend = backend, n_workers = n,
+                                    evals_per_sec = evals_per_sec,
+                                    speedup = evals_per_sec / baseline, startup = startup))
+        if verbose:
+            for record in records:
+                print(_format_record(record))
+        results += records
+    return results
+
+
+def _format_record(record):
+    return "%-7s %-10s %3d workers %12.1f evals/s %6.2fx startup %8.4f s" \
+           % (record["objective"], record["backend"], record["n_workers"],
+              record["evals_per_sec"], record["speedup"], record["startup"])
@@ -0,0 +1,413 @@
+# -*- coding: utf-8 -*-
+
+"""
+Performance benchmark of StochOPy solvers and samplers on benchmark
+functions.
+
+Author: Keurfon Luu <keurfon.luu@mines-paristech.fr>
+License: MIT
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+import numpy as np
+import json
+import platform
+import sys
+import tracemalloc
+from datetime import datetime
+from time import perf_counter
+from ..benchmark_functions import BenchmarkFunction
+from ..evolutionary_algorithm import Evolutionary
+from ..monte_carlo import MonteCarlo
+from . import bbob
+from . import scaling
+from . import allocations
+from . import covariance
+from . import farm
+
+__all__ = [ "run_suite", "compare", "save", "load", "main" ]
+
+
+SOLVERS = [ "de", "pso", "cpso", "cmaes", "cholesky-cmaes", "vdcma", "lmmaes" ]
+SAMPLERS = [ "pure", "hastings", "hamiltonian" ]
+FUNCTIONS = [ "ackley", "bent-cigar", "discus", "ellipsoid", "griewank", "quartic",
+              "quartic_noise", "rastrigin", "rosenbrock", "sphere", "styblinski-tang" ]
+N_DIMS = [ 2, 10, 100, 1000, 10000 ]
+POPSIZES = [ 10, 50, 200 ]
+
+# Largest dimension benchmarked by default for methods whose cost per
+# iteration grows faster than linearly with n_dim
+MAX_DIM = { "cmaes": 1000, "cholesky-cmaes": 1000, "hamiltonian": 1000 }
+
+# Metrics checked by compare and whether larger is better
+METRICS = { "gens_per_sec": True, "overhead_per_eval": False, "peak_memory": False }
+
+
+class _TimedFunction:
+    """
+    Objective function wrapper that accumulates the time spent in the
+    objective function.
+    """
+    
+    def __init__(self, func):
+        self._func = func
+        self.time = 0.
+    
+    def __call__(self, x):
+        starttime = perf_counter()
+        f = self._func(x)
+        self.time += perf_counter() - starttime
+        return f
+
+
+def _run_case(kind, method, function, n_dim, popsize, max_iter, n_samples,
+              random_state, memory):
+    bf = BenchmarkFunction(function, n_dim = n_dim).get()
+    func = _TimedFunction(bf["func"])
+    if kind == "solver":
+        solver = Evolutionary(func, lower = bf["lower"], upper = bf["upper"],
+                              popsize = popsize, max_iter = max_iter,
+                              eps1 = 0., eps2 = -np.inf, random_state = random_state)
+        run = lambda: solver.optimize(solver = method)
+    else:
+        solver = MonteCarlo(func, lower = bf["lower"], upper = bf["upper"],
+                            max_iter = n_samples, random_state = random_state)
+        run = lambda: solver.sample(sampler = method)
+    
+    if memory:
+        tracemalloc.start()
+    starttime = perf_counter()
+    _, gfit = run()
+    elapsed = perf_counter() - starttime
+    peak_memory = None
+    if memory:
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return dict(time = elapsed, eval_time = func.time, n_iter = int(solver.n_iter),
+                n_eval = int(solver.n_eval), fitness = float(gfit),
+                peak_memory = peak_memory)
+
+
+def run_suite(solvers = SOLVERS, samplers = SAMPLERS, functions = FUNCTIONS,
+              n_dims = N_DIMS, popsizes = POPSIZES, max_iter = 20, n_samples = 200,
+              repeat = 3, memory = True, max_dim = MAX_DIM, random_state = 42,
+              verbose = False):
+    """
+    Benchmark solvers and samplers on a grid of problems.
+    
+    Each case is run 'repeat' times with the same seed and the fastest run is
+    kept. Peak memory is measured in an additional run traced with
+    tracemalloc so that tracing does not bias timings.
+    
+    Parameters
+    ----------
+    solvers : list, optional
+        Evolutionary solvers to benchmark.
+    samplers : list, optional
+        Monte-Carlo samplers to benchmark.
+    functions : list, optional
+        Names of benchmark functions (see BenchmarkFunction).
+    n_dims : list, optional
+        Search space dimensions.
+    popsizes : list, optional
+        Population sizes. Only used for solvers.
+    max_iter : int, optional, default 20
+        Number of iterations of solvers.
+    n_samples : int, optional, default 200
+        Number of models sampled by samplers.
+    repeat : int, optional, default 3
+        Number of timed runs per case.
+    memory : bool, optional, default True
+        Measure peak memory.
+    max_dim : dict, optional
+        Largest dimension benchmarked for each method. Larger cases are
+        reported as skipped.
+    random_state : int, optional, default 42
+        Seed for random number generator.
+    verbose : bool, optional, default False
+        Print results as they are computed.
+    
+    Returns
+    -------
+    results : list of dict
+        One record per case with keys 'kind', 'method', 'function', 'n_dim',
+        'popsize', and metrics 'time', 'n_iter', 'n_eval', 'gens_per_sec',
+        'overhead_per_eval', 'peak_memory', 'fitness', or 'skipped'.
+    """
+    if not isinstance(repeat, int) or repeat < 1:
+        raise ValueError("repeat must be a positive integer, got %s" % repeat)
+    cases = [ ("solver", method, popsize) for method in solvers for popsize in popsizes ] \
+            + [ ("sampler", method, None) for method in samplers ]
+    
+    results = []
+    for function in functions:
+        for n_dim in n_dims:
+            for kind, method, popsize in cases:
+                record = dict(kind = kind, method = method, function = function,
+                              n_dim = n_dim, popsize = popsize)
+                if n_dim > max_dim.get(method, np.inf):
+                    record.update(skipped = "n_dim > %d" % max_dim[method])
+                    results.append(record)
+                    continue
+                args = (kind, method, function, n_dim, popsize, max_iter, n_samples, random_state)
+                runs = [ _run_case(*args, memory = False) for i in range(repeat) ]
+                best = min(runs, key = lambda run: run["time"])
+                overhead = max(0., best["time"] - best["eval_time"])
+                record.update(time = best["time"],
+                              n_iter = best["n_iter"],
+                              n_eval = best["n_eval"],
+                              gens_per_sec = best["n_iter"] / best["time"],
+                              overhead_per_eval = overhead / max(1, best["n_eval"]),
+                              peak_memory = _run_case(*args, memory = True)["peak_memory"] if memory else None,
+                              fitness = best["fitness"])
+                results.append(record)
+                if verbose:
+                    print(_format_record(record))
+                    sys.stdout.flush()
+    return results
+
+
+def compare(baseline, current, threshold = 0.1):
+    """
+    Compare two sets of benchmark results and flag regressions.
+    
+    Parameters
+    ----------
+    baseline : list of dict
+        Reference results.
+    current : list of dict
+        New results.
+    threshold : scalar, optional, default 0.1
+        Relative degradation above which a metric is flagged.
+    
+    Returns
+    -------
+    regressions : list of dict
+        One record per degraded metric with keys 'kind', 'method',
+        'function', 'n_dim', 'popsize', 'metric', 'baseline', 'current' and
+        'change' (relative degradation).
+    """
+    if not isinstance(threshold, (float, int)) or threshold < 0.:
+        raise ValueError("threshold must be positive, got %s" % threshold)
+    reference = dict((_key(record), record) for record in baseline)
+    regressions = []
+    for record in current:
+        ref = reference.get(_key(record))
+        if ref is None:
+            continue
+        for metric, larger_is_better in METRICS.items():
+            old, new = ref.get(metric), record.get(metric)
+            if old is None or new is None or old <= 0.:
+                continue
+            change = ( old - new ) / old if larger_is_better else ( new - old ) / old
+            if change > threshold:
+                regression = dict(zip(("kind", "method", "function", "n_dim", "popsize"), _key(record)))
+                regression.update(metric = metric, baseline = old, current = new, change = change)
+                regressions.append(regression)
+    return regressions
+
+
+def save(results, filename, **kwargs):
+    """
+    Write benchmark results and environment metadata to a JSON file.
+    Additional keyworded arguments are written as extra entries.
+    """
+    import numpy
+    from .. import __version__
+    meta = dict(date = datetime.now().isoformat(),
+                python = platform.python_version(),
+                numpy = numpy.__version__,
+                stochopy = __version__,
+                platform = platform.platform(),
+                processor = platform.processor())
+    with open(filename, "w") as f:
+        json.dump(dict(meta = meta, results = results, **kwargs), f, indent = 2)
+
+
+def load(filename):
+    """
+    Read benchmark results from a JSON file.
+    """
+    with open(filename, "r") as f:
+        return json.load(f)["results"]
+
+
+def _key(record):
+    return ( record["kind"], record["method"], record["function"],
+             record["n_dim"], record["popsize"] )
+
+
+def _format_record(record):
+    name = "%-7s %-11s %-16s n_dim=%-6d popsize=%-5s" % (record["kind"], record["method"],
+                                                        record["function"], record["n_dim"],
+                                                        record["popsize"] if record["popsize"] else "-")
+    if "skipped" in record:
+        return "%s skipped (%s)" % (name, record["skipped"])
+    memory = "%.1f MiB" % ( record["peak_memory"] / 2.**20 ) if record["peak_memory"] is not None else "-"
+    return "%s %10.2f gen/s %10.2f us/eval %12s" % (name, record["gens_per_sec"],
+                                                    1e6 * record["overhead_per_eval"], memory)
+
+
+def main(argv = None):
+    """
+    Command line interface of the benchmark suite.
+    """
+    import argparse
+    
+    parser = argparse.ArgumentParser(prog = "stochopy-bench",
+                                     description = "Performance benchmark of StochOPy solvers and samplers.")
+    subparsers = parser.add_subparsers(dest = "command")
+    
+    run_parser = subparsers.add_parser("run", help = "run the benchmark suite")
+    run_parser.add_argument("-o", "--output", default = "stochopy-bench.json", help = "output JSON file")
+    run_parser.add_argument("--solvers", nargs = "*", default = SOLVERS, choices = SOLVERS)
+    run_parser.add_argument("--samplers", nargs = "*", default = SAMPLERS, choices = SAMPLERS)
+    run_parser.add_argument("--functions", nargs = "*", default = FUNCTIONS, choices = FUNCTIONS)
+    run_parser.add_argument("--n-dims", nargs = "*", type = int, default = N_DIMS)
+    run_parser.add_argument("--popsizes", nargs = "*", type = int, default = POPSIZES)
+    run_parser.add_argument("--max-iter", type = int, default = 20)
+    run_parser.add_argument("--n-samples", type = int, default = 200)
+    run_parser.add_argument("--repeat", type = int, default = 3)
+    run_parser.add_argument("--max-dim", type = int, default = None,
+                            help = "largest dimension for cmaes, cholesky-cmaes and hamiltonian (default %d)" % MAX_DIM["cmaes"])
+    run_parser.add_argument("--no-memory", action = "store_true", help = "do not measure peak memory")
+    run_parser.add_argument("--quick", action = "store_true",
+                            help = "small grid (sphere and rosenbrock, n_dim 2 and 10, popsize 10)")
+    
+    compare_parser = subparsers.add_parser("compare", help = "compare two result files")
+    compare_parser.add_argument("baseline", help = "reference JSON file")
+    compare_parser.add_argument("current", help = "new JSON file")
+    compare_parser.add_argument("-t", "--threshold", type = float, default = 0.1,
+                                help = "relative degradation flagged as regression (default 0.1)")
+    
+    bbob_parser = subparsers.add_parser("bbob", help = "run the COCO/BBOB-style anytime benchmark")
+    bbob_parser.add_argument("-o", "--output", default = "stochopy-bbob.json", help = "output JSON file")
+    bbob_parser.add_argument("--solvers", nargs = "*", default = bbob.SOLVERS, choices = bbob.SOLVERS)
+    bbob_parser.add_argument("--functions", nargs = "*", default = bbob.FUNCTIONS, choices = FUNCTIONS)
+    bbob_parser.add_argument("--n-dims", nargs = "*", type = int, default = bbob.N_DIMS)
+    bbob_parser.add_argument("--popsizes", nargs = "*", type = int, default = None,
+                             help = "population sizes (default 4 + floor(3 ln(n_dim)))")
+    bbob_parser.add_argument("--instances", type = int, default = 15, help = "runs per problem")
+    bbob_parser.add_argument("--budget", type = int, default = 1000,
+                             help = "maximum number of evaluations divided by n_dim")
+    bbob_parser.add_argument("--restart", default = None, choices = [ "ipop", "bipop" ],
+                             help = "restart strategy of the CMA-ES variants")
+    bbob_parser.add_argument("--shift", action = "store_true", help = "randomly shift each instance")
+    bbob_parser.add_argument("--rotate", action = "store_true", help = "randomly rotate each instance")
+    bbob_parser.add_argument("--n-jobs", type = int, default = None, help = "number of processes")
+    
+    scaling_parser = subparsers.add_parser("scaling", help = "compare the thread and process evaluation backends")
+    scaling_parser.add_argument("-o", "--output", default = "stochopy-scaling.json", help = "output JSON file")
+    scaling_parser.add_argument("--objectives", nargs = "*", default = scaling.OBJECTIVES, choices = scaling.OBJECTIVES)
+    scaling_parser.add_argument("--backends", nargs = "*", default = scaling.BACKENDS, choices = scaling.BACKENDS)
+    scaling_parser.add_argument("--n-workers", nargs = "*", type = int, default = scaling.N_WORKERS)
+    scaling_parser.add_argument("--popsize", type = int, default = 64)
+    scaling_parser.add_argument("--n-dim", type = int, default = 10)
+    scaling_parser.add_argument("--size", type = int, default = 500, help = "cost of the objective functions")
+    scaling_parser.add_argument("--batches", type = int, default = 10, help = "number of timed batches")
+    scaling_parser.add_argument("--chunksize", type = int, default = None)
+    
+    allocations_parser = subparsers.add_parser("allocations", help = "measure the memory allocated by the solver loops")
+    allocations_parser.add_argument("-o", "--output", default = "stochopy-allocations.json", help = "output JSON file")
+    allocations_parser.add_argument("--solvers", nargs = "*", default = allocations.SOLVERS, choices = allocations.SOLVERS)
+    allocations_parser.add_argument("--n-dims", nargs = "*", type = int, default = allocations.N_DIMS)
+    allocations_parser.add_argument("--popsize", type = int, default = 20)
+    allocations_parser.add_argument("--max-iter", type = int, default = 50)
+    
+    covariance_parser = subparsers.add_parser("covariance", help = "measure the overhead of the CMA-ES variants")
+    covariance_parser.add_argument("-o", "--output", default = "stochopy-covariance.json", help = "output JSON file")
+    covariance_parser.add_argument("--solvers", nargs = "*", default = covariance.SOLVERS, choices = covariance.SOLVERS)
+    covariance_parser.add_argument("--n-dims", nargs = "*", type = int, default = covariance.N_DIMS)
+    covariance_parser.add_argument("--popsize", type = int, default = None,
+                                   help = "population size (default 4 + floor(3 ln(n_dim)))")
+    covariance_parser.add_argument("--max-iter", type = int, default = 30)
+    
+    farm_parser = subparsers.add_parser("farm", help = "compare the schedules of the MPI task farm (run with mpiexec)")
+    farm_parser.add_argument("-o", "--output", default = "stochopy-farm.json", help = "output JSON file")
+    farm_parser.add_argument("--schedules", nargs = "*", default = farm.SCHEDULES, choices = farm.SCHEDULES)
+    farm_parser.add_argument("--popsize", type = int, default = 32)
+    farm_parser.add_argument("--n-dim", type = int, default = 10)
+    farm_parser.add_argument("--max-iter", type = int, default = 10)
+    farm_parser.add_argument("--cost", type = float, default = 0.01, help = "mean time of an evaluation in seconds")
+    farm_parser.add_argument("--sigma", type = float, default = 1.,
+                             help = "standard deviation of the logarithm of the evaluation time")
+    farm_parser.add_argument("--chunksize", type = int, default = 1)
+    
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        if args.quick:
+            args.functions, args.n_dims, args.popsizes = [ "sphere", "rosenbrock" ], [ 2, 10 ], [ 10 ]
+        max_dim = dict(MAX_DIM) if args.max_dim is None else dict((k, args.max_dim) for k in MAX_DIM)
+        results = run_suite(solvers = args.solvers, samplers = args.samplers,
+                            functions = args.functions, n_dims = args.n_dims,
+                            popsizes = args.popsizes, max_iter = args.max_iter,
+                            n_samples = args.n_samples, repeat = args.repeat,
+                            memory = not args.no_memory, max_dim = max_dim,
+                            verbose = True)
+        save(results, args.output)
+        print("Results written to %s" % args.output)
+        return 0
+    elif args.command == "bbob":
+        runs = bbob.run_bbob(solvers = args.solvers, functions = args.functions,
+                             n_dims = args.n_dims, popsizes = args.popsizes or [ None ],
+                             n_instances = args.instances, budget = args.budget,
+                             restart = args.restart, shift = args.shift,
+                             rotate = args.rotate, n_jobs = args.n_jobs)
+        summary = bbob.summarize(runs)
+        print("ERT / n_dim to reach target precision")
+        log_targets = np.log10(summary["targets"])
+        icols = sorted(set(int(np.argmin(np.abs(log_targets - t))) for t in [ 1, -1, -3, -5, -8 ]))
+        print("%-7s %-16s %6s %7s" % ("solver", "function", "n_dim", "popsize")
+              + "".join("%10.0e" % summary["targets"][i] for i in icols))
+        for r in summary["ert"]:
+            print("%-7s %-16s %6d %7d" % (r["solver"], r["function"], r["n_dim"], r["popsize"])
+                  + "".join("%10.1f" % ( r["ert"][i] / r["n_dim"] ) if r["ert"][i] is not None else "%10s" % "-"
+                            for i in icols))
+        save(runs, args.output, summary = summary)
+        print("Results written to %s" % args.output)
+        return 0
+    elif args.command == "scaling":
+        results = scaling.run_scaling(objectives = args.objectives, backends = args.backends,
+                                      n_workers = args.n_workers, popsize = args.popsize,
+                                      n_dim = args.n_dim, size = args.size,
+                                      n_batches = args.batches, chunksize = args.chunksize,
+                                      verbose = True)
+        save(results, args.output)
+        print("Results written to %s" % args.output)
+        return 0
+    elif args.command == "allocations":
+        results = allocations.run_allocations(solvers = args.solvers, n_dims = args.n_dims,
+                                              popsize = args.popsize, max_iter = args.max_iter,
+                                              verbose = True)
+        save(results, args.output)
+        print("Results written to %s" % args.output)
+        return 0
+    elif args.command == "covariance":
+        results = covariance.run_covariance(solvers = args.solvers, n_dims = args.n_dims,
+                                            popsize = args.popsize, max_iter = args.max_iter,
+                                            verbose = True)
+        save(results, args.output)
+        print("Results written to %s" % args.output)
+        return 0
+    elif args.command == "farm":
+        from mpi4py import MPI
+        results = farm.run_farm(schedules = args.schedules, popsize = args.popsize,
+                                n_dim = args.n_dim, max_iter = args.max_iter,
+                                cost = args.cost, sigma = args.sigma,
+                                chunksize = args.chunksize, verbose = True)
+        if MPI.COMM_WORLD.Get_rank() == 0:
+            save(results, args.output)
+            print("Results written to %s" % args.output)
+        return 0
+    elif args.command == "compare":
+        regressions = compare(load(args.baseline), load(args.current), args.threshold)
+        for r in regressions:
+            print("REGRESSION %-7s %-11s %-16s n_dim=%-6d popsize=%-5s %-17s %.4g -> %.4g (%+.1f%%)" \
+                  % (r["kind"], r["method"], r["function"], r["n_dim"],
+                     r["popsize"] if r["popsize"] else "-", r["metric"],
+                     r["baseline"], r["current"], 100. * r["change"]))
+        print("%d regression(s) found" % len(regressions))
+        return 1 if regressions else 0
+    else:
+        parser.print_help()
+        return 2
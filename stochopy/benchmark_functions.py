@@ -10,6 +10,8 @@ License: MIT
 
 from __future__ import absolute_import, division, print_function, unicode_literals
 import numpy as np
+from functools import lru_cache
+from time import perf_counter, sleep
 import matplotlib.pyplot as plt
 from matplotlib.axes import Axes
 from mpl_toolkits.mplot3d import Axes3D
@@ -22,61 +24,143 @@ class BenchmarkFunction:
     Benchmark functions.
     
     This class provides several benchmark functions to test global optimization
-    algorithms.
+    algorithms. Functions can be shifted and rotated to remove the separability
+    and the position of the optimum, and can be given an artificial cost per
+    evaluation for parallel scaling tests. They accept a single model or a
+    2-D array of models (one per row).
     
     Parameters
     ----------
-    func : {'ackley', 'griewank', 'quartic', 'quartic_noise', 'rastrigin',
-           'rosenbrock', 'sphere', 'styblinski-tang'}
+    func : {'ackley', 'bent-cigar', 'discus', 'ellipsoid', 'griewank',
+           'quartic', 'quartic_noise', 'rastrigin', 'rosenbrock', 'sphere',
+           'styblinski-tang'}
         Benchmark function name.
     n_dim : int, default 2
         Number of dimensions.
+    cond : scalar, default 1e6
+        Condition number of ill-conditioned functions ('bent-cigar', 'discus'
+        and 'ellipsoid'). Use larger values (e.g. 1e10) for high conditioning.
+    shift : bool or ndarray, default False
+        Move the global minimizer. If True, a random position in the inner
+        80% of the search space is drawn.
+    rotate : bool or ndarray, default False
+        Rotate the function around its global minimizer. If True, a random
+        orthogonal matrix is drawn. Random rotation matrices are cached and
+        shared by instances with the same random_state.
+    random_state : int or None, default None
+        Seed for the random shift and rotation.
+    cost : scalar or callable, default 0.
+        Time in seconds spent in each evaluation, or function returning this
+        time given a model.
+    cost_mode : {'sleep', 'spin'}, default 'sleep'
+        Spend the cost idle ('sleep') or busy waiting ('spin').
     """
     
-    def __init__(self, func, n_dim = 2):
+    def __init__(self, func, n_dim = 2, cond = 1e6, shift = False, rotate = False,
+                 random_state = None, cost = 0., cost_mode = "sleep"):
         self._n_dim = n_dim
+        self._cond = cond
         if func.lower() == "ackley":
             self._func = self._ackley
             self._lower = np.full(n_dim, -32.768)
             self._upper = np.full(n_dim, 32.768)
             self._min = 0.
+            self._xopt = np.zeros(n_dim)
         elif func.lower() == "griewank":
             self._func = self._griewank
             self._lower = np.full(n_dim, -600.)
             self._upper = np.full(n_dim, 600.)
             self._min = 0.
+            self._xopt = np.zeros(n_dim)
         elif func.lower() == "quartic":
             self._func = self._quartic
             self._lower = np.full(n_dim, -1.28)
             self._upper = np.full(n_dim, 1.28)
             self._min = 0.
+            self._xopt = np.zeros(n_dim)
         elif func.lower() == "quartic_noise":
             self._func = self._quartic
             self._lower = np.full(n_dim, -1.28)
             self._upper = np.full(n_dim, 1.28)
             self._min = 0.
+            self._xopt = np.zeros(n_dim)
         elif func.lower() == "rastrigin":
             self._func = self._rastrigin
             self._lower = np.full(n_dim, -5.12)
             self._upper = np.full(n_dim, 5.12)
             self._min = 0.
+            self._xopt = np.zeros(n_dim)
         elif func.lower() == "rosenbrock":
             self._func = self._rosenbrock
             self._lower = np.full(n_dim, -5.12)
             self._upper = np.full(n_dim, 5.12)
             self._min = 0.
+            self._xopt = np.ones(n_dim)
         elif func.lower() == "sphere":
             self._func = self._sphere
             self._lower = np.full(n_dim, -5.12)
             self._upper = np.full(n_dim, 5.12)
             self._min = 0.
+            self._xopt = np.zeros(n_dim)
         elif func.lower() == "styblinski-tang":
             self._func = self._styblinski_tang
             self._lower = np.full(n_dim, -5.12)
             self._upper = np.full(n_dim, 5.12)
             self._min = 0.
+            self._xopt = np.full(n_dim, -2.903534027771178)
+        elif func.lower() == "ellipsoid":
+            self._func = self._ellipsoid
+            self._lower = np.full(n_dim, -5.)
+            self._upper = np.full(n_dim, 5.)
+            self._min = 0.
+            self._xopt = np.zeros(n_dim)
+        elif func.lower() == "bent-cigar":
+            self._func = self._bent_cigar
+            self._lower = np.full(n_dim, -5.)
+            self._upper = np.full(n_dim, 5.)
+            self._min = 0.
+            self._xopt = np.zeros(n_dim)
+        elif func.lower() == "discus":
+            self._func = self._discus
+            self._lower = np.full(n_dim, -5.)
+            self._upper = np.full(n_dim, 5.)
+            self._min = 0.
+            self._xopt = np.zeros(n_dim)
         else:
             raise ValueError("unknown benchmark function '%s'" % func)
+        if not isinstance(cond, (float, int)) or cond < 1.:
+            raise ValueError("cond must be greater than or equal to 1, got %s" % cond)
+            
+        # Shift
+        if isinstance(shift, bool):
+            if shift:
+                rng = np.random.RandomState(random_state)
+                self._shift = rng.uniform(0.9 * self._lower + 0.1 * self._upper,
+                                          0.1 * self._lower + 0.9 * self._upper)
+            else:
+                self._shift = None
+        elif np.shape(shift) == (n_dim,):
+            self._shift = np.array(shift, dtype = float)
+        else:
+            raise ValueError("shift must be either True, False or an ndarray of length n_dim")
+            
+        # Rotation
+        if isinstance(rotate, bool):
+            self._rotation = _rotation_matrix(n_dim, random_state) if rotate else None
+        elif np.shape(rotate) == (n_dim, n_dim):
+            self._rotation = np.array(rotate, dtype = float)
+        else:
+            raise ValueError("rotate must be either True, False or an ndarray of shape (n_dim, n_dim)")
+            
+        # Cost
+        if not hasattr(cost, "__call__") and (not isinstance(cost, (float, int)) or cost < 0.):
+            raise ValueError("cost must be positive or callable, got %s" % cost)
+        else:
+            self._cost = cost
+        if cost_mode not in [ "sleep", "spin" ]:
+            raise ValueError("cost_mode must be either 'sleep' or 'spin', got %s" % cost_mode)
+        else:
+            self._cost_mode = cost_mode
             
     def get(self):
         """
@@ -87,44 +171,121 @@ class BenchmarkFunction:
         dict : dictionary
             Dictionary containing the function, the lower and upper boundaries.
         """
-        return dict(func = self._func, lower = self._lower, upper = self._upper)
-
+        if self._shift is None and self._rotation is None and not self._has_cost:
+            func = self._func
+        else:
+            func = self.__call__
+        return dict(func = func, lower = self._lower, upper = self._upper)
+    
+    def __call__(self, x):
+        x = np.asarray(x, dtype = float)
+        if self._shift is not None or self._rotation is not None:
+            z = x - self._shift if self._shift is not None else x - self._xopt
+            if self._rotation is not None:
+                z = np.dot(z, self._rotation.T)
+            x = z + self._xopt
+        f = self._func(x)
+        if self._has_cost:
+            self._spend(x)
+        return f
+    
+    @property
+    def _has_cost(self):
+        return hasattr(self._cost, "__call__") or self._cost > 0.
+    
+    def _spend(self, x):
+        if hasattr(self._cost, "__call__"):
+            t = np.sum([ self._cost(xx) for xx in np.atleast_2d(x) ])
+        else:
+            t = self._cost * ( len(x) if x.ndim == 2 else 1 )
+        if self._cost_mode == "sleep":
+            sleep(t)
+        else:
+            endtime = perf_counter() + t
+            while perf_counter() < endtime:
+                pass
+    
+    @property
+    def xopt(self):
+        """
+        ndarray of shape (n_dim)
+        Global minimizer of the benchmark function.
+        """
+        return self._shift if self._shift is not None else self._xopt
+    
+    @property
+    def rotation(self):
+        """
+        ndarray of shape (n_dim, n_dim) or None
+        Rotation matrix.
+        """
+        return self._rotation
+    
+    @property
+    def fmin(self):
+        """
+        scalar
+        Global minimum of the benchmark function.
+        """
+        return self._func(self._xopt)
+    
     def _ackley(self, x):
-        n_dim = len(x)
+        x = np.asarray(x)
+        n_dim = x.shape[-1]
         e = 2.7182818284590451
-        sum1 = np.sqrt( 1.0 / n_dim * np.sum( np.array(x)**2 ) )
-        sum2 = 1.0 / n_dim * np.sum( np.cos( 2.0 * np.pi * np.array(x) ) )
+        sum1 = np.sqrt( 1.0 / n_dim * np.sum( x**2, axis = -1 ) )
+        sum2 = 1.0 / n_dim * np.sum( np.cos( 2.0 * np.pi * x ), axis = -1 )
         return 20.0 + e - 20.0 * np.exp( -0.2 * sum1 ) - np.exp(sum2)
         
     def _griewank(self, x):
-        n_dim = len(x)
-        sum1 = np.sum( np.array(x)**2 ) / 4000.0
-        prod1 = np.prod( np.cos( np.array(x) / np.sqrt( np.arange(1, n_dim+1) ) ) )
+        x = np.asarray(x)
+        n_dim = x.shape[-1]
+        sum1 = np.sum( x**2, axis = -1 ) / 4000.0
+        prod1 = np.prod( np.cos( x / np.sqrt( np.arange(1, n_dim+1) ) ), axis = -1 )
         return 1.0 + sum1 - prod1
         
     def _quartic(self, x):
-        n_dim = len(x)
-        return np.sum( np.arange(1, n_dim+1) * np.array(x)**4 )
+        x = np.asarray(x)
+        n_dim = x.shape[-1]
+        return np.sum( np.arange(1, n_dim+1) * x**4, axis = -1 )
         
     def _quartic_noise(self, x):
-        return self._quartic(x) + np.random.rand()
+        x = np.asarray(x)
+        return self._quartic(x) + np.random.rand(*x.shape[:-1])
         
     def _rastrigin(self, x):
-        n_dim = len(x)
-        sum1 = np.sum( np.array(x)**2 - 10.0 * np.cos( 2.0 * np.pi * np.array(x) ) )
+        x = np.asarray(x)
+        n_dim = x.shape[-1]
+        sum1 = np.sum( x**2 - 10.0 * np.cos( 2.0 * np.pi * x ), axis = -1 )
         return 10.0 * n_dim + sum1
         
     def _rosenbrock(self, x):
-        sum1 = np.sum( ( np.array(x[1:]) - np.array(x[:-1])**2 )**2 )
-        sum2 = np.sum( ( 1.0 - np.array(x[:-1]) )**2 )
+        x = np.asarray(x)
+        sum1 = np.sum( ( x[...,1:] - x[...,:-1]**2 )**2, axis = -1 )
+        sum2 = np.sum( ( 1.0 - x[...,:-1] )**2, axis = -1 )
         return 100.0 * sum1 + sum2
         
     def _sphere(self, x):
-        return np.sum( np.array(x)**2 )
+        return np.sum( np.asarray(x)**2, axis = -1 )
         
     def _styblinski_tang(self, x):
-        sum1 = np.sum( np.array(x)**4 - 16.0 * np.array(x)**2 + 5.0 * np.array(x) )
-        return sum1 / 2.0 + 39.16599 * len(x)
+        x = np.asarray(x)
+        sum1 = np.sum( x**4 - 16.0 * x**2 + 5.0 * x, axis = -1 )
+        return sum1 / 2.0 + 39.16599 * x.shape[-1]
+        
+    def _ellipsoid(self, x):
+        x = np.asarray(x)
+        n_dim = x.shape[-1]
+        scale = self._cond**( np.arange(n_dim) / max(1, n_dim-1) )
+        return np.sum( scale * x**2, axis = -1 )
+        
+    def _bent_cigar(self, x):
+        x = np.asarray(x)
+        return x[...,0]**2 + self._cond * np.sum( x[...,1:]**2, axis = -1 )
+        
+    def _discus(self, x):
+        x = np.asarray(x)
+        return self._cond * x[...,0]**2 + np.sum( x[...,1:]**2, axis = -1 )
     
     def plot(self, nx = 101, ny = 101, n_levels = 10, axes = None,
              figsize = (8, 8), projection = "2d", cmap = None,
@@ -180,8 +341,8 @@ class BenchmarkFunction:
         ax = np.linspace(self._lower[0], self._upper[0], nx)
         ay = np.linspace(self._lower[1], self._upper[1], ny)
         X, Y = np.meshgrid(ax, ay)
-        funcgrid = np.array([ self._func([x, y]) for x, y
-                                    in zip(X.ravel(), Y.ravel()) ]).reshape((nx, ny))
+        func = self._func if self._shift is None and self._rotation is None else self.__call__
+        funcgrid = func(np.column_stack((X.ravel(), Y.ravel()))).reshape((nx, ny))
         if projection == "2d":
             if axes is None:
                 fig = plt.figure(figsize = figsize, facecolor = "white")
@@ -218,4 +379,23 @@ class BenchmarkFunction:
         if hasattr(cm, "viridis"):
             return "viridis"
         else:
-            return "jet"
\ No newline at end of file
+            return "jet"
+
+
+@lru_cache(maxsize = 32)
+def _cached_rotation_matrix(n_dim, random_state):
+    rng = np.random.RandomState([ random_state, 1 ])
+    Q, R = np.linalg.qr(rng.randn(n_dim, n_dim))
+    return Q * np.sign(np.diag(R))
+
+
+def _rotation_matrix(n_dim, random_state = None):
+    """
+    Random orthogonal matrix uniformly distributed (Haar measure). Matrices
+    drawn with the same seed are cached.
+    """
+    if random_state is None:
+        Q, R = np.linalg.qr(np.random.randn(n_dim, n_dim))
+        return Q * np.sign(np.diag(R))
+    else:
+        return _cached_rotation_matrix(n_dim, random_state)
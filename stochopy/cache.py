@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+
+"""
+Evaluation cache to avoid re-evaluating identical or near-identical models.
+
+Author: Keurfon Luu <keurfon.luu@mines-paristech.fr>
+License: MIT
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+import numpy as np
+import sqlite3
+from collections import OrderedDict
+
+__all__ = [ "EvaluationCache" ]
+
+
+class EvaluationCache:
+    """
+    Evaluation cache.
+    
+    This cache stores objective function values keyed on quantized model
+    vectors. Models that fall in the same cell of a regular grid of size
+    'tol' share the same objective function value. The least recently used
+    entries are discarded when the cache is full.
+    
+    Parameters
+    ----------
+    tol : scalar or ndarray, optional, default 0.
+        Quantization step (in the units of the model parameters). If tol = 0.,
+        only exactly identical models are matched.
+    max_size : int, optional, default 100000
+        Maximum number of entries kept in memory. The memory footprint is
+        roughly max_size * (8 * n_dim + 100) bytes.
+    filename : str or None, optional, default None
+        SQLite database used as a persistent store. It can be shared across
+        runs and processes optimizing the same objective function.
+    """
+    
+    _ATTRIBUTES = [ "size", "hits", "misses", "hit_ratio" ]
+    
+    def __init__(self, tol = 0., max_size = 100000, filename = None):
+        # Check inputs
+        if not isinstance(tol, (float, int, list, tuple, np.ndarray)) or np.any(np.asarray(tol) < 0.):
+            raise ValueError("tol must be positive, got %s" % tol)
+        else:
+            self._tol = np.asarray(tol, dtype = float)
+        if not isinstance(max_size, int) or max_size <= 0:
+            raise ValueError("max_size must be a positive integer, got %s" % max_size)
+        else:
+            self._max_size = max_size
+        if filename is not None and not isinstance(filename, str):
+            raise ValueError("filename must be a string")
+        else:
+            self._filename = filename
+        
+        # Initialize
+        self._data = OrderedDict()
+        self._hits = 0
+        self._misses = 0
+        self._conn = None
+        if filename is not None:
+            self._conn = sqlite3.connect(filename, timeout = 60.)
+            self._conn.execute("CREATE TABLE IF NOT EXISTS cache (key BLOB PRIMARY KEY, value REAL)")
+            self._conn.commit()
+    
+    def __repr__(self):
+        attributes = [ "%s: %s" % (attr.rjust(13), self._print_attr(attr))
+                        for attr in self._ATTRIBUTES ]
+        return "\n".join(attributes) + "\n"
+    
+    def __len__(self):
+        return len(self._data)
+    
+    def __contains__(self, x):
+        return self._key(x) in self._data
+    
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state["_conn"] = None
+        return state
+    
+    def _print_attr(self, attr):
+        if attr not in self._ATTRIBUTES:
+            raise ValueError("attr should be in %s" % self._ATTRIBUTES)
+        else:
+            if attr == "size":
+                return "%d" % len(self._data)
+            elif attr == "hits":
+                return "%d" % self._hits
+            elif attr == "misses":
+                return "%d" % self._misses
+            elif attr == "hit_ratio":
+                return "%.2f" % self.hit_ratio
+    
+    def _key(self, x):
+        x = np.asarray(x, dtype = float)
+        if np.any(self._tol > 0.):
+            tol = np.where(self._tol > 0., self._tol, 1.)
+            x = np.where(self._tol > 0., np.round(x / tol), x)
+        return np.ascontiguousarray(x + 0.).tobytes()       # Also maps -0. to 0.
+    
+    def get(self, x):
+        """
+        Look up the objective function value of a model.
+        
+        Parameters
+        ----------
+        x : ndarray
+            Model.
+        
+        Returns
+        -------
+        value : scalar or None
+            Cached objective function value, None if not found.
+        """
+        return self._get(self._key(x))
+    
+    def lookup(self, models):
+        """
+        Look up the objective function values of a batch of models. A model
+        with the same key as an earlier model of the batch is counted as a
+        hit and takes the value of that model, so that each key is evaluated
+        at most once per batch.
+        
+        Parameters
+        ----------
+        models : ndarray of shape (n_models, n_dim)
+            Models.
+        
+        Returns
+        -------
+        values : ndarray of shape (n_models)
+            Cached objective function values (only meaningful for the models
+            that are neither to evaluate nor duplicates).
+        idx : ndarray
+            Indices of the models to evaluate, one per key not found.
+        duplicates : ndarray of shape (n_duplicates, 2)
+            Indices of the duplicates of the models to evaluate, and indices
+            of the models whose values they take.
+        """
+        values = np.zeros(len(models))
+        idx, duplicates, first = [], [], {}
+        for i, x in enumerate(models):
+            key = self._key(x)
+            if key in first:
+                duplicates.append((i, first[key]))
+                self._hits += 1
+                continue
+            value = self._get(key)
+            if value is None:
+                first[key] = i
+                idx.append(i)
+            else:
+                values[i] = value
+        return values, np.array(idx, dtype = int), np.array(duplicates, dtype = int).reshape((-1, 2))
+    
+    def _get(self, key):
+        if key in self._data:
+            self._data.move_to_end(key)
+            self._hits += 1
+            return self._data[key]
+        if self._conn is not None:
+            row = self._conn.execute("SELECT value FROM cache WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                self._insert(key, row[0])
+                self._hits += 1
+                return row[0]
+        self._misses += 1
+        return None
+    
+    def set(self, x, value):
+        """
+        Store the objective function value of a model.
+        
+        Parameters
+        ----------
+        x : ndarray
+            Model.
+        value : scalar
+            Objective function value.
+        """
+        key = self._key(x)
+        self._insert(key, float(value))
+        if self._conn is not None:
+            self._conn.execute("INSERT OR REPLACE INTO cache (key, value) VALUES (?, ?)", (key, float(value)))
+    
+    def estimate_memory(self, n_dim):
+        """
+        Estimate the memory used by a full in-memory cache.
+        
+        Parameters
+        ----------
+        n_dim : int
+            Number of dimensions of the models.
+        
+        Returns
+        -------
+        nbytes : int
+            Memory in bytes of max_size entries, including Python object
+            overheads (about 160 bytes per entry).
+        """
+        return int(self._max_size * (8 * n_dim + 160))
+    
+    def _insert(self, key, value):
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self._max_size:
+            self._data.popitem(last = False)
+    
+    def flush(self):
+        """
+        Commit pending entries to the persistent store.
+        """
+        if self._conn is not None:
+            self._conn.commit()
+    
+    def clear(self):
+        """
+        Remove all in-memory entries and reset statistics. The persistent
+        store is left untouched.
+        """
+        self._data.clear()
+        self._hits = 0
+        self._misses = 0
+    
+    def close(self):
+        """
+        Commit pending entries and close the persistent store.
+        """
+        if self._conn is not None:
+            self._conn.commit()
+            self._conn.close()
+            self._conn = None
+    
+    @property
+    def max_size(self):
+        """
+        int
+        Maximum number of entries kept in memory.
+        """
+        return self._max_size
+    
+    @property
+    def hits(self):
+        """
+        int
+        Number of successful lookups.
+        """
+        return self._hits
+    
+    @property
+    def misses(self):
+        """
+        int
+        Number of failed lookups.
+        """
+        return self._misses
+    
+    @property
+    def hit_ratio(self):
+        """
+        scalar between 0 and 1
+        Ratio of successful lookups.
+        """
+        n = self._hits + self._misses
+        return self._hits / n if n > 0 else 0.
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+
+"""
+Callbacks called at each iteration of an optimizer or a sampler.
+
+Author: Keurfon Luu <keurfon.luu@mines-paristech.fr>
+License: MIT
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+import numpy as np
+import json
+import os
+
+__all__ = [ "Recorder" ]
+
+
+class Recorder:
+    """
+    Metrics recorder.
+    
+    This callback records the scalar entries of the state passed by an
+    optimizer or a sampler at each iteration (e.g. iteration number, number
+    of function evaluations, best fitness, population spread, step size,
+    computation times). The records can be written to a JSON-lines or CSV
+    file, flushed every 'flush_every' iterations. It never stops the
+    optimization.
+    
+    Parameters
+    ----------
+    filename : str or None, optional, default None
+        Output file. If None, records are only kept in memory.
+    fmt : {None, 'jsonl', 'csv'}, optional, default None
+        Output file format. If None, the format is inferred from the file
+        extension ('csv' if it ends with '.csv', 'jsonl' otherwise).
+    flush_every : int, optional, default 10
+        Number of iterations between two writes to the output file.
+    keys : list or None, optional, default None
+        State entries to record. If None, all the scalar entries are
+        recorded.
+    mode : {'x', 'w', 'a'}, optional, default 'x'
+        Behavior if the output file already exists.
+        - 'x', raise an error.
+        - 'w', overwrite the file.
+        - 'a', append the records to the file (without header in CSV).
+    """
+    
+    def __init__(self, filename = None, fmt = None, flush_every = 10, keys = None, mode = "x"):
+        # Check inputs
+        if filename is not None and not isinstance(filename, str):
+            raise ValueError("filename must be a string")
+        else:
+            self._filename = filename
+        if fmt is None:
+            fmt = "csv" if filename is not None and filename.lower().endswith(".csv") else "jsonl"
+        if fmt not in [ "jsonl", "csv" ]:
+            raise ValueError("fmt must either be None, 'jsonl' or 'csv', got %s" % fmt)
+        else:
+            self._fmt = fmt
+        if not isinstance(flush_every, int) or flush_every <= 0:
+            raise ValueError("flush_every must be a positive integer, got %s" % flush_every)
+        else:
+            self._flush_every = flush_every
+        if keys is not None and not isinstance(keys, (list, tuple)):
+            raise ValueError("keys must be a list or a tuple")
+        else:
+            self._keys = keys
+        if mode not in [ "x", "w", "a" ]:
+            raise ValueError("mode must either be 'x', 'w' or 'a', got %s" % mode)
+        exists = filename is not None and os.path.isfile(filename)
+        if exists and mode == "x":
+            raise ValueError("file %s already exists, use mode 'w' to overwrite it or 'a' to append to it"
+                             % filename)
+        
+        # Initialize
+        self._records = []
+        self._buffer = []
+        self._header = not exists or mode == "w" or os.path.getsize(filename) == 0
+        if exists and mode == "w":
+            os.remove(filename)
+    
+    def __call__(self, state):
+        if self._keys is None:
+            self._keys = [ k for k, v in state.items() if np.ndim(v) == 0 ]
+        record = dict((k, _to_builtin(state.get(k))) for k in self._keys)
+        self._records.append(record)
+        if self._filename is not None:
+            self._buffer.append(record)
+            if len(self._buffer) >= self._flush_every:
+                self.flush()
+        return False
+    
+    def flush(self):
+        """
+        Write buffered records to the output file.
+        """
+        if self._filename is None or not self._buffer:
+            return
+        with open(self._filename, "a") as f:
+            if self._fmt == "jsonl":
+                for record in self._buffer:
+                    f.write(json.dumps(record) + "\n")
+            else:
+                if self._header:
+                    f.write(",".join(self._keys) + "\n")
+                    self._header = False
+                for record in self._buffer:
+                    f.write(",".join("" if record[k] is None else str(record[k])
+                                     for k in self._keys) + "\n")
+        self._buffer = []
+    
+    def clear(self):
+        """
+        Flush buffered records and empty the history.
+        """
+        self.flush()
+        self._records = []
+    
+    @property
+    def history(self):
+        """
+        dict
+        Recorded entries as arrays of length the number of iterations.
+        """
+        keys = self._keys if self._keys is not None else []
+        return dict((k, np.array([ r[k] for r in self._records ])) for k in keys)
+
+
+def _to_builtin(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    else:
+        return value
@@ -0,0 +1,156 @@
+# -*- coding: utf-8 -*-
+
+"""
+Context of the objective function set up once per process instead of being
+shipped with every evaluation.
+
+Author: Keurfon Luu <keurfon.luu@mines-paristech.fr>
+License: MIT
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+import numpy as np
+import os
+import shutil
+import tempfile
+
+__all__ = [ "WorkerContext" ]
+
+
+class WorkerContext:
+    """
+    Worker-resident context of the objective function.
+    
+    The context is a set of keyword arguments of the objective function
+    (observed data, velocity grids...) that is built once per process: in
+    every worker of a process backend, on every MPI rank, or once in the
+    main process otherwise. Evaluations only reference it, so that the cost
+    of dispatching a model does not depend on the size of the context.
+    
+    Arrays are written once to .npy files by the process that creates the
+    context and memory-mapped read-only by every process, so that processes
+    on the same node share a single copy through the page cache. With MPI,
+    the arrays only need to be given on the root process, the other ranks
+    receive the names of the files.
+    
+    Parameters
+    ----------
+    setup : callable or None, optional, default None
+        Function without argument returning a dictionary of keyword
+        arguments of func. Called once per process, on the first evaluation
+        (or when the optimization starts with MPI).
+    arrays : dict or None, optional, default None
+        Arrays passed to func as keyword arguments, given as ndarrays (written
+        to 'directory') or as names of existing .npy files.
+    directory : str or None, optional, default None
+        Directory of the memory-mapped files. It must be shared by all the
+        nodes with MPI. If None, a temporary directory is created.
+    """
+    
+    def __init__(self, setup = None, arrays = None, directory = None):
+        # Check inputs
+        if setup is not None and not hasattr(setup, "__call__"):
+            raise ValueError("setup must be None or a callable")
+        else:
+            self._setup = setup
+        if arrays is not None and not isinstance(arrays, dict):
+            raise ValueError("arrays must be None or a dictionary")
+        if directory is not None and not isinstance(directory, str):
+            raise ValueError("directory must be None or a string")
+        
+        # Write the arrays to memory-mapped files
+        self._pid = os.getpid()
+        self._files = []
+        self._tmpdir = None
+        self._paths = {}
+        for name, value in (arrays or {}).items():
+            if isinstance(value, str):
+                self._paths[name] = value
+            elif isinstance(value, np.ndarray):
+                if directory is None and self._tmpdir is None:
+                    self._tmpdir = tempfile.mkdtemp(prefix = "stochopy-")
+                path = os.path.join(directory or self._tmpdir, "%s.npy" % name)
+                np.save(path, value)
+                self._paths[name] = path
+                self._files.append(path)
+            else:
+                raise ValueError("arrays must contain ndarrays or file names, got %s for %s"
+                                 % (type(value).__name__, name))
+        self._kwargs = None
+        self._kwargs_pid = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *args):
+        self.close()
+    
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+    
+    def load(self, comm = None):
+        """
+        Build the context in the current process if it is not built yet.
+        
+        Parameters
+        ----------
+        comm : MPI.Comm or None, optional, default None
+            Communicator of the processes. If not None, must be called by
+            every process, the names of the files are broadcast from the root
+            process.
+        
+        Returns
+        -------
+        kwargs : dict
+            Keyword arguments of func.
+        """
+        if comm is not None:
+            paths = comm.bcast(self._paths if comm.Get_rank() == 0 else None, root = 0)
+            if paths != self._paths:
+                self._paths = paths
+                self._kwargs = None
+        
+        # Forked workers build their own context
+        if self._kwargs is not None and self._kwargs_pid == os.getpid():
+            return self._kwargs
+        kwargs = dict((name, np.load(path, mmap_mode = "r")) for name, path in self._paths.items())
+        if self._setup is not None:
+            kwargs.update(self._setup())
+        self._kwargs = kwargs
+        self._kwargs_pid = os.getpid()
+        return kwargs
+    
+    def close(self):
+        """
+        Release the context and remove the files written by this process.
+        """
+        self._kwargs = None
+        if os.getpid() != self._pid:
+            return
+        for path in self._files:
+            if os.path.exists(path):
+                os.remove(path)
+        self._files = []
+        if self._tmpdir is not None:
+            shutil.rmtree(self._tmpdir, ignore_errors = True)
+            self._tmpdir = None
+    
+    @property
+    def kwargs(self):
+        """
+        dict
+        Keyword arguments of func in the current process, built on first
+        access.
+        """
+        return self.load()
+    
+    @property
+    def paths(self):
+        """
+        dict
+        Names of the memory-mapped files of the arrays.
+        """
+        return dict(self._paths)
@@ -0,0 +1,520 @@
+# -*- coding: utf-8 -*-
+
+"""
+Evaluation backend distributing the models over worker processes that
+connect to the optimizer through TCP, on any host, without MPI.
+
+Author: Keurfon Luu <keurfon.luu@mines-paristech.fr>
+License: MIT
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+import numpy as np
+import hmac
+import selectors
+import socket
+import struct
+import threading
+import traceback
+from collections import deque
+from time import monotonic, sleep
+from .scheduling import get_cost_model, longest_first
+
+__all__ = [ "TCPBackend", "run_worker" ]
+
+
+# Frame header: kind, task identifier and length of the payload
+_HEADER = struct.Struct("!cQI")
+_N_DIM = struct.Struct("!I")
+_FLOAT64 = np.dtype("<f8")
+
+_HELLO = b"H"       # worker -> server, payload is the authentication key
+_WELCOME = b"W"     # server -> worker, authentication key accepted
+_DENIED = b"D"      # server -> worker, authentication key rejected
+_TASK = b"T"        # server -> worker, payload is n_dim and models
+_RESULT = b"R"      # worker -> server, payload is the objective function values
+_ERROR = b"X"       # worker -> server, payload is the traceback
+_HEARTBEAT = b"B"   # both ways
+_QUIT = b"Q"        # server -> worker
+
+
+class _Connection:
+    """
+    Connection of a worker on the server side.
+    """
+    
+    def __init__(self, sock, address):
+        self.sock = sock
+        self.address = address
+        self.buffer = bytearray()
+        self.ready = False
+        self.task = None
+        self.sent = 0.
+        self.last_recv = self.last_send = monotonic()
+    
+    def send(self, kind, task_id = 0, payload = b""):
+        self.sock.sendall(_HEADER.pack(kind, task_id, len(payload)))
+        if payload:
+            self.sock.sendall(payload)
+        self.last_send = monotonic()
+    
+    def frames(self):
+        while len(self.buffer) >= _HEADER.size:
+            kind, task_id, length = _HEADER.unpack_from(self.buffer)
+            end = _HEADER.size + length
+            if len(self.buffer) < end:
+                break
+            payload = bytes(self.buffer[_HEADER.size:end])
+            del self.buffer[:end]
+            yield kind, task_id, payload
+
+
+class TCPBackend:
+    """
+    TCP worker pool backend.
+    
+    The backend listens on a TCP port and worker processes started with
+    run_worker on any host connect to it. Models are sent to the workers as
+    raw float64 buffers in chunks, and workers get a new chunk as soon as
+    they return the objective function values of the previous one. Only the
+    standard library is used.
+    
+    Workers and server exchange heartbeats. A worker that disconnects or
+    stays silent for longer than 'timeout' is dropped and its chunk is
+    requeued, and workers reconnect automatically when the connection is
+    lost. Evaluations wait until at least one worker is connected.
+    
+    Parameters
+    ----------
+    host : str, optional, default '127.0.0.1'
+        Interface the server listens on. Use '0.0.0.0' to accept workers
+        from other hosts.
+    port : int, optional, default 0
+        Port the server listens on. If 0, a free port is chosen (see
+        attribute 'address').
+    chunksize : int, optional, default 1
+        Number of models sent to a worker at once.
+    authkey : bytes or None, optional, default None
+        Key that workers must send to be accepted.
+    heartbeat : scalar, optional, default 1.
+        Interval between heartbeats in seconds.
+    timeout : scalar, optional, default 10.
+        Time without message after which a worker is considered lost, in
+        seconds.
+    cost : {None, 'online'}, callable or CostModel, optional, default None
+        Cost of the objective function. If not None, models are dispatched
+        longest first.
+        - 'online', costs learnt from past evaluation times (round trip
+          time of the chunks).
+        - callable, function returning the estimated cost of a model.
+    """
+    
+    def __init__(self, host = "127.0.0.1", port = 0, chunksize = 1, authkey = None,
+                 heartbeat = 1., timeout = 10., cost = None):
+        if not isinstance(port, int) or port < 0:
+            raise ValueError("port must be a positive integer, got %s" % port)
+        if not isinstance(chunksize, int) or chunksize < 1:
+            raise ValueError("chunksize must be a positive integer, got %s" % chunksize)
+        else:
+            self._chunksize = chunksize
+        if authkey is not None and not isinstance(authkey, bytes):
+            raise ValueError("authkey must be None or bytes")
+        else:
+            self._authkey = authkey if authkey is not None else b""
+        if not isinstance(heartbeat, (float, int)) or heartbeat <= 0.:
+            raise ValueError("heartbeat must be positive, got %s" % heartbeat)
+        else:
+            self._heartbeat = heartbeat
+        if not isinstance(timeout, (float, int)) or timeout <= heartbeat:
+            raise ValueError("timeout must be greater than heartbeat, got %s" % timeout)
+        else:
+            self._timeout = timeout
+        self._cost = get_cost_model(cost)
+        self._host = host
+        self._port = port
+        self._thread = None
+        self._lock = threading.Condition()
+        self._connections = {}
+        self._n_requeued = 0
+        self._last_id = 0
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *args):
+        self.close()
+    
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+    
+    def start(self, func = None):
+        """
+        Start the server if it is not running yet. The objective function is
+        the one given to the workers.
+        
+        Parameters
+        ----------
+        func : callable or None, optional, default None
+            Ignored.
+        """
+        if self._thread is not None:
+            return
+        self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._server.bind((self._host, self._port))
+        self._server.listen()
+        self._server.setblocking(False)
+        self._wakeup_r, self._wakeup_w = socket.socketpair()
+        self._wakeup_r.setblocking(False)
+        self._selector = selectors.DefaultSelector()
+        self._selector.register(self._server, selectors.EVENT_READ)
+        self._selector.register(self._wakeup_r, selectors.EVENT_READ)
+        self._pending = deque()
+        self._tasks = {}
+        self._running = True
+        self._thread = threading.Thread(target = self._serve, daemon = True)
+        self._thread.start()
+    
+    def evaluate(self, models):
+        """
+        Evaluate a batch of models.
+        
+        Parameters
+        ----------
+        models : ndarray of shape (n_models, n_dim)
+            Models to evaluate.
+        
+        Returns
+        -------
+        fit : ndarray of shape (n_models)
+            Objective function values.
+        """
+        n, n_dim = models.shape
+        fit = np.zeros(n)
+        if n == 0:
+            return fit
+        if self._thread is None:
+            self.start()
+        models = np.ascontiguousarray(models, dtype = _FLOAT64)
+        if self._cost is not None:
+            chunks = longest_first(self._cost(models), 1, self._chunksize)
+        else:
+            chunks = [ slice(i, min(i + self._chunksize, n)) for i in range(0, n, self._chunksize) ]
+        with self._lock:
+            self._fit = fit
+            self._times = np.zeros(n)
+            self._error = None
+            self._n_left = 0
+            for idx in chunks:
+                payload = _N_DIM.pack(n_dim) + models[idx].tobytes()
+                self._last_id += 1
+                task_id = self._last_id
+                self._tasks[task_id] = (idx, payload)
+                self._pending.append(task_id)
+                self._n_left += 1
+        self._wakeup()
+        
+        # Wait for all the chunks or the first error
+        with self._lock:
+            while self._n_left and self._error is None:
+                self._lock.wait()
+            self._pending.clear()
+            self._tasks.clear()
+            error = self._error
+        if error is not None:
+            raise RuntimeError("objective function failed in worker process:\n%s" % error)
+        if self._cost is not None:
+            self._cost.update(models, self._times)
+        return fit
+    
+    def close(self):
+        """
+        Stop the server and ask the workers to quit.
+        """
+        if self._thread is None:
+            return
+        self._running = False
+        self._wakeup()
+        self._thread.join()
+        self._thread = None
+    
+    def _wakeup(self):
+        try:
+            self._wakeup_w.send(b"\0")
+        except OSError:
+            pass
+    
+    def _serve(self):
+        try:
+            while self._running:
+                for key, mask in self._selector.select(timeout = self._heartbeat / 2.):
+                    if key.fileobj is self._server:
+                        self._accept()
+                    elif key.fileobj is self._wakeup_r:
+                        try:
+                            self._wakeup_r.recv(4096)
+                        except OSError:
+                            pass
+                    else:
+                        self._read(key.data)
+                self._check()
+                self._dispatch()
+        finally:
+            for conn in list(self._connections.values()):
+                try:
+                    conn.send(_QUIT)
+                except OSError:
+                    pass
+                self._drop(conn, requeue = False)
+            self._selector.close()
+            self._server.close()
+            self._wakeup_r.close()
+            self._wakeup_w.close()
+    
+    def _accept(self):
+        try:
+            sock, address = self._server.accept()
+        except OSError:
+            return
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.settimeout(self._timeout)
+        conn = _Connection(sock, address)
+        self._connections[sock] = conn
+        self._selector.register(sock, selectors.EVENT_READ, conn)
+    
+    def _read(self, conn):
+        try:
+            data = conn.sock.recv(1 << 20)
+        except OSError:
+            data = b""
+        if not data:
+            self._drop(conn)
+            return
+        conn.buffer += data
+        conn.last_recv = monotonic()
+        for kind, task_id, payload in conn.frames():
+            if kind == _HELLO:
+                accepted = hmac.compare_digest(payload, self._authkey)
+                try:
+                    conn.send(_WELCOME if accepted else _DENIED)
+                except OSError:
+                    accepted = False
+                if not accepted:
+                    self._drop(conn)
+                    return
+                conn.ready = True
+            elif not conn.ready:
+                self._drop(conn)
+                return
+            elif kind in [ _RESULT, _ERROR ]:
+                conn.task = None
+                self._done(kind, task_id, payload, monotonic() - conn.sent)
+    
+    def _done(self, kind, task_id, payload, elapsed):
+        with self._lock:
+            # Results of requeued chunks may arrive twice
+            task = self._tasks.pop(task_id, None)
+            if task is None:
+                return
+            if kind == _ERROR:
+                self._error = payload.decode()
+            else:
+                idx, _ = task
+                values = np.frombuffer(payload, dtype = _FLOAT64)
+                self._fit[idx] = values
+                self._times[idx] = elapsed / len(values)
+                self._n_left -= 1
+            self._lock.notify_all()
+    
+    def _check(self):
+        now = monotonic()
+        for conn in list(self._connections.values()):
+            if now - conn.last_recv > self._timeout:
+                self._drop(conn)
+            elif now - conn.last_send > self._heartbeat:
+                try:
+                    conn.send(_HEARTBEAT)
+                except OSError:
+                    self._drop(conn)
+    
+    def _dispatch(self):
+        for conn in list(self._connections.values()):
+            if not conn.ready or conn.task is not None:
+                continue
+            with self._lock:
+                task_id = None
+                while self._pending and task_id not in self._tasks:
+                    task_id = self._pending.popleft()
+                if task_id not in self._tasks:
+                    break
+                payload = self._tasks[task_id][1]
+            try:
+                conn.task = task_id
+                conn.sent = monotonic()
+                conn.send(_TASK, task_id, payload)
+            except OSError:
+                self._drop(conn)
+    
+    def _drop(self, conn, requeue = True):
+        if conn.sock not in self._connections:
+            return
+        del self._connections[conn.sock]
+        self._selector.unregister(conn.sock)
+        conn.sock.close()
+        if requeue and conn.task is not None:
+            with self._lock:
+                if conn.task in self._tasks:
+                    self._pending.appendleft(conn.task)
+                    self._n_requeued += 1
+    
+    @property
+    def address(self):
+        """
+        tuple
+        Host and port the server listens on (None before start).
+        """
+        return self._server.getsockname() if self._thread is not None else None
+    
+    @property
+    def n_workers(self):
+        """
+        int
+        Number of connected workers.
+        """
+        return sum(conn.ready for conn in list(self._connections.values()))
+    
+    @property
+    def n_requeued(self):
+        """
+        int
+        Number of chunks sent again after their worker was lost.
+        """
+        return self._n_requeued
+
+
+def run_worker(func, host, port, authkey = None, heartbeat = 1., timeout = 10.,
+               reconnect = 60., context = None, args = (), kwargs = {}):
+    """
+    Run a worker of a TCPBackend until the server asks it to quit or cannot
+    be reached for longer than 'reconnect' seconds. The worker waits
+    'heartbeat' seconds between two connection attempts, and raises a
+    RuntimeError if the server rejects its authentication key.
+    
+    Parameters
+    ----------
+    func : callable
+        Objective function.
+    host : str
+        Host of the server.
+    port : int
+        Port of the server.
+    authkey : bytes or None, optional, default None
+        Key of the server.
+    heartbeat : scalar, optional, default 1.
+        Interval between heartbeats in seconds.
+    timeout : scalar, optional, default 10.
+        Time without message after which the server is considered lost, in
+        seconds.
+    reconnect : scalar, optional, default 60.
+        Time during which the worker tries to reconnect to the server, in
+        seconds.
+    context : WorkerContext or None, optional, default None
+        Heavy keyword arguments of func, built once by the worker.
+    args : list or tuple, optional, default ()
+        Arguments passed to func.
+    kwargs : dict, optional, default {}
+        Keyworded arguments passed to func.
+    
+    Returns
+    -------
+    n_eval : int
+        Number of models evaluated by the worker.
+    """
+    if not hasattr(func, "__call__"):
+        raise ValueError("func is not callable")
+    if context is not None:
+        kwargs = dict(kwargs, **context.kwargs)
+    n_eval = 0
+    lost = monotonic()
+    while True:
+        try:
+            sock = socket.create_connection((host, port), timeout = timeout)
+        except OSError:
+            pass
+        else:
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            lock = threading.Lock()
+            stop = threading.Event()
+            
+            def send(kind, task_id = 0, payload = b""):
+                with lock:
+                    sock.sendall(_HEADER.pack(kind, task_id, len(payload)))
+                    if payload:
+                        sock.sendall(payload)
+            
+            def recv():
+                kind, task_id, length = _HEADER.unpack(_recv_exact(sock, _HEADER.size))
+                return kind, task_id, _recv_exact(sock, length)
+            
+            def beat():
+                while not stop.wait(heartbeat):
+                    try:
+                        send(_HEARTBEAT)
+                    except OSError:
+                        break
+            
+            thread = threading.Thread(target = beat, daemon = True)
+            try:
+                # Authentication
+                send(_HELLO, 0, authkey if authkey is not None else b"")
+                kind = _HEARTBEAT
+                while kind == _HEARTBEAT:
+                    kind, _, _ = recv()
+                if kind == _DENIED:
+                    raise RuntimeError("worker rejected by the server %s:%d, check authkey" % (host, port))
+                elif kind == _QUIT:
+                    return n_eval
+                lost = None
+                
+                thread.start()
+                while True:
+                    kind, task_id, payload = recv()
+                    if kind == _QUIT:
+                        return n_eval
+                    elif kind == _TASK:
+                        n_dim = _N_DIM.unpack_from(payload)[0]
+                        models = np.frombuffer(payload, dtype = _FLOAT64, offset = _N_DIM.size).reshape((-1, n_dim))
+                        try:
+                            fit = np.array([ func(x, *args, **kwargs) for x in models ], dtype = _FLOAT64)
+                        except Exception:
+                            send(_ERROR, task_id, traceback.format_exc().encode())
+                        else:
+                            send(_RESULT, task_id, fit.tobytes())
+                            n_eval += len(models)
+            except (OSError, EOFError):
+                pass
+            finally:
+                stop.set()
+                sock.close()
+        
+        # Connection failed or lost, retry until the server cannot be
+        # reached for 'reconnect' seconds
+        if lost is None:
+            lost = monotonic()
+        if monotonic() - lost > reconnect:
+            return n_eval
+        sleep(min(heartbeat, reconnect))
+
+def _recv_exact(sock, n):
+    buffer = bytearray(n)
+    view = memoryview(buffer)
+    i = 0
+    while i < n:
+        k = sock.recv_into(view[i:])
+        if not k:
+            raise EOFError("connection closed")
+        i += k
+    return bytes(buffer)
@@ -10,7 +10,19 @@ License: MIT
 
 from __future__ import absolute_import, division, print_function, unicode_literals
 import numpy as np
+import asyncio
+import inspect
+from time import perf_counter, time
 from warnings import warn
+from .cache import EvaluationCache
+from .surrogate import RBFSurrogate, GaussianProcessSurrogate
+from .profiler import PhaseProfiler, PHASES
+from .backends import AsyncBackend, get_backend
+from .fault import FaultPolicy
+from .snapshot import Snapshot
+from .stopping import StoppingCriterion, AnyOf, EqualFunValues, TolFun
+from .task_farm import TaskFarm
+from .context import WorkerContext
 try:
     from mpi4py import MPI
 except ImportError:
@@ -50,16 +62,74 @@ class Evolutionary:
         Minimum change in best individual.
     eps2 : scalar, optional, default 1e-8
         Minimum objective function precision.
+    max_eval : int or None, optional, default None
+        Maximum number of function evaluations. Required when restart is not
+        None if max_time is not defined.
+    max_time : scalar or None, optional, default None
+        Maximum wall-clock time in seconds. It is checked after each
+        iteration, or after each function evaluation if the population is
+        not synchronized.
     constrain : bool, optional, default True
         Constrain to search space if an individual leave the search space.
-    snap : bool, optional, default False
+    snap : bool or Snapshot, optional, default False
         Save the positions and energy of all individuals at each iteration
-        in a 3-D array with shape (n_dim, popsize, max_iter) and 2-D array
+        in a 3-D array with shape (popsize, n_dim, max_iter) and 2-D array
         with shape (popsize, max_iter) in attributes 'models' and 'energy'.
+        Pass a Snapshot to save in lower precision, every few iterations or
+        only the best individuals.
     random_state : int, optional, default None
         Seed for random number generator.
-    mpi : bool, default False
-        Enable MPI parallelization.
+    mpi : bool or TaskFarm, default False
+        Enable MPI parallelization. If True, the models of a generation are
+        split round-robin between the processes. Pass a TaskFarm to balance
+        the load dynamically when the cost of func varies between models, or
+        to evaluate each model with a group of processes whose communicator
+        is passed to func as keyword argument 'comm'.
+    cache : bool or EvaluationCache, optional, default None
+        Cache of objective function values. Models already evaluated are
+        looked up in the cache instead of being evaluated again. If True, a
+        default exact-match cache is used.
+    surrogate : {None, 'rbf', 'gp'} or surrogate object, optional, default None
+        Surrogate model used to pre-screen candidates at each generation.
+        Only the most promising candidates are evaluated with func.
+        - 'rbf', RBFSurrogate with default parameters.
+        - 'gp', GaussianProcessSurrogate with default parameters.
+    callback : callable or list of callables, optional, default None
+        Function(s) called at the end of each iteration with a dictionary
+        describing the state of the optimizer (keys 'solver', 'it', 'n_eval',
+        'gfit', 'xopt', 'spread', 'n_restart', 'time_serial', 'time_parallel',
+        and 'sigma' for CMA-ES and VD-CMA). The optimization stops if one of
+        them returns True. Only called on the root process with MPI.
+    profile : bool, optional, default False
+        Time each phase of every iteration (sampling, constraint, evaluation,
+        selection, covariance, eigendecomposition, snapshot). Timings are
+        stored in attribute 'profile'.
+    backend : {None, 'processes', 'threads'} or backend object, optional, default None
+        Evaluate the models of a generation in parallel on a single machine.
+        Cannot be used together with MPI.
+        - 'processes', ProcessBackend with one worker per CPU. Models are
+          passed to the workers through shared memory.
+        - 'threads', ThreadBackend with one thread per CPU. Only beneficial
+          if func releases the GIL (e.g. NumPy or compiled extensions).
+        A TCPBackend evaluates the models on workers started with
+        run_worker on other hosts.
+    fault_policy : bool or FaultPolicy, optional, default None
+        Retry failed evaluations, stop hanging evaluations after a timeout and
+        give a penalty fitness to models whose evaluation fails or returns
+        NaN or inf. If True, a default policy without timeout nor retry and
+        with an infinite penalty is used. Incidents are stored in attribute
+        'incidents'.
+    stopping : StoppingCriterion, list of StoppingCriterion or None, optional, default None
+        Additional stopping criteria updated at each iteration with the
+        objective function values of the population (e.g. Stagnation,
+        Target, or combinations with | and &). The optimization stops as
+        soon as one of them is met. With restarts, restartable criteria
+        (Stagnation, TolFun, EqualFunValues) restart the solver while the
+        other criteria end the optimization.
+    context : WorkerContext or None, optional, default None
+        Heavy keyword arguments of func (observed data, grids...) built once
+        per process (worker of a process backend or MPI rank) instead of
+        being shipped with the evaluations.
     args : list or tuple, optional, default ()
         Arguments passed to func.
     kwargs : dict, optional, default {}
@@ -69,14 +139,18 @@ class Evolutionary:
     _ATTRIBUTES = [ "solution", "fitness", "n_iter", "n_eval", "flag" ]
     
     def __init__(self, func, lower = None, upper = None, n_dim = 1,
-                 popsize = 10, max_iter = 100, eps1 = 1e-8, eps2 = 1e-8,
-                 constrain = True, snap = False, random_state = None, mpi = False,
+                 popsize = 10, max_iter = 100, eps1 = 1e-8, eps2 = 1e-8, max_eval = None,
+                 max_time = None, constrain = True, snap = False, random_state = None, mpi = False,
+                 cache = None, surrogate = None, callback = None, profile = False,
+                 backend = None, fault_policy = None, stopping = None, context = None,
                  args = (), kwargs = {}):
         # Check inputs
         if not hasattr(func, "__call__"):
             raise ValueError("func is not callable")
         else:
             self._func = lambda x: func(x, *args, **kwargs)
+            self._is_async = inspect.iscoroutinefunction(func) \
+                             or inspect.iscoroutinefunction(getattr(func, "__call__", None))
         if lower is None and upper is not None:
             raise ValueError("lower is not defined")
         elif upper is None and lower is not None:
@@ -109,22 +183,95 @@ class Evolutionary:
             raise ValueError("eps2 must be an integer or float, got %s" % eps2)
         else:
             self._eps2 = eps2
+        if max_eval is not None and (not isinstance(max_eval, int) or max_eval <= 0):
+            raise ValueError("max_eval must be a positive integer, got %s" % max_eval)
+        else:
+            self._max_eval = max_eval
+        if max_time is not None and (not isinstance(max_time, (float, int)) or max_time <= 0.):
+            raise ValueError("max_time must be positive, got %s" % max_time)
+        else:
+            self._max_time = max_time
         if not isinstance(constrain, bool):
             raise ValueError("constrain must be either True or False, got %s" % constrain)
         else:
             self._constrain = constrain
-        if not isinstance(snap, bool):
-            raise ValueError("snap must be either True or False, got %s")
+        if not isinstance(snap, (bool, Snapshot)):
+            raise ValueError("snap must be either True, False or a Snapshot, got %s" % snap)
+        elif snap is True:
+            self._snap = Snapshot()
+        elif snap is False:
+            self._snap = None
         else:
             self._snap = snap
         if random_state is not None and random_state >= 0:
             np.random.seed(random_state)
-        if not isinstance(mpi, bool):
-            raise ValueError("mpi must be either True or False, got %s" % mpi)
+        if not isinstance(mpi, (bool, TaskFarm)):
+            raise ValueError("mpi must be either True, False or a TaskFarm")
+        elif mpi is True:
+            self._farm = TaskFarm("static")
+        elif mpi is False:
+            self._farm = None
+        else:
+            self._farm = mpi
+        self._mpi = self._farm is not None
+        if self._mpi and not mpi_exist:
+            raise ValueError("mpi4py is not installed or not properly installed")
+        if context is not None and not isinstance(context, WorkerContext):
+            raise ValueError("context must be None or a WorkerContext")
+        else:
+            self._context = context
+        if self._context is not None or (self._mpi and self._farm.group_size is not None):
+            self._func = lambda x: func(x, *args, **kwargs, **self._process_kwargs())
+        if cache is not None and not isinstance(cache, (bool, EvaluationCache)):
+            raise ValueError("cache must be either True, False or an EvaluationCache")
+        elif cache is True:
+            self._cache = EvaluationCache()
+        elif cache is False:
+            self._cache = None
+        else:
+            self._cache = cache
+        if surrogate is None or isinstance(surrogate, RBFSurrogate):
+            self._surrogate = surrogate
+        elif surrogate == "rbf":
+            self._surrogate = RBFSurrogate()
+        elif surrogate == "gp":
+            self._surrogate = GaussianProcessSurrogate()
+        else:
+            raise ValueError("surrogate must be either None, 'rbf', 'gp' or a surrogate object")
+        if callback is None:
+            self._callbacks = []
+        elif hasattr(callback, "__call__"):
+            self._callbacks = [ callback ]
+        elif isinstance(callback, (list, tuple)) and all(hasattr(c, "__call__") for c in callback):
+            self._callbacks = list(callback)
+        else:
+            raise ValueError("callback must be a callable or a list of callables")
+        if not isinstance(profile, bool):
+            raise ValueError("profile must be either True or False, got %s" % profile)
+        else:
+            self._profile = profile
+        self._backend, self._own_backend = get_backend(backend)
+        if self._backend is not None and self._mpi:
+            raise ValueError("cannot use an evaluation backend with MPI")
+        if fault_policy is not None and not isinstance(fault_policy, (bool, FaultPolicy)):
+            raise ValueError("fault_policy must be either True, False or a FaultPolicy")
+        elif fault_policy is True:
+            self._fault_policy = FaultPolicy()
+        elif fault_policy is False:
+            self._fault_policy = None
         else:
-            self._mpi = mpi
-            if mpi and not mpi_exist:
-                raise ValueError("mpi4py is not installed or not properly installed")
+            self._fault_policy = fault_policy
+        if self._fault_policy is not None:
+            if self._is_async:
+                raise ValueError("fault_policy cannot be used with a coroutine function")
+            self._func = self._fault_policy.wrap(self._func)
+        if stopping is None or isinstance(stopping, StoppingCriterion):
+            self._stopping = stopping
+        elif isinstance(stopping, (list, tuple)) and stopping \
+            and all(isinstance(c, StoppingCriterion) for c in stopping):
+            self._stopping = AnyOf(stopping)
+        else:
+            raise ValueError("stopping must be a StoppingCriterion or a list of StoppingCriterion")
         if not isinstance(args, (list, tuple)):
             raise ValueError("args must be a list or a tuple")
         if not isinstance(kwargs, dict):
@@ -133,7 +280,7 @@ class Evolutionary:
     def __repr__(self):
         attributes = [ "%s: %s" % (attr.rjust(13), self._print_attr(attr))
                         for attr in self._ATTRIBUTES ]
-        if self._solver == "cpso":
+        if self._solver == "cpso" or self._restart is not None:
             attributes.append("%s: %s" % ("n_restart".rjust(13), self._print_attr("n_restart")))
         if self._mpi:
             attributes.append("%s: %s seconds" % ("t_serial".rjust(13), self._print_attr("t_serial")))
@@ -173,22 +320,27 @@ class Evolutionary:
     def optimize(self, solver = "cpso", xstart = None, sync = True,
                  w = 0.7298, c1 = 1.49618, c2 = 1.49618, gamma = 1.,
                  F = 0.5, CR = 0.1, strategy = "best2",
-                 sigma = 0.5, mu_perc = 0.5):
+                 sigma = 0.5, mu_perc = 0.5, restart = None, incpopsize = 2,
+                 groups = None):
         """
         Minimize an objective function using Differential Evolution (DE),
         Particle Swarm Optimization (PSO), Competitive Particle Swarm
         Optimization (CPSO), Covariance Matrix Adaptation - Evolution
-        Strategy (CMA-ES), or VD-CMA.
+        Strategy (CMA-ES), Cholesky-CMA-ES, VD-CMA, or Limited-Memory Matrix
+        Adaptation - Evolution Strategy (LM-MA-ES).
         
         Parameters
         ----------
-        solver : {'de', 'pso', 'cpso', 'cmaes', 'vdcma'}, default 'cpso'
+        solver : {'de', 'pso', 'cpso', 'cmaes', 'cholesky-cmaes', 'vdcma', 'lmmaes'}, default 'cpso'
             Optimization method.
             - 'de', Differential Evolution.
             - 'pso', Particle Swarm Optimization.
             - 'cpso', Competitive Particle Swarm Optimization.
             - 'cmaes', Covariance Matrix Adaptation - Evolution Strategy.
+            - 'cholesky-cmaes', CMA-ES updating a Cholesky factor of the
+              covariance matrix instead of decomposing it.
             - 'vdcma', VD-CMA.
+            - 'lmmaes', Limited-Memory Matrix Adaptation - Evolution Strategy.
         xstart : None or ndarray, optional, default None
             Initial positions of the population or mean (if solver = 'cmaes').
         sync : bool, optional, default True
@@ -214,10 +366,29 @@ class Evolutionary:
             - 'best1', mutate the best vector by adding one scaled difference vector.
             - 'best2', mutate the best vector by adding two scaled difference vectors.
         sigma : scalar, optional, default 0.5
-            Step size. Only used when solver = {'cmaes', 'vdcma'}.
+            Step size. Only used when solver = {'cmaes', 'cholesky-cmaes', 'vdcma', 'lmmaes'}.
         mu_perc : scalar, optional, default 0.5
             Number of parents as a percentage of population size. Only used
-            when solver = {'cmaes', 'vdcma'}.
+            when solver = {'cmaes', 'cholesky-cmaes', 'vdcma', 'lmmaes'}.
+        restart : {None, 'ipop', 'bipop'}, optional, default None
+            Restart strategy. The solver is restarted every time it stops
+            until 'max_eval' function evaluations are performed, 'max_time'
+            is reached, the fitness is lower than 'eps2' or a terminal
+            stopping criterion is met. Only used when
+            solver = {'cmaes', 'cholesky-cmaes', 'vdcma', 'lmmaes'}.
+            - 'ipop', restart with a population size increased by a factor
+              'incpopsize'.
+            - 'bipop', alternate restarts with large population sizes (as in
+              'ipop') and small population sizes with smaller step sizes.
+        incpopsize : int, optional, default 2
+            Population size multiplication factor between two restarts with
+            large population sizes. Only used when restart is not None.
+        groups : None or list of array_like, optional, default None
+            Groups of parameter indices, every index in [ 0, n_dim-1 ] must
+            belong to exactly one group. If given, the covariance matrix is
+            block diagonal with one block per group (covariances between
+            parameters of different groups are not adapted). Only used when
+            solver = 'cmaes'.
             
         Returns
         -------
@@ -258,33 +429,246 @@ class Evolutionary:
         Covariance Matrix Adaptation - Evolution Strategy:
         
         >>> xopt, gfit = ea.optimize(solver = "cmaes")
+        
+        CMA-ES with increasing population size restarts (requires max_eval):
+        
+        >>> ea = Evolutionary(f, lower = lower, upper = upper,
+                              popsize = popsize, max_eval = 100000)
+        >>> xopt, gfit = ea.optimize(solver = "cmaes", restart = "ipop")
+        
+        CMA-ES with one covariance block per group of parameters:
+        
+        >>> xopt, gfit = ea.optimize(solver = "cmaes", groups = [ [ 0, 1, 2 ], [ 3, 4 ] ])
         """
         # Check input
-        if not isinstance(solver, str) or solver not in [ "cpso", "pso", "de", "cmaes", "vdcma" ]:
-            raise ValueError("solver must either be 'cpso', 'pso', 'de', 'cmaes' or 'vdcma', got %s" % solver)
+        if self._is_async and not isinstance(self._backend, AsyncBackend):
+            raise ValueError("func is a coroutine function, use optimize_async")
+        if not isinstance(solver, str) or solver not in [ "cpso", "pso", "de", "cmaes", "cholesky-cmaes", "vdcma", "lmmaes" ]:
+            raise ValueError("solver must either be 'cpso', 'pso', 'de', 'cmaes', 'cholesky-cmaes', 'vdcma' or 'lmmaes', got %s" % solver)
         if not isinstance(sync, bool):
             raise ValueError("sync must either be True or False")
         if self._mpi and solver in [ "cpso", "pso", "de" ] and not sync:
             raise ValueError("cannot use MPI with asynchrone population")
+        if restart is not None and restart not in [ "ipop", "bipop" ]:
+            raise ValueError("restart must either be None, 'ipop' or 'bipop', got %s" % restart)
+        if restart is not None and solver not in [ "cmaes", "cholesky-cmaes", "vdcma", "lmmaes" ]:
+            raise ValueError("restart is only available for solver 'cmaes', 'cholesky-cmaes', 'vdcma' or 'lmmaes'")
+        if restart is not None and self._max_eval is None and self._max_time is None:
+            raise ValueError("max_eval or max_time must be defined when restart is not None")
+        if not isinstance(incpopsize, int) or incpopsize < 1:
+            raise ValueError("incpopsize must be a positive integer, got %s" % incpopsize)
+        if groups is not None and solver != "cmaes":
+            raise ValueError("groups is only available for solver 'cmaes'")
+        blocks = self._split_groups(groups) if groups is not None else None
         
         # Initialize
         self._solver = solver
+        self._restart = restart
+        self._blocks = blocks
+        self._start_time = time()
         self._n_eval = 0
         self._n_restart = 0
-        self._init_models()
+        if self._surrogate is not None:
+            self._surrogate.reset()
+        self._snapshot = None
         self._mu_scale = 0.5 * (self._upper + self._lower)
         self._std_scale = 0.5 * (self._upper - self._lower)
         if self._mpi:
             self._mpi_comm = MPI.COMM_WORLD
             self._mpi_rank = self._mpi_comm.Get_rank()
             self._mpi_size = self._mpi_comm.Get_size()
-            self._time_serial = np.zeros(self._max_iter)
-            self._time_parallel = np.zeros(self._max_iter)
+            self._farm.start(self._mpi_comm)
+            if self._context is not None:
+                self._context.load(self._mpi_comm)
         else:
             self._mpi_rank = 0
             self._mpi_size = 1
+        self._time_serial = np.zeros(self._max_iter)
+        self._time_parallel = np.zeros(self._max_iter)
+        self._profiler = PhaseProfiler(self._max_iter) if self._profile else None
+        if self._backend is not None:
+            self._backend.start(self._func)
+        
+        if self._stopping is not None:
+            self._stopping.reset()
         
         # Solve
+        try:
+            xopt, gfit = self._solve(solver, xstart, sync, w, c1, c2, gamma, F, CR, strategy,
+                                     sigma, mu_perc, restart, incpopsize)
+        finally:
+            if self._own_backend:
+                self._backend.close()
+        for callback in self._callbacks:
+            if hasattr(callback, "flush"):
+                callback.flush()
+        return xopt, gfit
+    
+    async def optimize_async(self, max_concurrency = None, **kwargs):
+        """
+        Coroutine version of 'optimize' for I/O-bound objective functions.
+        
+        func must be a coroutine function (async def). The optimizer runs
+        in a separate thread while the models of each batch are evaluated
+        concurrently on the running event loop.
+        
+        Parameters
+        ----------
+        max_concurrency : int or None, optional, default None
+            Maximum number of concurrent evaluations. If None, all the models
+            of a batch are evaluated concurrently.
+        **kwargs
+            Keyworded arguments passed to 'optimize'.
+        
+        Returns
+        -------
+        xopt : ndarray
+            Optimal solution found by the optimizer.
+        gfit : scalar
+            Objective function value of the optimal solution.
+        
+        Examples
+        --------
+        >>> import asyncio
+        >>> async def f(x):
+                await asyncio.sleep(0.01)
+                return np.sum(x**2)
+        >>> ea = Evolutionary(f, n_dim = 5, popsize = 100)
+        >>> xopt, gfit = asyncio.run(ea.optimize_async(max_concurrency = 50,
+                                                       solver = "cmaes"))
+        """
+        if not self._is_async:
+            raise ValueError("func must be a coroutine function, use optimize")
+        if self._backend is not None:
+            raise ValueError("cannot use optimize_async with an evaluation backend")
+        if self._mpi:
+            raise ValueError("cannot use optimize_async with MPI")
+        backend = AsyncBackend(max_concurrency)
+        try:
+            self._backend = backend
+            return await asyncio.get_running_loop().run_in_executor(None, lambda: self.optimize(**kwargs))
+        finally:
+            self._backend = None
+    
+    def estimate_memory(self, solver = "cpso", restart = None, incpopsize = 2,
+                        mu_perc = 0.5, max_popsize = None, groups = None, detail = False):
+        """
+        Estimate the peak memory used by 'optimize' with this configuration.
+        
+        The estimate covers the arrays allocated by the solver (population,
+        work arrays, covariance matrix and its eigendecomposition), the saved
+        generations, the timers, the evaluation cache and the surrogate. The
+        memory used by the objective function is not included. With MPI, it
+        is the memory of each process.
+        
+        Parameters
+        ----------
+        solver : {'cpso', 'pso', 'de', 'cmaes', 'cholesky-cmaes', 'vdcma', 'lmmaes'}, default 'cpso'
+            Evolutionary Algorithm.
+        restart : None or {'ipop', 'bipop'}, default None
+            Restart strategy for CMA-ES, Cholesky-CMA-ES, VD-CMA and LM-MA-ES.
+        incpopsize : int, optional, default 2
+            Factor by which the population size is increased at each
+            restart.
+        mu_perc : scalar, optional, default 0.5
+            Number of parents as a percentage of population size. Only used
+            when solver = {'cmaes', 'cholesky-cmaes', 'vdcma', 'lmmaes'}.
+        max_popsize : int or None, optional, default None
+            Largest population size of the restarted runs. If None, largest
+            population size whose first generation fits in max_eval. Only used
+            when restart is not None.
+        groups : None or list of array_like, optional, default None
+            Groups of parameter indices of the block diagonal covariance
+            matrix. Only used when solver = 'cmaes'.
+        detail : bool, optional, default False
+            Return the memory of each component.
+        
+        Returns
+        -------
+        nbytes : int or dict
+            Estimated peak memory in bytes. If detail = True, dict with keys
+            'population', 'covariance', 'history', 'buffers', 'cache',
+            'surrogate' and 'total'.
+        
+        Examples
+        --------
+        >>> ea = Evolutionary(f, n_dim = 1000, popsize = 100, max_iter = 10000)
+        >>> ea.estimate_memory(solver = "cmaes")
+        """
+        if solver not in [ "cpso", "pso", "de", "cmaes", "cholesky-cmaes", "vdcma", "lmmaes" ]:
+            raise ValueError("solver must either be 'cpso', 'pso', 'de', 'cmaes', 'cholesky-cmaes', 'vdcma' or 'lmmaes', got %s" % solver)
+        if restart is not None and restart not in [ "ipop", "bipop" ]:
+            raise ValueError("restart must either be None, 'ipop' or 'bipop', got %s" % restart)
+        if restart is not None and solver not in [ "cmaes", "cholesky-cmaes", "vdcma", "lmmaes" ]:
+            raise ValueError("restart is only available for solver 'cmaes', 'cholesky-cmaes', 'vdcma' or 'lmmaes'")
+        if not isinstance(incpopsize, int) or incpopsize < 1:
+            raise ValueError("incpopsize must be a positive integer, got %s" % incpopsize)
+        if max_popsize is not None and (not isinstance(max_popsize, int) or max_popsize < 1):
+            raise ValueError("max_popsize must be None or a positive integer, got %s" % max_popsize)
+        if groups is not None and solver != "cmaes":
+            raise ValueError("groups is only available for solver 'cmaes'")
+        
+        # Largest population size
+        n = self._n_dim
+        if solver == "de":
+            popsize = max(self._popsize, 6)
+        elif solver in [ "cmaes", "cholesky-cmaes", "vdcma", "lmmaes" ]:
+            popsize = max(self._popsize, 4)
+        else:
+            popsize = self._popsize
+        if restart is not None:
+            if max_popsize is not None:
+                popsize = max(popsize, max_popsize)
+            elif self._max_eval is not None and incpopsize > 1:
+                while popsize * incpopsize <= self._max_eval:
+                    popsize *= incpopsize
+            else:
+                raise ValueError("max_popsize must be given when restart is not None and max_eval is None")
+        mu = int(mu_perc * popsize)
+        
+        # Solver arrays (evaluated batch and random draws included)
+        nbytes = dict(population = 0, covariance = 0, history = 0, buffers = 0,
+                      cache = 0, surrogate = 0)
+        if solver == "de":
+            nbytes["population"] = 8 * 8 * popsize * n + popsize * n + 16 * popsize * (popsize - 1)
+        elif solver in [ "cpso", "pso" ]:
+            nbytes["population"] = 8 * 9 * popsize * n + 2 * popsize * n
+        elif solver == "cmaes" and groups is not None:
+            nbytes["population"] = 8 * ( 7 * popsize * n + 3 * mu * n )
+            nbytes["covariance"] = 8 * 6 * sum(idx.size * idx.shape[1] for idx in self._split_groups(groups))
+        elif solver == "cmaes":
+            nbytes["population"] = 8 * ( 7 * popsize * n + 3 * mu * n )
+            nbytes["covariance"] = 8 * 8 * n**2 + n**2
+        elif solver == "cholesky-cmaes":
+            nbytes["population"] = 8 * ( 6 * popsize * n + 8 * ( mu + 1 ) * n )
+            nbytes["covariance"] = 8 * 3 * n**2
+        elif solver == "vdcma":
+            nbytes["population"] = 8 * ( 8 * popsize * n + 2 * mu * n )
+            nbytes["covariance"] = 8 * 16 * n
+        elif solver == "lmmaes":
+            nbytes["population"] = 8 * ( 8 * popsize * n + 2 * mu * n )
+            nbytes["covariance"] = 8 * min(n, 4 + int(3. * np.log(n))) * n
+        
+        # Saved generations, the best run is kept while the next one runs
+        if self._snap:
+            nbytes["history"] = self._snap.estimate_memory(popsize, n, self._max_iter,
+                                                           means = solver in [ "cmaes", "cholesky-cmaes", "vdcma", "lmmaes" ])
+            if restart is not None:
+                nbytes["history"] *= 2
+        
+        # Timers and stopping criteria
+        n_timers = 3 + len(PHASES) if self._profile else 3
+        nbytes["buffers"] = 8 * n_timers * self._max_iter
+        if self._cache is not None:
+            nbytes["cache"] = self._cache.estimate_memory(n)
+        if self._surrogate is not None:
+            nbytes["surrogate"] = self._surrogate.estimate_memory(n)
+        nbytes = dict((k, int(v)) for k, v in nbytes.items())
+        nbytes["total"] = sum(nbytes.values())
+        return nbytes if detail else nbytes["total"]
+    
+    def _solve(self, solver, xstart, sync, w, c1, c2, gamma, F, CR, strategy,
+               sigma, mu_perc, restart, incpopsize):
         if solver == "pso":
             xopt, gfit = self._cpso(w = w, c1 = c1, c2 = c2, gamma = 0.,
                                     xstart = xstart, sync = sync)
@@ -294,50 +678,211 @@ class Evolutionary:
         elif solver == "de":
             xopt, gfit = self._de(F = F, CR = CR, strategy = strategy,
                                   xstart = xstart, sync = sync)
+        elif restart is not None:
+            xopt, gfit = self._restart_cma(solver = solver, restart = restart,
+                                           incpopsize = incpopsize, sigma = sigma,
+                                           mu_perc = mu_perc, xstart = xstart)
+        elif solver == "cmaes" and self._blocks is not None:
+            xopt, gfit = self._block_cmaes(sigma = sigma, mu_perc = mu_perc,
+                                           xstart = xstart)
         elif solver == "cmaes":
             xopt, gfit = self._cmaes(sigma = sigma, mu_perc = mu_perc,
                                      xstart = xstart)
+        elif solver == "cholesky-cmaes":
+            xopt, gfit = self._cholesky_cmaes(sigma = sigma, mu_perc = mu_perc,
+                                              xstart = xstart)
         elif solver == "vdcma":
             xopt, gfit = self._vdcma(sigma = sigma, mu_perc = mu_perc,
                                      xstart = xstart)
+        elif solver == "lmmaes":
+            xopt, gfit = self._lmmaes(sigma = sigma, mu_perc = mu_perc,
+                                      xstart = xstart)
         return xopt, gfit
     
     def _standardize(self, models):
         return (models - self._mu_scale) / self._std_scale
     
+    def _process_kwargs(self):
+        """
+        Keyword arguments of func that depend on the process (context and
+        communicator of the evaluation group).
+        """
+        kwargs = dict(self._context.kwargs) if self._context is not None else {}
+        if self._mpi and self._farm.group_size is not None:
+            kwargs["comm"] = self._farm.group_comm
+        return kwargs
+    
     def _unstandardize(self, models):
         return models * self._std_scale + self._mu_scale
     
-    def _init_models(self):
-        self._models = np.zeros((self._popsize, self._n_dim, self._max_iter))
-        self._energy = np.zeros((self._popsize, self._max_iter))
-    
     def _eval_models(self, models, it):
         n = models.shape[0]
+        fit = np.zeros(n)
+        starttime_parallel = perf_counter()
         if self._mpi:
-            starttime_parallel = MPI.Wtime()
-            fit = np.zeros(n)
-            fit_mpi = np.zeros_like(fit)
-            self._mpi_comm.Barrier()
             self._mpi_comm.Bcast([ models, MPI.DOUBLE ], root = 0)
-            for i in np.arange(self._mpi_rank, n, self._mpi_size):
-                fit_mpi[i] = self._func(self._unstandardize(models[i]))
-            self._mpi_comm.Barrier()
-            self._mpi_comm.Allreduce([ fit_mpi, MPI.DOUBLE ], [ fit, MPI.DOUBLE ],
-                                     op = MPI.SUM)
-            self._time_parallel[it-1] = MPI.Wtime() - starttime_parallel
+        if self._cache is None:
+            idx = np.arange(n)
+            duplicates = None
+        else:
+            idx, duplicates = self._lookup_models(models, fit)
+        if self._surrogate is not None and len(idx) > 1 and self._surrogate.ready():
+            idx = self._screen_models(models, fit, idx)
         else:
-            fit = np.array([ self._func(self._unstandardize(models[i])) for i in range(n) ])
-        self._n_eval += n
+            self._evaluate_models(models, fit, idx)
+        if duplicates is not None:
+            fit[duplicates[:,0]] = fit[duplicates[:,1]]
+        if self._surrogate is not None:
+            self._surrogate.update(models[idx], fit[idx])
+        dt = perf_counter() - starttime_parallel
+        self._time_parallel[it-1] += dt
+        if self._profiler is not None:
+            self._profiler.add_eval(dt)
         return fit
     
-    def _constrain_de(self, models):
+    def _evaluate_models(self, models, fit, idx):
+        """
+        Evaluate the models given by indices idx with the true objective
+        function and store their values in fit. Models beyond the maximum
+        number of function evaluations are given an infinite fitness.
+        """
+        if self._max_eval is not None and len(idx) > self._max_eval - self._n_eval:
+            n = max(0, self._max_eval - self._n_eval)
+            fit[idx[n:]] = np.inf
+            idx = idx[:n]
+        if self._mpi:
+            fit[idx] = self._farm.evaluate(self._func, self._unstandardize(models[idx]))
+        elif self._backend is not None:
+            fit[idx] = self._backend.evaluate(self._unstandardize(models[idx]))
+        else:
+            X = self._unstandardize(models[idx])
+            for k, i in enumerate(idx):
+                fit[i] = self._func(X[k])
+        if self._cache is not None and self._mpi_rank == 0:
+            self._store_models(models[idx], fit[idx])
+        self._n_eval += len(idx)
+    
+    def _tic(self, it, phase = None):
+        """
+        Close the current profiled phase of iteration it.
+        """
+        if self._profiler is not None:
+            self._profiler.tic(it, phase)
+    
+    def _exhausted(self):
+        """
+        Check whether the maximum number of function evaluations or the
+        maximum wall-clock time is reached, and set the stopping flag.
+        """
+        flag = None
+        if self._max_eval is not None and self._n_eval >= self._max_eval:
+            flag = 9
+        elif self._max_time is not None and time() - self._start_time >= self._max_time:
+            flag = 10
+        if self._mpi and self._max_time is not None:
+            flag = self._mpi_comm.bcast(flag, root = 0)
+        if flag is not None:
+            self._flag = flag
+            return True
+        else:
+            return False
+    
+    def _stop(self, it, fitness):
+        """
+        Update the additional stopping criteria and return True if one of
+        them is met.
+        """
+        if self._stopping is not None and self._stopping.update(it, fitness):
+            self._flag = 12
+            return True
+        else:
+            return False
+    
+    def _callback(self, it, X, xbest, fbest, **kwargs):
+        """
+        Call the callback functions with the current state of the optimizer
+        and return True if one of them requests to stop.
+        """
+        stop = False
+        if self._mpi_rank == 0:
+            state = {
+                "solver": self._solver,
+                "it": it,
+                "n_eval": self._n_eval,
+                "gfit": fbest,
+                "xopt": self._unstandardize(xbest),
+                "spread": np.mean(np.std(X, axis = 0) * self._std_scale),
+                "n_restart": self._n_restart,
+                "time_serial": self._time_serial[it-1] - self._time_parallel[it-1],
+                "time_parallel": self._time_parallel[it-1],
+                }
+            state.update(kwargs)
+            stop = any([ bool(callback(state)) for callback in self._callbacks ])
+        if self._mpi:
+            stop = self._mpi_comm.bcast(stop, root = 0)
+        return stop
+    
+    def _lookup_models(self, models, fit):
+        """
+        Fill fit with cached objective function values and return the indices
+        of the models that still need to be evaluated (one per cache key),
+        and the indices of their duplicates in the batch with the indices of
+        the models whose values they take.
+        """
+        if self._mpi_rank == 0:
+            values, idx, duplicates = self._cache.lookup(self._unstandardize(models))
+            found = np.ones(len(models), dtype = bool)
+            found[idx] = False
+            found[duplicates[:,0]] = False
+            fit[found] = values[found]
+        if self._mpi:
+            self._mpi_comm.Bcast([ fit, MPI.DOUBLE ], root = 0)
+            idx, duplicates = self._mpi_comm.bcast((idx, duplicates) if self._mpi_rank == 0 else None, root = 0)
+        return idx, duplicates
+    
+    def _store_models(self, models, fit):
+        for x, value in zip(self._unstandardize(models), fit):
+            self._cache.set(x, value)
+        self._cache.flush()
+    
+    def _screen_models(self, models, fit, idx):
+        """
+        Evaluate only the most promising models according to the surrogate
+        and return the indices of the models evaluated with the true
+        objective function. Unevaluated models are given a fitness worse than
+        every evaluated model, either infinite (DE, PSO and CPSO) or ordered
+        by predicted value (CMA-ES and VD-CMA).
+        """
+        pred = self._surrogate.predict(models[idx])
+        itrue = self._surrogate.screen(pred)
+        self._evaluate_models(models, fit, idx[itrue])
+        
+        # Evaluate remaining models if surrogate is not reliable
+        mask = np.ones(len(idx), dtype = bool)
+        mask[itrue] = False
+        if not self._surrogate.accept(pred[itrue], fit[idx[itrue]], np.sum(mask)):
+            self._evaluate_models(models, fit, idx[mask])
+            return idx
+        
+        # Fill remaining models with surrogate values
+        if self._solver in [ "cmaes", "cholesky-cmaes", "vdcma", "lmmaes" ]:
+            fmax = np.max(fit[idx[itrue]])
+            fit[idx[mask]] = fmax + pred[mask] - np.min(pred[mask]) + max(1e-12, 1e-12 * abs(fmax))
+        else:
+            fit[idx[mask]] = np.inf
+        return idx[itrue]
+    
+    def _constrain_de(self, models, mask):
         """
         Random constraint for Differential Evolution. Parameters of models that
-        are in the infeasible space are regenerated uniformly.
+        are in the infeasible space are regenerated uniformly. Models are
+        updated in place, mask is a boolean work array of the same shape.
         """
-        models = np.where(np.logical_or(models < -1., models > 1.),
-                          np.random.uniform(-1., 1., models.shape), models)
+        r = np.random.uniform(-1., 1., models.shape)
+        np.less(models, -1., out = mask)
+        np.copyto(models, r, where = mask)
+        np.greater(models, 1., out = mask)
+        np.copyto(models, r, where = mask)
         return models
     
     def _constrain_cpso(self, models, models_old):
@@ -363,18 +908,19 @@ class Evolutionary:
         return models
     
     def _constrain_cma(self, arxvalid, arx, xmean, xold, sigma, diagC, mueff, it,
-                       bnd_weights, dfithist, validfitval, iniphase):
+                       bnd_weights, dfithist, validfitval, iniphase, work):
         """
         Box constraint handling by adding a penalty term that quantifies the
         distance of the parameters from the feasible parameter space.
+        arxvalid is clipped in place, work is a work array of the same shape.
         """
         # Clip to boundaries
-        arxvalid = np.where(arxvalid < -1., -np.ones_like(arxvalid), arxvalid)
-        arxvalid = np.where(arxvalid > 1., np.ones_like(arxvalid), arxvalid)
+        np.clip(arxvalid, -1., 1., out = arxvalid)
         arfitness = self._eval_models(arxvalid, it)
         
         # Get delta fitness values
-        perc = np.percentile(arfitness, [ 25, 75 ])
+        finite = np.isfinite(arfitness)
+        perc = np.percentile(arfitness[finite], [ 25, 75 ]) if np.any(finite) else np.zeros(2)
         delta = ( perc[1] - perc[0] ) / self._n_dim / np.mean(diagC) / sigma**2
         
         # Catch non-sensible values
@@ -407,51 +953,54 @@ class Evolutionary:
             idx = np.logical_and(ti, np.abs(tx) > 3. * max( 1., np.sqrt(self._n_dim/mueff) ) \
                                  * sigma * np.sqrt(diagC))
             idx = np.logical_and(idx, np.sign(tx) == np.sign(xmean - xold))
-            bnd_weights = np.array([ w*1.2**min(1., mueff/10./self._n_dim) if i else w
-                                        for i, w in zip(idx, bnd_weights) ])
+            bnd_weights[idx] *= 1.2**min(1., mueff/10./self._n_dim)
                     
         # Calculate scaling biased to unity, product is one
         bnd_scale = np.exp( 0.9 * ( np.log(diagC) - np.mean(np.log(diagC)) ) )
         
         # Assigned penalized fitness
-        arfitness += np.dot((arxvalid - arx)**2, bnd_weights / bnd_scale)
+        np.subtract(arxvalid, arx, out = work)
+        work **= 2
+        arfitness += np.dot(work, bnd_weights / bnd_scale)
         return arfitness, arxvalid, bnd_weights, dfithist, validfitval, iniphase
     
-    def _de_mutation(self, X, F, gbest, strategy, sync, i = None):
-        if sync:
-            idx = [ list(range(self._popsize)) for i in range(self._popsize) ]
-            for i, l in enumerate(idx):
-                l.remove(i)
-                l = np.random.shuffle(l)
-            idx = np.transpose(idx)
-        else:
-            idx = list(range(self._popsize))
-            idx.remove(i)
-            np.random.shuffle(idx)
-            idx = np.array(idx)
-            
+    def _de_mutation(self, X, F, gbest, strategy, perm, V, T):
+        """
+        Mutate into V the individuals whose donors are given by the shuffled
+        indices perm (one row per individual). T is a work array of the
+        same shape as V.
+        """
+        for row in perm.reshape((-1, perm.shape[-1])):
+            np.random.shuffle(row)
+        idx = perm.T
+        
+        take = lambda k, out: np.take(X, idx[k], axis = 0, out = out)
         if strategy == "rand1":
-            X1 = np.array(X[idx[0],:])
-            X2 = np.array(X[idx[1],:])
-            X3 = np.array(X[idx[2],:])
-            V = X1 + F * (X2 - X3)
+            take(1, T)
+            T -= take(2, V)
+            T *= F
+            take(0, V)
+            V += T
         elif strategy == "rand2":
-            X1 = np.array(X[idx[0],:])
-            X2 = np.array(X[idx[1],:])
-            X3 = np.array(X[idx[2],:])
-            X4 = np.array(X[idx[3],:])
-            X5 = np.array(X[idx[4],:])
-            V = X1 + F * (X2 + X3 - X4 - X5)
+            take(1, T)
+            T += take(2, V)
+            T -= take(3, V)
+            T -= take(4, V)
+            T *= F
+            take(0, V)
+            V += T
         elif strategy == "best1":
-            X1 = np.array(X[idx[0],:])
-            X2 = np.array(X[idx[1],:])
-            V = gbest + F * (X1 - X2)
+            take(0, V)
+            V -= take(1, T)
+            V *= F
+            V += gbest
         elif strategy == "best2":
-            X1 = np.array(X[idx[0],:])
-            X2 = np.array(X[idx[1],:])
-            X3 = np.array(X[idx[2],:])
-            X4 = np.array(X[idx[3],:])
-            V = gbest + F * (X1 + X2 - X3 - X4)
+            take(0, V)
+            V += take(1, T)
+            V -= take(2, T)
+            V -= take(3, T)
+            V *= F
+            V += gbest
         return V
     
     def _de(self, F = 0.5, CR = 0.1, strategy = "best2", xstart = None, sync = True):
@@ -493,68 +1042,84 @@ class Evolutionary:
         self._check_inputs(F, CR, strategy, xstart)
         
         # Start timer
-        if self._mpi:
-            starttime_serial = MPI.Wtime()
+        starttime_serial = perf_counter()
+        self._tic(1)
         
         # Population initial positions
         if xstart is None:
             X = np.random.uniform(-1., 1., (self._popsize, self._n_dim))
         else:
             X = self._standardize(xstart)
+        self._tic(1, "sampling")
         
         # Compute fitness
         pfit = self._eval_models(X, 1)
         pbestfit = np.array(pfit)
-        self._n_eval = self._popsize
+        self._tic(1, "selection")
         if self._snap:
-            self._init_models()
-            self._models[:,:,0] = self._unstandardize(X)
-            self._energy[:,0] = np.array(pbestfit)
+            self._snapshot = self._snap.start(self._popsize, self._n_dim, self._max_iter,
+                                              self._mu_scale, self._std_scale)
+            self._snapshot.record(1, X, pbestfit)
+            self._tic(1, "snapshot")
         
         # Initialize best individual
         gbidx = np.argmin(pbestfit)
         gfit = pbestfit[gbidx]
         gbest = np.array(X[gbidx,:])
         
-        if self._mpi:
-            self._time_serial[0] = MPI.Wtime() - starttime_serial
+        # Work arrays
+        others = np.array([ [ j for j in range(self._popsize) if j != i ]
+                            for i in range(self._popsize) ])
+        perm = np.empty_like(others)
+        V = np.empty_like(X)
+        T = np.empty_like(X)
+        U = np.empty_like(X)
+        mask = np.empty(X.shape, dtype = bool)
+        rows = np.arange(self._popsize)
+        better = np.empty(self._popsize, dtype = bool)
+        dx = np.empty(self._n_dim)
+        
+        self._time_serial[0] = perf_counter() - starttime_serial
         
         # Iterate until one of the termination criterion is satisfied
         it = 1
         converge = False
         while not converge:
-            if self._mpi:
-                starttime_serial = MPI.Wtime()
+            starttime_serial = perf_counter()
             
             it += 1
+            self._tic(it)
             r1 = np.random.rand(self._popsize, self._n_dim)
             
             # Synchronous population
             if sync:
                 # Mutation
-                V = self._de_mutation(X, F, gbest, strategy, sync)
+                np.copyto(perm, others)
+                self._de_mutation(X, F, gbest, strategy, perm, V, T)
                 
                 # Recombination
-                mask = np.zeros_like(r1, dtype = bool)
                 irand = np.random.randint(self._n_dim, size = self._popsize)
-                for i in range(self._popsize):
-                    mask[i,irand[i]] = True
-                mask = np.logical_or(mask, r1 <= CR)
-                U = np.where(mask, V, X)
+                np.less_equal(r1, CR, out = mask)
+                mask[rows,irand] = True
+                np.copyto(U, X)
+                np.copyto(U, V, where = mask)
+                self._tic(it, "sampling")
                 if self._constrain:
-                    U = self._constrain_de(U)
+                    self._constrain_de(U, mask)
+                    self._tic(it, "constraint")
                 
                 # Selection
                 pfit = self._eval_models(U, it)
-                idx = pfit < pbestfit
-                pbestfit[idx] = pfit[idx]
-                X[idx] = U[idx]
+                np.less(pfit, pbestfit, out = better)
+                np.copyto(pbestfit, pfit, where = better)
+                np.copyto(X, U, where = better[:,None])
                 
                 # Update best individual
                 gbidx = np.argmin(pbestfit)
                 
                 # Stop if best individual position changes less than eps1
-                if np.linalg.norm(gbest - X[gbidx]) <= self._eps1 \
+                np.subtract(gbest, X[gbidx], out = dx)
+                if np.linalg.norm(dx) <= self._eps1 \
                     and pbestfit[gbidx] <= self._eps2:
                     converge = True
                     xopt = self._unstandardize(X[gbidx])
@@ -575,37 +1140,47 @@ class Evolutionary:
                     gfit = pbestfit[gbidx]
                     self._flag = -1
                 
+                # Stop if maximum number of function evaluations or time is reached
+                elif self._exhausted():
+                    converge = True
+                    xopt = self._unstandardize(X[gbidx])
+                    gfit = pbestfit[gbidx]
+                
                 # Otherwise, update best individual
                 else:
-                    gbest = np.array(X[gbidx])
+                    gbest[:] = X[gbidx]
                     gfit = pbestfit[gbidx]
+                self._tic(it, "selection")
                     
             # Asynchronous population
             else:
                 for i in range(self._popsize):
                     # Mutation
-                    V = self._de_mutation(X, F, gbest, strategy, sync, i)
+                    np.copyto(perm[0], others[i])
+                    self._de_mutation(X, F, gbest, strategy, perm[0], V[0], T[0])
                     
                     # Recombination
-                    mask = np.zeros(self._n_dim, dtype = bool)
                     irand = np.random.randint(self._n_dim)
-                    mask[irand] = True
-                    mask = np.logical_or(mask, r1[i] <= CR)
-                    U = np.where(mask, V, X[i])
+                    np.less_equal(r1[i], CR, out = mask[0])
+                    mask[0,irand] = True
+                    np.copyto(U[0], X[i])
+                    np.copyto(U[0], V[0], where = mask[0])
+                    self._tic(it, "sampling")
                     if self._constrain:
-                        U = self._constrain_de(U)
+                        self._constrain_de(U[0], mask[0])
+                        self._tic(it, "constraint")
                         
                     # Selection
-                    pfit[i] = self._func(self._unstandardize(U))
-                    self._n_eval += 1
+                    pfit[i] = self._eval_models(U[:1], it)[0]
                     if pfit[i] <= pbestfit[i]:
-                        X[i] = np.array(U)
+                        X[i] = U[0]
                         pbestfit[i] = pfit[i]
                         
                         # Update best individual
                         if pfit[i] <= gfit:
                             # Stop if best individual position changes less than eps1
-                            if np.linalg.norm(gbest - X[i]) <= self._eps1 \
+                            np.subtract(gbest, X[i], out = dx)
+                            if np.linalg.norm(dx) <= self._eps1 \
                                 and pfit[i] <= self._eps2:
                                 converge = True
                                 xopt = self._unstandardize(X[i])
@@ -621,9 +1196,16 @@ class Evolutionary:
                 
                             # Otherwise, update best individual
                             else:
-                                gbest = np.array(X[i])
+                                gbest[:] = X[i]
                                 gfit = pfit[i]
                                 
+                    # Stop if maximum number of function evaluations or time is reached
+                    self._tic(it, "selection")
+                    if not converge and self._exhausted():
+                        converge = True
+                        xopt = self._unstandardize(gbest)
+                        break
+                                
                 # Stop if maximum iteration is reached
                 if not converge and it >= self._max_iter:
                     converge = True
@@ -632,21 +1214,36 @@ class Evolutionary:
                     
             # Save models and energy
             if self._snap:
-                self._models[:,:,it-1] = self._unstandardize(X)
-                self._energy[:,it-1] = np.array(pbestfit)
+                self._snapshot.record(it, X, pbestfit)
+                self._tic(it, "snapshot")
+                
+            # Stop if an additional stopping criterion is met
+            if not converge and self._stop(it, pbestfit):
+                converge = True
+                gbidx = np.argmin(pbestfit)
+                xopt = self._unstandardize(X[gbidx])
+                gfit = pbestfit[gbidx]
                 
-            if self._mpi:
-                self._time_serial[it-1] = MPI.Wtime() - starttime_serial
+            self._time_serial[it-1] = perf_counter() - starttime_serial
+            
+            # Stop if requested by a callback function
+            if self._callbacks:
+                gbidx = np.argmin(pbestfit)
+                if self._callback(it, X, X[gbidx], pbestfit[gbidx]) and not converge:
+                    converge = True
+                    xopt = self._unstandardize(X[gbidx])
+                    gfit = pbestfit[gbidx]
+                    self._flag = 11
                     
         self._xopt = xopt
         self._gfit = gfit
         self._n_iter = it
-        if self._mpi:
-            self._time_serial = self._time_serial[:it] - self._time_parallel[:it]
-            self._time_parallel = self._time_parallel[:it]
+        self._time_serial = self._time_serial[:it] - self._time_parallel[:it]
+        self._time_parallel = self._time_parallel[:it]
+        if self._profiler is not None:
+            self._profile_times = self._profiler.times(it)
         if self._snap:
-            self._models = self._models[:,:,:it]
-            self._energy = self._energy[:,:it]
+            self._snapshot.trim()
         return xopt, gfit
         
     def _cpso(self, w = 0.7298, c1 = 1.49618, c2 = 1.49618, gamma = 1.,
@@ -694,8 +1291,8 @@ class Evolutionary:
         self._check_inputs(w, c1, c2, gamma, xstart)
         
         # Start timer
-        if self._mpi:
-            starttime_serial = MPI.Wtime()
+        starttime_serial = perf_counter()
+        self._tic(1)
         
         # Particles initial positions
         if xstart is None:
@@ -706,15 +1303,17 @@ class Evolutionary:
         
         # Initialize particle velocity
         V = np.zeros((self._popsize, self._n_dim))
+        self._tic(1, "sampling")
         
         # Compute fitness
         pfit = self._eval_models(X, 1)
         pbestfit = np.array(pfit)
-        self._n_eval = self._popsize
+        self._tic(1, "selection")
         if self._snap:
-            self._init_models()
-            self._models[:,:,0] = self._unstandardize(X)
-            self._energy[:,0] = np.array(pbestfit)
+            self._snapshot = self._snap.start(self._popsize, self._n_dim, self._max_iter,
+                                              self._mu_scale, self._std_scale)
+            self._snapshot.record(1, X, pbestfit)
+            self._tic(1, "snapshot")
         
         # Initialize best individual
         gbidx = np.argmin(pbestfit)
@@ -724,41 +1323,62 @@ class Evolutionary:
         # Swarm maximum radius
         delta = np.log(1. + 0.003 * self._popsize) / np.max((0.2, np.log(0.01*self._max_iter)))
         
-        if self._mpi:
-            self._time_serial[0] = MPI.Wtime() - starttime_serial
+        # Work arrays
+        T = np.empty_like(X)
+        maskl = np.empty(X.shape, dtype = bool)
+        masku = np.empty(X.shape, dtype = bool)
+        better = np.empty(self._popsize, dtype = bool)
+        dx = np.empty(self._n_dim)
+        
+        self._time_serial[0] = perf_counter() - starttime_serial
         
         # Iterate until one of the termination criterion is satisfied
         it = 1
         converge = False
         while not converge:
-            if self._mpi:
-                starttime_serial = MPI.Wtime()
+            starttime_serial = perf_counter()
             
             it += 1
+            self._tic(it)
             r1 = np.random.rand(self._popsize, self._n_dim)
             r2 = np.random.rand(self._popsize, self._n_dim)
             
             # Synchronous population
             if sync:
                 # Mutation
-                V = w * V + c1 * r1 * (pbest - X) + c2 * r2 * (gbest - X)
+                r1 *= c1
+                r1 *= np.subtract(pbest, X, out = T)
+                r2 *= c2
+                r2 *= np.subtract(gbest, X, out = T)
+                V *= w
+                V += r1
+                V += r2
+                self._tic(it, "sampling")
                 if self._constrain:
-                    X = np.array([ self._constrain_cpso(X[i,:] + V[i,:], X[i,:])
-                                    for i in range(self._popsize) ])
+                    # Only particles leaving the search space are shrinked
+                    np.add(X, V, out = T)
+                    np.less(T, -1., out = maskl)
+                    np.greater(T, 1., out = masku)
+                    maskl |= masku
+                    for i in np.flatnonzero(maskl.any(axis = 1)):
+                        T[i] = self._constrain_cpso(T[i], X[i])
+                    X[...] = T
                 else:
                     X += V
+                self._tic(it, "constraint")
                 
                 # Selection
                 pfit = self._eval_models(X, it)
-                idx = pfit < pbestfit
-                pbestfit[idx] = np.array(pfit[idx])
-                pbest[idx] = np.array(X[idx])
+                np.less(pfit, pbestfit, out = better)
+                np.copyto(pbestfit, pfit, where = better)
+                np.copyto(pbest, X, where = better[:,None])
                 
                 # Update best individual
                 gbidx = np.argmin(pbestfit)
                 
                 # Stop if best individual position changes less than eps1
-                if np.linalg.norm(gbest - pbest[gbidx]) <= self._eps1 \
+                np.subtract(gbest, pbest[gbidx], out = dx)
+                if np.linalg.norm(dx) <= self._eps1 \
                     and pbestfit[gbidx] <= self._eps2:
                     converge = True
                     xopt = self._unstandardize(pbest[gbidx])
@@ -779,32 +1399,41 @@ class Evolutionary:
                     gfit = pbestfit[gbidx]
                     self._flag = -1
                 
+                # Stop if maximum number of function evaluations or time is reached
+                elif self._exhausted():
+                    converge = True
+                    xopt = self._unstandardize(pbest[gbidx])
+                    gfit = pbestfit[gbidx]
+                
                 # Otherwise, update best individual
                 else:
-                    gbest = np.array(pbest[gbidx])
+                    gbest[:] = pbest[gbidx]
                     gfit = pbestfit[gbidx]
+                self._tic(it, "selection")
                     
             # Asynchronous population
             else:
                 for i in range(self._popsize):
                     # Mutation
                     V[i] = w * V[i] + c1 * r1[i] * (pbest[i] - X[i]) + c2 * r2[i] * (gbest - X[i])
+                    self._tic(it, "sampling")
                     if self._constrain:
                         X[i] = self._constrain_cpso(X[i] + V[i], X[i])
                     else:
                         X[i] += V[i]
+                    self._tic(it, "constraint")
                         
                     # Selection
-                    pfit[i] = self._func(self._unstandardize(X[i]))
-                    self._n_eval += 1
+                    pfit[i] = self._eval_models(X[None,i], it)[0]
                     if pfit[i] <= pbestfit[i]:
-                        pbest[i] = np.array(X[i])
+                        pbest[i] = X[i]
                         pbestfit[i] = pfit[i]
                         
                         # Update best individual
                         if pfit[i] <= gfit:
                             # Stop if best individual position changes less than eps1
-                            if np.linalg.norm(gbest - X[i]) <= self._eps1 \
+                            np.subtract(gbest, X[i], out = dx)
+                            if np.linalg.norm(dx) <= self._eps1 \
                                 and pfit[i] <= self._eps2:
                                 converge = True
                                 xopt = self._unstandardize(X[i])
@@ -820,9 +1449,16 @@ class Evolutionary:
                 
                             # Otherwise, update best individual
                             else:
-                                gbest = np.array(X[i])
+                                gbest[:] = X[i]
                                 gfit = pfit[i]
                                 
+                    # Stop if maximum number of function evaluations or time is reached
+                    self._tic(it, "selection")
+                    if not converge and self._exhausted():
+                        converge = True
+                        xopt = self._unstandardize(gbest)
+                        break
+                                
                 # Stop if maximum iteration is reached
                 if not converge and it >= self._max_iter:
                     converge = True
@@ -831,13 +1467,21 @@ class Evolutionary:
                     
             # Save models and energy
             if self._snap:
-                self._models[:,:,it-1] = self._unstandardize(X)
-                self._energy[:,it-1] = np.array(pfit)
+                self._snapshot.record(it, X, pfit)
+                self._tic(it, "snapshot")
+                
+            # Stop if an additional stopping criterion is met
+            if not converge and self._stop(it, pfit):
+                converge = True
+                gbidx = np.argmin(pbestfit)
+                xopt = self._unstandardize(pbest[gbidx])
+                gfit = pbestfit[gbidx]
                 
             # Competitive PSO algorithm
             if not converge and gamma > 0.:
                 # Evaluate swarm size
-                swarm_radius = np.max([ np.linalg.norm(X[i] - gbest) for i in range(self._popsize) ])
+                np.subtract(X, gbest, out = T)
+                swarm_radius = np.max([ np.linalg.norm(T[i]) for i in range(self._popsize) ])
                 swarm_radius /= np.sqrt(4.*self._n_dim)
                 
                 # Restart particles if swarm size is lower than threshold
@@ -849,23 +1493,32 @@ class Evolutionary:
                     if nw > 0:
                         self._n_restart += 1
                         idx = pbestfit.argsort()[:-nw-1:-1]
-                        V[idx] = np.zeros((nw, self._n_dim))
+                        V[idx] = 0.
                         X[idx] = np.random.uniform(-1., 1., (nw, self._n_dim))
-                        pbest[idx] = np.array(X[idx])
-                        pbestfit[idx] = np.full(nw, 1e30)
+                        pbest[idx] = X[idx]
+                        pbestfit[idx] = 1e30
+                self._tic(it, "sampling")
                         
-            if self._mpi:
-                self._time_serial[it-1] = MPI.Wtime() - starttime_serial
+            self._time_serial[it-1] = perf_counter() - starttime_serial
+            
+            # Stop if requested by a callback function
+            if self._callbacks:
+                gbidx = np.argmin(pbestfit)
+                if self._callback(it, X, pbest[gbidx], pbestfit[gbidx]) and not converge:
+                    converge = True
+                    xopt = self._unstandardize(pbest[gbidx])
+                    gfit = pbestfit[gbidx]
+                    self._flag = 11
                 
         self._xopt = np.array(xopt)
         self._gfit = gfit
         self._n_iter = it
-        if self._mpi:
-            self._time_serial = self._time_serial[:it] - self._time_parallel[:it]
-            self._time_parallel = self._time_parallel[:it]
+        self._time_serial = self._time_serial[:it] - self._time_parallel[:it]
+        self._time_parallel = self._time_parallel[:it]
+        if self._profiler is not None:
+            self._profile_times = self._profiler.times(it)
         if self._snap:
-            self._models = self._models[:,:,:it]
-            self._energy = self._energy[:,:it]
+            self._snapshot.trim()
         return xopt, gfit
         
     def _cmaes(self, sigma = 0.5, mu_perc = 0.5, xstart = None):
@@ -899,8 +1552,9 @@ class Evolutionary:
         
         # Initialize saved outputs
         if self._snap:
-            self._init_models()
-            self._means = np.zeros((self._max_iter, self._n_dim))
+            self._snapshot = self._snap.start(self._popsize, self._n_dim, self._max_iter,
+                                              self._mu_scale, self._std_scale,
+                                              means = True)
         
         # Population initial positions
         if xstart is None:
@@ -942,90 +1596,137 @@ class Evolutionary:
         dfithist = np.array([ 1. ])
         
         # (mu, lambda)-CMA-ES
-        self._n_eval = 0
         it = 0
         eigeneval = 0
-        arbestfitness = np.zeros(self._max_iter)
         ilim = int(10 + 30 * self._n_dim / self._popsize)
+        stop_equalfunvalues = EqualFunValues(ilim, 1e-10)
+        stop_tolfun = TolFun(ilim, 1e-12)
         insigma = sigma
         validfitval = False
         iniphase = True
         converge = False
         
+        # Work arrays
+        arx = np.empty((self._popsize, self._n_dim))
+        arxvalid = np.empty_like(arx)
+        work = np.empty_like(arx)
+        arsel = np.empty((mu, self._n_dim))
+        artmp = np.empty((mu, self._n_dim))
+        wartmp = np.empty((self._n_dim, mu))
+        Cmu = np.empty_like(C)
+        Cwork = np.empty_like(C)
+        lower = np.tri(self._n_dim, k = -1, dtype = bool)
+        dx = np.empty(self._n_dim)
+        y = np.empty(self._n_dim)
+        sd = np.ones(self._n_dim)
+        
+        # Best model seen so far
+        xbest, fbest = None, np.inf
+        
         while not converge:
-            if self._mpi:
-                starttime_serial = MPI.Wtime()
+            starttime_serial = perf_counter()
             
             it += 1
+            self._tic(it)
             
             # Generate lambda offsprings
-            arx = np.array([ xmean + sigma * np.dot(B, D*np.random.randn(self._n_dim))
-                            for i in range(self._popsize) ])
-            arxvalid = np.array(arx)
+            Z = np.random.randn(self._popsize, self._n_dim)
+            Z *= D
+            for i in range(self._popsize):
+                np.dot(B, Z[i], out = arx[i])
+            arx *= sigma
+            arx += xmean
+            np.copyto(arxvalid, arx)
+            self._tic(it, "sampling")
                 
             # Evaluate fitness
             if self._constrain:
                 arfitness, arxvalid, bnd_weights, dfithist, validfitval, iniphase = self._constrain_cma(
                         arxvalid, arx, xmean, xold, sigma, np.diag(C), mueff, it,
-                        bnd_weights, dfithist, validfitval, iniphase)
+                        bnd_weights, dfithist, validfitval, iniphase, work)
             else:
                 arfitness = self._eval_models(arxvalid, it)
+            self._tic(it, "constraint")
             if self._snap:
-                self._models[:,:,it-1] = self._unstandardize(arxvalid)
-                self._energy[:,it-1] = np.array(arfitness)
-                self._means[it-1,:] = self._unstandardize(xmean)
+                self._snapshot.record(it, arxvalid, arfitness, xmean)
+                self._tic(it, "snapshot")
+            
+            # Keep track of the best model seen so far
+            ibest = np.argmin(arfitness)
+            if xbest is None or arfitness[ibest] < fbest:
+                xbest = np.array(arxvalid[ibest])
+                fbest = arfitness[ibest]
             
             # Sort by fitness and compute weighted mean into xmean
             arindex = np.argsort(arfitness)
-            xold = np.array(xmean)
-            xmean = np.dot(weights, arx[arindex[:mu],:])
+            np.take(arx, arindex[:mu], axis = 0, out = arsel)
+            xold[:] = xmean
+            np.dot(weights, arsel, out = xmean)
             
-            # Save best fitness
-            arbestfitness[it-1] = arfitness[arindex[0]]
+            # Update fitness history
+            equalfunvalues = stop_equalfunvalues.update(it, arfitness)
+            tolfun = stop_tolfun.update(it, arfitness)
+            self._tic(it, "selection")
             
             # Cumulation
-            ps = ( 1. - cs ) * ps \
-                 + np.sqrt( cs * ( 2. - cs ) * mueff ) * np.dot(invsqrtC, xmean - xold) / sigma
-            if np.linalg.norm(ps) / np.sqrt( 1. - ( 1. - cs )**(2.*self._n_eval/self._popsize) ) / chind < 1.4 + 2. / ( self._n_dim + 1. ):
+            np.subtract(xmean, xold, out = dx)
+            np.dot(invsqrtC, dx, out = y)
+            y *= np.sqrt( cs * ( 2. - cs ) * mueff )
+            y /= sigma
+            ps *= 1. - cs
+            ps += y
+            pc *= 1. - cc
+            if np.linalg.norm(ps) / np.sqrt( 1. - ( 1. - cs )**(2.*it) ) / chind < 1.4 + 2. / ( self._n_dim + 1. ):
                 hsig = 1.
-                pc = ( 1. - cc ) * pc \
-                     + np.sqrt( cc * ( 2. - cc ) * mueff ) * (xmean - xold) / sigma
+                np.multiply(dx, np.sqrt( cc * ( 2. - cc ) * mueff ), out = y)
+                y /= sigma
+                pc += y
             else:
                 hsig = 0.
-                pc = ( 1. - cc ) * pc
                  
             # Adapt covariance matrix C
-            artmp = ( arx[arindex[:mu],:] - np.tile(xold, (mu, 1)) ) / sigma
-            if hsig:
-                C = ( 1. - c1 - cmu ) * C \
-                    + c1 * np.outer(pc, pc) \
-                    + cmu * np.dot(np.dot(artmp.transpose(), np.diag(weights)), artmp)
-            else:
-                C = ( 1. - c1 - cmu ) * C \
-                    + c1 * ( np.outer(pc, pc) + cc * ( 2. - cc ) * C ) \
-                    + cmu * np.dot(np.dot(artmp.transpose(), np.diag(weights)), artmp)
+            np.subtract(arsel, xold, out = artmp)
+            artmp /= sigma
+            np.multiply(pc[:,None], pc, out = Cwork)
+            if not hsig:
+                Cwork += np.multiply(C, cc * ( 2. - cc ), out = Cmu)
+            Cwork *= c1
+            C *= 1. - c1 - cmu
+            C += Cwork
+            np.multiply(artmp.T, weights, out = wartmp)
+            np.dot(wartmp, artmp, out = Cmu)
+            Cmu *= cmu
+            C += Cmu
                 
             # Adapt step size sigma
             sigma *= np.exp( ( cs / damps ) * ( np.linalg.norm(ps) / chind - 1. ) )
+            self._tic(it, "covariance")
             
             # Diagonalization of C
-            if self._n_eval - eigeneval > self._popsize / ( c1 + cmu ) / self._n_dim / 10.:
-                eigeneval = self._n_eval
-                C = np.triu(C) + np.triu(C, 1).transpose()
+            if it * self._popsize - eigeneval > self._popsize / ( c1 + cmu ) / self._n_dim / 10.:
+                eigeneval = it * self._popsize
+                np.copyto(Cwork, C.T)
+                np.copyto(C, Cwork, where = lower)
                 D, B = np.linalg.eigh(C)
                 idx = np.argsort(D)
                 D = D[idx]
                 B = B[:,idx]
                 D = np.sqrt(D)
-                invsqrtC = np.dot(np.dot(B, np.diag(1./D)), B.transpose())
+                np.multiply(B, 1. / D, out = Cwork)
+                np.dot(Cwork, B.T, out = invsqrtC)
+                self._tic(it, "eigendecomposition")
             
             # Stop if maximum iteration is reached
             if it >= self._max_iter:
                 converge = True
                 self._flag = -1
             
+            # Stop if maximum number of function evaluations or time is reached
+            if not converge and self._exhausted():
+                converge = True
+            
             # Stop if mean position changes less than eps1
-            if not converge and np.linalg.norm(xold - xmean) <= self._eps1 \
+            if not converge and np.linalg.norm(dx) <= self._eps1 \
                 and arfitness[arindex[0]] < self._eps2:
                 converge = True
                 self._flag = 0
@@ -1037,12 +1738,13 @@ class Evolutionary:
                 
             # NoEffectAxis: stop if numerical precision problem
             i = int(np.floor(np.mod(it, self._n_dim)))
-            if not converge and np.all( np.abs(0.1 * sigma * B[:,i] * D[i]) < 1e-10 ):
+            if not converge and 0.1 * sigma * max(B[:,i].max(), -B[:,i].min()) * D[i] < 1e-10:
                 converge = True
                 self._flag = 2
                 
             # NoEffectCoord: stop if too low coordinate axis deviations
-            if not converge and np.any( 0.2 * sigma * np.sqrt(np.diag(C)) < 1e-10 ):
+            np.sqrt(np.diagonal(C), out = sd)
+            if not converge and 0.2 * sigma * sd.min() < 1e-10:
                 converge = True
                 self._flag = 3
             
@@ -1052,41 +1754,50 @@ class Evolutionary:
                 self._flag = 4
             
             # EqualFunValues: stop if the range of fitness values is zero
-            if not converge and it >= ilim:
-                if np.max(arbestfitness[it-ilim:it+1]) - np.min(arbestfitness[it-ilim:it+1]) < 1e-10:
-                    converge = True
-                    self._flag = 5
+            if not converge and equalfunvalues:
+                converge = True
+                self._flag = 5
                     
             # TolXUp: stop if x-changes larger than 1e3 times initial sigma
-            if not converge and np.any( sigma * np.sqrt(np.diag(C)) > 1e3 * insigma ):
+            if not converge and sigma * sd.max() > 1e3 * insigma:
                 converge = True
                 self._flag = 6
                 
             # TolFun: stop if fun-changes smaller than 1e-12
-            if not converge and it > 2 and np.max(np.append(arfitness, arbestfitness)) - np.min(np.append(arfitness, arbestfitness)) < 1e-12:
+            if not converge and tolfun:
                 converge = True
                 self._flag = 7
                 
             # TolX: stop if x-changes smaller than 1e-11 times initial sigma
-            if not converge and np.all( sigma * np.max(np.append(np.abs(pc), np.sqrt(np.diag(C)))) < 1e-11 * insigma ):
+            if not converge and sigma * np.maximum(max(pc.max(), -pc.min()), sd.max()) < 1e-11 * insigma:
                 converge = True
                 self._flag = 8
                 
-            if self._mpi:
-                self._time_serial[it-1] = MPI.Wtime() - starttime_serial
+            # Stop if an additional stopping criterion is met
+            if not converge and self._stop(it, arfitness):
+                converge = True
+            self._tic(it, "selection")
+                
+            self._time_serial[it-1] = perf_counter() - starttime_serial
+            
+            # Stop if requested by a callback function
+            if self._callbacks:
+                if self._callback(it, arxvalid, arxvalid[arindex[0]], arfitness[arindex[0]],
+                                  sigma = sigma) and not converge:
+                    converge = True
+                    self._flag = 11
                 
-        xopt = self._unstandardize(arxvalid[arindex[0]])
-        gfit = arfitness[arindex[0]]
+        xopt = self._unstandardize(xbest)
+        gfit = fbest
         self._xopt = np.array(xopt)
         self._gfit = gfit
         self._n_iter = it
-        if self._mpi:
-            self._time_serial = self._time_serial[:it] - self._time_parallel[:it]
-            self._time_parallel = self._time_parallel[:it]
+        self._time_serial = self._time_serial[:it] - self._time_parallel[:it]
+        self._time_parallel = self._time_parallel[:it]
+        if self._profiler is not None:
+            self._profile_times = self._profiler.times(it)
         if self._snap:
-            self._models = self._models[:,:,:it]
-            self._energy = self._energy[:,:it]
-            self._means = self._means[:it,:]
+            self._snapshot.trim()
         return xopt, gfit
     
     def _vdcma(self, sigma = 0.5, mu_perc = 0.5, xstart = None):
@@ -1121,8 +1832,9 @@ class Evolutionary:
         
         # Initialize saved outputs
         if self._snap:
-            self._init_models()
-            self._means = np.zeros((self._max_iter, self._n_dim))
+            self._snapshot = self._snap.start(self._popsize, self._n_dim, self._max_iter,
+                                              self._mu_scale, self._std_scale,
+                                              means = True)
         
         # Population initial positions
         if xstart is None:
@@ -1168,54 +1880,90 @@ class Evolutionary:
         dfithist = np.array([ 1. ])
         
         # VD-CMA
-        self._n_eval = 0
         it = 0
-        arbestfitness = np.zeros(self._max_iter)
         ilim = int(10 + 30 * self._n_dim / self._popsize)
+        stop_equalfunvalues = EqualFunValues(ilim, 1e-10)
+        stop_tolfun = TolFun(ilim, 1e-12)
         insigma = sigma
         validfitval = False
         iniphase = True
         converge = False
         
+        # Work arrays
+        ary = np.empty((self._popsize, self._n_dim))
+        arx = np.empty_like(ary)
+        arxvalid = np.empty_like(ary)
+        work = np.empty_like(ary)
+        arsel = np.empty((mu, self._n_dim))
+        arysel = np.empty((mu, self._n_dim))
+        arz_vn = np.empty(self._popsize)
+        y = np.empty(self._n_dim)
+        diagC = np.empty(self._n_dim)
+        sd = np.empty(self._n_dim)
+        
+        # Best model seen so far
+        xbest, fbest = None, np.inf
+        
         while not converge:
-            if self._mpi:
-                starttime_serial = MPI.Wtime()
+            starttime_serial = perf_counter()
                 
             it += 1
+            self._tic(it)
             
             # Generate lambda offsprings
             arz = np.random.randn(self._popsize, self._n_dim)
-            ary = dvec * ( arz + ( np.sqrt( 1. + norm_v2 ) - 1. ) * np.outer(np.dot(arz, vn), vn) )
+            np.dot(arz, vn, out = arz_vn)
+            np.multiply(arz_vn[:,None], vn, out = ary)
+            ary *= np.sqrt( 1. + norm_v2 ) - 1.
+            ary += arz
+            ary *= dvec
             if flg_injection:
                 ddx = dx / dvec
                 mnorm = (ddx**2).sum() - np.dot(ddx, vvec)**2 / ( 1. + norm_v2 )
                 dy = np.linalg.norm(np.random.randn(self._n_dim)) / np.sqrt(mnorm) * dx
                 ary[0] = dy
                 ary[1] = -dy
-            arx = xmean + sigma * ary
-            arxvalid = np.array(arx)
-            diagC = np.diag(np.dot(np.dot(np.diag(dvec), np.eye(self._n_dim) + np.outer(vvec, vvec)), np.diag(dvec)))
+            np.multiply(ary, sigma, out = arx)
+            arx += xmean
+            np.copyto(arxvalid, arx)
+            
+            # Diagonal of C = D * ( I + v * v^T ) * D
+            np.multiply(vvec, vvec, out = diagC)
+            diagC += 1.
+            diagC *= dvec
+            diagC *= dvec
+            self._tic(it, "sampling")
                 
             # Evaluate fitness
             if self._constrain:
                 arfitness, arxvalid, bnd_weights, dfithist, validfitval, iniphase = self._constrain_cma(
                         arxvalid, arx, xmean, xold, sigma, diagC, mueff, it,
-                        bnd_weights, dfithist, validfitval, iniphase)
+                        bnd_weights, dfithist, validfitval, iniphase, work)
             else:
                 arfitness = self._eval_models(arxvalid, it)
+            self._tic(it, "constraint")
             if self._snap:
-                self._models[:,:,it-1] = self._unstandardize(arxvalid)
-                self._energy[:,it-1] = np.array(arfitness)
-                self._means[it-1,:] = self._unstandardize(xmean)
+                self._snapshot.record(it, arxvalid, arfitness, xmean)
+                self._tic(it, "snapshot")
+            
+            # Keep track of the best model seen so far
+            ibest = np.argmin(arfitness)
+            if xbest is None or arfitness[ibest] < fbest:
+                xbest = np.array(arxvalid[ibest])
+                fbest = arfitness[ibest]
             
             # Sort by fitness and compute weighted mean into xmean
             arindex = np.argsort(arfitness)
-            dx = np.dot(weights, arx[arindex[:mu]]) - np.sum(weights) * xmean
-            xold = np.array(xmean)
+            np.take(arx, arindex[:mu], axis = 0, out = arsel)
+            np.dot(weights, arsel, out = dx)
+            dx -= np.multiply(xmean, np.sum(weights), out = y)
+            xold[:] = xmean
             xmean += dx
             
-            # Save best fitness
-            arbestfitness[it-1] = arfitness[arindex[0]]
+            # Update fitness history
+            equalfunvalues = stop_equalfunvalues.update(it, arfitness)
+            tolfun = stop_tolfun.update(it, arfitness)
+            self._tic(it, "selection")
     
             # Update sigma
             if flg_injection:
@@ -1229,13 +1977,17 @@ class Evolutionary:
                 hsig = True
     
             # Cumulation
-            pc = ( 1. - cc ) * pc + hsig * np.sqrt( cc * ( 2. - cc ) * mueff ) * np.dot(weights, ary[arindex[:mu]])
+            np.take(ary, arindex[:mu], axis = 0, out = arysel)
+            np.dot(weights, arysel, out = y)
+            y *= hsig * np.sqrt( cc * ( 2. - cc ) * mueff )
+            pc *= 1. - cc
+            pc += y
     
             # Alpha and related variables
             gamma = 1. / np.sqrt( 1. + norm_v2 )
-            alpha = np.sqrt( norm_v2**2 + ( 1. + norm_v2 ) / max(vnn) * ( 2. - gamma ) ) / ( 2. + norm_v2 )
+            alpha = np.sqrt( norm_v2**2 + ( 1. + norm_v2 ) / vnn.max() * ( 2. - gamma ) ) / ( 2. + norm_v2 )
             if alpha < 1.:
-                beta = ( 4. - ( 2. - gamma ) / max(vnn) ) / ( 1. + 2. / norm_v2 )**2
+                beta = ( 4. - ( 2. - gamma ) / vnn.max() ) / ( 1. + 2. / norm_v2 )**2
             else:
                 alpha = 1.
                 beta = 0.
@@ -1248,7 +2000,9 @@ class Evolutionary:
                 pvec_mu = np.zeros(self._n_dim)
                 qvec_mu = np.zeros(self._n_dim)
             else:
-                pvec_mu, qvec_mu = self._pvec_and_qvec(vn, norm_v2, ary[arindex[:mu]] / dvec, weights)
+                arysel /= dvec
+                pvec_mu, qvec_mu = self._pvec_and_qvec(vn, norm_v2, arysel, weights,
+                                                       work = (arsel, work[:mu]))
                 
             # Rank-one
             if c1 == 0.:
@@ -1281,14 +2035,19 @@ class Evolutionary:
             norm_v = np.sqrt(norm_v2)
             vn = vvec / norm_v
             vnn = vn**2
+            self._tic(it, "covariance")
             
             # Stop if maximum iteration is reached
             if it >= self._max_iter:
                 converge = True
                 self._flag = -1
             
+            # Stop if maximum number of function evaluations or time is reached
+            if not converge and self._exhausted():
+                converge = True
+            
             # Stop if mean position changes less than eps1
-            if not converge and np.linalg.norm(xold - xmean) <= self._eps1 \
+            if not converge and np.linalg.norm(np.subtract(xold, xmean, out = y)) <= self._eps1 \
                 and arfitness[arindex[0]] < self._eps2:
                 converge = True
                 self._flag = 0
@@ -1299,145 +2058,1130 @@ class Evolutionary:
                 self._flag = 1
                 
             # NoEffectCoord: stop if too low coordinate axis deviations
-            if not converge and np.any( 0.2 * sigma * np.sqrt(diagC) < 1e-10 ):
+            np.sqrt(diagC, out = sd)
+            if not converge and 0.2 * sigma * sd.min() < 1e-10:
                 converge = True
                 self._flag = 3
             
             # EqualFunValues: stop if the range of fitness values is zero
-            if not converge and it >= ilim:
-                if np.max(arbestfitness[it-ilim:it+1]) - np.min(arbestfitness[it-ilim:it+1]) < 1e-10:
-                    converge = True
-                    self._flag = 5
+            if not converge and equalfunvalues:
+                converge = True
+                self._flag = 5
                     
             # TolXUp: stop if x-changes larger than 1e3 times initial sigma
-            if not converge and np.any( sigma * np.sqrt(diagC) > 1e3 * insigma ):
+            if not converge and sigma * sd.max() > 1e3 * insigma:
                 converge = True
                 self._flag = 6
                 
             # TolFun: stop if fun-changes smaller than 1e-12
-            if not converge and it > 2 and np.max(np.append(arfitness, arbestfitness)) - np.min(np.append(arfitness, arbestfitness)) < 1e-12:
+            if not converge and tolfun:
                 converge = True
                 self._flag = 7
                 
             # TolX: stop if x-changes smaller than 1e-11 times initial sigma
-            if not converge and np.all( sigma * np.max(np.append(np.abs(pc), np.sqrt(diagC))) < 1e-11 * insigma ):
+            if not converge and sigma * np.maximum(max(pc.max(), -pc.min()), sd.max()) < 1e-11 * insigma:
                 converge = True
                 self._flag = 8
                 
-            if self._mpi:
-                self._time_serial[it-1] = MPI.Wtime() - starttime_serial
+            # Stop if an additional stopping criterion is met
+            if not converge and self._stop(it, arfitness):
+                converge = True
+            self._tic(it, "selection")
+                
+            self._time_serial[it-1] = perf_counter() - starttime_serial
+            
+            # Stop if requested by a callback function
+            if self._callbacks:
+                ibest = np.argmin(arfitness)
+                if self._callback(it, arxvalid, arxvalid[ibest], arfitness[ibest],
+                                  sigma = sigma) and not converge:
+                    converge = True
+                    self._flag = 11
         
-        arindex = np.argsort(arfitness)
-        xopt = self._unstandardize(arxvalid[arindex[0]])
-        gfit = arfitness[arindex[0]]
+        xopt = self._unstandardize(xbest)
+        gfit = fbest
         self._xopt = np.array(xopt)
         self._gfit = gfit
         self._n_iter = it
-        if self._mpi:
-            self._time_serial = self._time_serial[:it] - self._time_parallel[:it]
-            self._time_parallel = self._time_parallel[:it]
+        self._time_serial = self._time_serial[:it] - self._time_parallel[:it]
+        self._time_parallel = self._time_parallel[:it]
+        if self._profiler is not None:
+            self._profile_times = self._profiler.times(it)
         if self._snap:
-            self._models = self._models[:,:,:it]
-            self._energy = self._energy[:,:it]
-            self._means = self._means[:it,:]
+            self._snapshot.trim()
         return xopt, gfit
     
-    @staticmethod
-    def _pvec_and_qvec(vn, norm_v2, y, weights = None):
-        y_vn = np.dot(y, vn)
-        if weights is None:
-            pvec = y**2 - norm_v2 / ( 1. + norm_v2 ) * ( y_vn * ( y * vn ) ) - 1.
-            qvec = y_vn * y - ( 0.5 * ( y_vn**2 + 1. + norm_v2 ) ) * vn
-        else:
-            pvec = np.dot(weights, y**2 - norm_v2 / ( 1. + norm_v2 ) * ( y_vn * ( y * vn ).T ).T - 1. )
-            qvec = np.dot(weights, ( y_vn * y.T ).T - np.outer(0.5 * ( y_vn**2 + 1.0 + norm_v2 ), vn) )
-        return pvec, qvec
-    
-    @staticmethod
-    def _ngv_ngd(dvec, vn, vnn, norm_v, norm_v2, alpha, avec, bsca, invavnn, pvec, qvec):
-        rvec = pvec - alpha / ( 1. + norm_v2 ) * ( ( 2. + norm_v2 ) * ( qvec * vn ) - norm_v2 * np.dot(vn, qvec) * vnn )
-        svec = rvec / avec - bsca * np.dot(rvec, invavnn) / ( 1. + bsca * np.dot(vnn, invavnn) ) * invavnn
-        ngv = qvec / norm_v - alpha / norm_v * ( ( 2. + norm_v2 ) * ( vn * svec ) - np.dot(svec, vnn) * vn )
-        ngd = dvec * svec
-        return ngv, ngd
-    
-    def _check_inputs(self, *args):
-        if self._solver == "de":
-            F, CR, strategy, xstart = args
-            if self._popsize <= 3 and strategy not in [ "rand2", "best2" ]:
-                self._popsize = 4
-                warn("\npopsize cannot be lower than 4 for DE, popsize set to 4", UserWarning)
-            elif self._popsize <= 4 and strategy == "best2":
-                self._popsize = 5
-                warn("\npopsize cannot be lower than 5 for DE, popsize set to 5", UserWarning)
-            elif self._popsize <= 5 and strategy == "rand2":
-                self._popsize = 6
-                warn("\npopsize cannot be lower than 6 for DE, popsize set to 6", UserWarning)
-            if not isinstance(F, float) and not isinstance(F, int) or not 0. <= F <= 2.:
-                raise ValueError("F must be an integer or float in [ 0, 2 ], got %s" % F)
-            if not isinstance(CR, float) and not isinstance(CR, int) or not 0. <= CR <= 1.:
-                raise ValueError("CR must be an integer or float in [ 0, 1 ], got %s" % CR)
-            if strategy not in [ "rand1", "rand2", "best1", "best2" ]:
-                raise ValueError("strategy should either be 'rand1', 'rand2', 'best1' or 'best2'")
-            if xstart is not None and isinstance(xstart, np.ndarray) \
-                and xstart.shape != (self._popsize, self._n_dim):
-                raise ValueError("xstart must be a ndarray of shape [ %d, %d ], got [ %d, %d ]" \
-                                 % (self._popsize, self._n_dim, xstart.shape[0], xstart.shape[1]))
-        elif self._solver in [ "pso", "cpso" ]:
-            w, c1, c2, gamma, xstart = args
-            if not isinstance(w, float) and not isinstance(w, int) or not 0. <= w <= 1.:
-                raise ValueError("w must be an integer or float in [ 0, 1 ], got %s" % w)
-            if not isinstance(c1, float) and not isinstance(c1, int) or not 0. <= c1 <= 4.:
-                raise ValueError("c1 must be an integer or float in [ 0, 4 ], got %s" % c1)
-            if not isinstance(c2, float) and not isinstance(c2, int) or not 0. <= c2 <= 4.:
-                raise ValueError("c2 must be an integer or float in [ 0, 4 ], got %s" % c2)
-            if not isinstance(gamma, float) and not isinstance(gamma, int) or not 0. <= gamma <= 2.:
-                raise ValueError("gamma must be an integer or float in [ 0, 2 ], got %s" % gamma)
-            if xstart is not None and isinstance(xstart, np.ndarray) \
-                and xstart.shape != (self._popsize, self._n_dim):
-                raise ValueError("xstart must be a ndarray of shape [ %d, %d ], got [ %d, %d ]" \
-                                 % (self._popsize, self._n_dim, xstart.shape[0], xstart.shape[1]))
-        elif self._solver in [ "cmaes", "vdcma" ]:
-            sigma, mu_perc, xstart = args
-            if self._popsize <= 3:
-                self._popsize = 4
-                warn("\npopsize cannot be lower than 4 for %s, popsize set to 4" % self._solver.upper(), UserWarning)
-            if not isinstance(sigma, float) and not isinstance(sigma, int) or sigma <= 0.:
-                raise ValueError("sigma must be positive, got %s" % sigma)
-            if not isinstance(mu_perc, float) and not isinstance(mu_perc, int) or not 0. < mu_perc <= 1.:
-                raise ValueError("mu_perc must be an integer or float in ] 0, 1 ], got %s" % mu_perc)
-            if xstart is not None and isinstance(xstart, (list, np.ndarray)) and np.asarray(xstart).ndim not in [ 1, 2 ]:
-                raise ValueError("xstart must be a 1-D or 2-D ndarray")
-            if np.asarray(xstart).ndim == 1 and len(xstart) != self._n_dim:
-                raise ValueError("xstart must be a list or ndarray of length %d, got %d" % (self._n_dim, len(xstart)))
-            elif np.asarray(xstart).ndim == 2 and xstart.shape != (self._popsize, self._n_dim):
-                raise ValueError("xstart must be a ndarray of shape [ %d, %d ], got [ %d, %d ]" \
-                                 % (self._popsize, self._n_dim, xstart.shape[0], xstart.shape[1]))
-    
-    @property
-    def xopt(self):
-        """
-        ndarray of shape (n_dim)
-        Optimal solution found by the optimizer.
-        """
-        return self._xopt
-    
-    @property
-    def gfit(self):
-        """
-        scalar
-        Objective function value of the optimal solution.
-        """
-        return self._gfit
-    
-    @property
-    def flag(self):
-        """
-        int
-        Stopping criterion.
+    def _cholesky_cmaes(self, sigma = 0.5, mu_perc = 0.5, xstart = None):
         """
-        if self._flag == -1:
-            return "maximum number of iterations is reached"
+        Minimize an objective function using Cholesky-CMA-ES.
+        
+        The covariance matrix C = A A^T is never formed nor decomposed: its
+        factor A and the inverse of A are updated in O(n_dim^2) operations
+        per parent at each iteration.
+        
+        Parameters
+        ----------
+        sigma : scalar, optional, default 0.5
+            Step size.
+        mu_perc : scalar, optional, default 0.5
+            Number of parents as a percentage of population size.
+        xstart : None or ndarray, optional, default None
+            Initial position of the mean.
+            
+        Returns
+        -------
+        xopt : ndarray
+            Optimal solution found by the optimizer.
+        gfit : scalar
+            Objective function value of the optimal solution.
+        
+        References
+        ----------
+        .. [1] C. Igel, T. Suttorp and N. Hansen, *A computational efficient
+               covariance matrix update and a (1+1)-CMA for evolution
+               strategies*, Proceedings of the 8th Annual Conference on
+               Genetic and Evolutionary Computation, 2006, 453-460
+        .. [2] T. Suttorp, N. Hansen and C. Igel, *Efficient covariance
+               matrix update for variable metric evolution strategies*,
+               Machine Learning, 2009, 75(2): 167-197
+        """
+        # Check inputs
+        self._check_inputs(sigma, mu_perc, xstart)
+        
+        # Initialize saved outputs
+        if self._snap:
+            self._snapshot = self._snap.start(self._popsize, self._n_dim, self._max_iter,
+                                              self._mu_scale, self._std_scale,
+                                              means = True)
+        
+        # Population initial positions
+        if xstart is None:
+            xmean = np.random.uniform(-1., 1., self._n_dim)
+        else:
+            if np.asarray(xstart).ndim == 1:
+                xmean = self._standardize(xstart)
+            else:
+                arfitness = self._eval_models(self._standardize(xstart), 1)
+                xmean = self._standardize(xstart[np.argmin(arfitness)])
+        xold = np.empty_like(xmean)
+        
+        # Number of parents
+        mu = int(mu_perc * self._popsize)
+            
+        # Strategy parameter setting: Selection
+        weights = np.log(mu + 0.5) - np.log(np.arange(1, mu+1))
+        weights /= np.sum(weights)
+        mueff = np.sum(weights)**2 / np.sum(weights**2)
+        
+        # Strategy parameter setting: Adaptation
+        cc = ( 4. + mueff / self._n_dim ) / ( self._n_dim + 4. + 2. * mueff / self._n_dim )
+        cs = ( mueff + 2. ) / ( self._n_dim + mueff + 5. )
+        c1 = 2. / ( ( self._n_dim + 1.3 )**2 + mueff )
+        cmu = min(1. - c1, 2. * ( mueff - 2. + 1. / mueff ) / ( ( self._n_dim + 2. )**2 + mueff ) )
+        damps = 1. + 2. * max(0., np.sqrt( ( mueff - 1. ) / ( self._n_dim + 1. ) ) - 1.) + cs
+        beta = np.concatenate(([ c1 ], cmu * weights))
+        
+        # Initialize dynamic (internal) strategy parameters and constants
+        pc = np.zeros(self._n_dim)
+        ps = np.zeros(self._n_dim)
+        A = np.eye(self._n_dim)
+        Ainv = np.eye(self._n_dim)
+        diagC = np.ones(self._n_dim)
+        chind = np.sqrt(self._n_dim) * ( 1. - 1. / ( 4. * self._n_dim ) + 1. / ( 21. * self._n_dim**2 ) )
+        
+        # Initialize boundaries weights
+        bnd_weights = np.zeros(self._n_dim)
+        dfithist = np.array([ 1. ])
+        
+        # (mu, lambda)-CMA-ES
+        it = 0
+        ilim = int(10 + 30 * self._n_dim / self._popsize)
+        stop_equalfunvalues = EqualFunValues(ilim, 1e-10)
+        stop_tolfun = TolFun(ilim, 1e-12)
+        insigma = sigma
+        validfitval = False
+        iniphase = True
+        converge = False
+        
+        # Work arrays
+        arx = np.empty((self._popsize, self._n_dim))
+        arxvalid = np.empty_like(arx)
+        work = np.empty_like(arx)
+        arsel = np.empty((mu, self._n_dim))
+        V = np.empty((self._n_dim, mu+1))
+        Awork = np.empty_like(A)
+        dx = np.empty(self._n_dim)
+        y = np.empty(self._n_dim)
+        sd = np.ones(self._n_dim)
+        
+        # Best model seen so far
+        xbest, fbest = None, np.inf
+        
+        while not converge:
+            starttime_serial = perf_counter()
+            
+            it += 1
+            self._tic(it)
+            
+            # Generate lambda offsprings
+            Z = np.random.randn(self._popsize, self._n_dim)
+            np.dot(Z, A.T, out = arx)
+            arx *= sigma
+            arx += xmean
+            np.copyto(arxvalid, arx)
+            self._tic(it, "sampling")
+                
+            # Evaluate fitness
+            if self._constrain:
+                arfitness, arxvalid, bnd_weights, dfithist, validfitval, iniphase = self._constrain_cma(
+                        arxvalid, arx, xmean, xold, sigma, diagC, mueff, it,
+                        bnd_weights, dfithist, validfitval, iniphase, work)
+            else:
+                arfitness = self._eval_models(arxvalid, it)
+            self._tic(it, "constraint")
+            if self._snap:
+                self._snapshot.record(it, arxvalid, arfitness, xmean)
+                self._tic(it, "snapshot")
+            
+            # Keep track of the best model seen so far
+            ibest = np.argmin(arfitness)
+            if xbest is None or arfitness[ibest] < fbest:
+                xbest = np.array(arxvalid[ibest])
+                fbest = arfitness[ibest]
+            
+            # Sort by fitness and compute weighted mean into xmean
+            arindex = np.argsort(arfitness)
+            np.take(arx, arindex[:mu], axis = 0, out = arsel)
+            xold[:] = xmean
+            np.dot(weights, arsel, out = xmean)
+            
+            # Update fitness history
+            equalfunvalues = stop_equalfunvalues.update(it, arfitness)
+            tolfun = stop_tolfun.update(it, arfitness)
+            self._tic(it, "selection")
+            
+            # Cumulation
+            np.subtract(xmean, xold, out = dx)
+            np.dot(Ainv, dx, out = y)
+            y *= np.sqrt( cs * ( 2. - cs ) * mueff )
+            y /= sigma
+            ps *= 1. - cs
+            ps += y
+            pc *= 1. - cc
+            if np.linalg.norm(ps) / np.sqrt( 1. - ( 1. - cs )**(2.*it) ) / chind < 1.4 + 2. / ( self._n_dim + 1. ):
+                hsig = 1.
+                np.multiply(dx, np.sqrt( cc * ( 2. - cc ) * mueff ), out = y)
+                y /= sigma
+                pc += y
+            else:
+                hsig = 0.
+            
+            # Adapt covariance matrix C = A A^T by updating A and its inverse
+            alpha = 1. - c1 - cmu
+            if not hsig:
+                alpha += c1 * cc * ( 2. - cc )
+            A *= np.sqrt(alpha)
+            Ainv /= np.sqrt(alpha)
+            V[:,0] = pc
+            np.subtract(arsel.T, xold[:,None], out = V[:,1:])
+            V[:,1:] /= sigma
+            self._cholesky_update(A, Ainv, V, beta, Awork)
+            np.einsum("ij,ij->i", A, A, out = diagC)
+            
+            # Adapt step size sigma
+            sigma *= np.exp( ( cs / damps ) * ( np.linalg.norm(ps) / chind - 1. ) )
+            self._tic(it, "covariance")
+            
+            # Stop if maximum iteration is reached
+            if it >= self._max_iter:
+                converge = True
+                self._flag = -1
+            
+            # Stop if maximum number of function evaluations or time is reached
+            if not converge and self._exhausted():
+                converge = True
+            
+            # Stop if mean position changes less than eps1
+            if not converge and np.linalg.norm(dx) <= self._eps1 \
+                and arfitness[arindex[0]] < self._eps2:
+                converge = True
+                self._flag = 0
+                
+            # Stop if fitness is less than eps2
+            if not converge and arfitness[arindex[0]] <= self._eps2:
+                converge = True
+                self._flag = 1
+                
+            # NoEffectAxis: stop if numerical precision problem
+            i = int(np.floor(np.mod(it, self._n_dim)))
+            if not converge and 0.1 * sigma * max(A[:,i].max(), -A[:,i].min()) < 1e-10:
+                converge = True
+                self._flag = 2
+                
+            # NoEffectCoord: stop if too low coordinate axis deviations
+            np.sqrt(diagC, out = sd)
+            if not converge and 0.2 * sigma * sd.min() < 1e-10:
+                converge = True
+                self._flag = 3
+            
+            # ConditionCov: stop if the condition number exceeds 1e14 (the
+            # ratio of the diagonal elements is a lower bound)
+            if not converge and diagC.max() > 1e14 * diagC.min():
+                converge = True
+                self._flag = 4
+            
+            # EqualFunValues: stop if the range of fitness values is zero
+            if not converge and equalfunvalues:
+                converge = True
+                self._flag = 5
+                    
+            # TolXUp: stop if x-changes larger than 1e3 times initial sigma
+            if not converge and sigma * sd.max() > 1e3 * insigma:
+                converge = True
+                self._flag = 6
+                
+            # TolFun: stop if fun-changes smaller than 1e-12
+            if not converge and tolfun:
+                converge = True
+                self._flag = 7
+                
+            # TolX: stop if x-changes smaller than 1e-11 times initial sigma
+            if not converge and sigma * np.maximum(max(pc.max(), -pc.min()), sd.max()) < 1e-11 * insigma:
+                converge = True
+                self._flag = 8
+                
+            # Stop if an additional stopping criterion is met
+            if not converge and self._stop(it, arfitness):
+                converge = True
+            self._tic(it, "selection")
+                
+            self._time_serial[it-1] = perf_counter() - starttime_serial
+            
+            # Stop if requested by a callback function
+            if self._callbacks:
+                if self._callback(it, arxvalid, arxvalid[arindex[0]], arfitness[arindex[0]],
+                                  sigma = sigma) and not converge:
+                    converge = True
+                    self._flag = 11
+                
+        xopt = self._unstandardize(xbest)
+        gfit = fbest
+        self._xopt = np.array(xopt)
+        self._gfit = gfit
+        self._n_iter = it
+        self._time_serial = self._time_serial[:it] - self._time_parallel[:it]
+        self._time_parallel = self._time_parallel[:it]
+        if self._profiler is not None:
+            self._profile_times = self._profiler.times(it)
+        if self._snap:
+            self._snapshot.trim()
+        return xopt, gfit
+    
+    def _lmmaes(self, sigma = 0.5, mu_perc = 0.5, xstart = None):
+        """
+        Minimize an objective function using Limited-Memory Matrix
+        Adaptation - Evolution Strategy (LM-MA-ES).
+        
+        The covariance matrix is implicitly given by m = 4 + floor(3 ln(n_dim))
+        direction vectors (at most n_dim), so that memory and time per iteration grow as
+        O(m * n_dim) and O(m * popsize * n_dim). Suited to problems with a
+        large number of dimensions.
+        
+        Parameters
+        ----------
+        sigma : scalar, optional, default 0.5
+            Step size.
+        mu_perc : scalar, optional, default 0.5
+            Number of parents as a percentage of population size.
+        xstart : None or ndarray, optional, default None
+            Initial position of the mean.
+            
+        Returns
+        -------
+        xopt : ndarray
+            Optimal solution found by the optimizer.
+        gfit : scalar
+            Objective function value of the optimal solution.
+        
+        References
+        ----------
+        .. [1] I. Loshchilov, T. Glasmachers and H. G. Beyer, *Large scale
+               black-box optimization by limited-memory matrix adaptation*,
+               IEEE Transactions on Evolutionary Computation, 2018, 23(2):
+               353-358
+        """
+        # Check inputs
+        self._check_inputs(sigma, mu_perc, xstart)
+        
+        # Initialize saved outputs
+        if self._snap:
+            self._snapshot = self._snap.start(self._popsize, self._n_dim, self._max_iter,
+                                              self._mu_scale, self._std_scale,
+                                              means = True)
+        
+        # Population initial positions
+        if xstart is None:
+            xmean = np.random.uniform(-1., 1., self._n_dim)
+        else:
+            if np.asarray(xstart).ndim == 1:
+                xmean = self._standardize(xstart)
+            else:
+                arfitness = self._eval_models(self._standardize(xstart), 1)
+                xmean = self._standardize(xstart[np.argmin(arfitness)])
+        xold = np.empty_like(xmean)
+        
+        # Number of parents
+        mu = int(mu_perc * self._popsize)
+        
+        # Strategy parameter setting: Selection
+        weights = np.log(mu + 0.5) - np.log(np.arange(1, mu+1))
+        weights /= np.sum(weights)
+        mueff = np.sum(weights)**2 / np.sum(weights**2)
+        
+        # Strategy parameter setting: Adaptation (learning rates of [1] are
+        # damped to stay below 1 in low dimension)
+        m = min(self._n_dim, 4 + int(3. * np.log(self._n_dim)))
+        cs = 2. * self._popsize / ( self._n_dim + 2. * self._popsize )
+        cd = 1. / ( 1.5**np.arange(m) * ( self._n_dim + 2. ) )
+        cc = self._popsize / ( 4.**np.arange(m) * self._n_dim + self._popsize )
+        
+        # Initialize dynamic (internal) strategy parameters
+        ps = np.zeros(self._n_dim)
+        M = np.zeros((m, self._n_dim))
+        
+        # Initialize boundaries weights
+        bnd_weights = np.zeros(self._n_dim)
+        dfithist = np.array([ 1. ])
+        
+        # LM-MA-ES
+        it = 0
+        ilim = int(10 + 30 * self._n_dim / self._popsize)
+        stop_equalfunvalues = EqualFunValues(ilim, 1e-10)
+        stop_tolfun = TolFun(ilim, 1e-12)
+        insigma = sigma
+        validfitval = False
+        iniphase = True
+        converge = False
+        
+        # Work arrays
+        arx = np.empty((self._popsize, self._n_dim))
+        arxvalid = np.empty_like(arx)
+        work = np.empty_like(arx)
+        arsel = np.empty((mu, self._n_dim))
+        arzsel = np.empty((mu, self._n_dim))
+        arz_m = np.empty(self._popsize)
+        dx = np.empty(self._n_dim)
+        y = np.empty(self._n_dim)
+        diagC = np.empty(self._n_dim)
+        sd = np.empty(self._n_dim)
+        
+        # Best model seen so far
+        xbest, fbest = None, np.inf
+        
+        while not converge:
+            starttime_serial = perf_counter()
+            
+            it += 1
+            self._tic(it)
+            
+            # Generate lambda offsprings, directions are transformed in arx
+            arz = np.random.randn(self._popsize, self._n_dim)
+            np.copyto(arx, arz)
+            for j in range(min(it-1, m)):
+                np.dot(arx, M[j], out = arz_m)
+                arz_m *= cd[j]
+                np.multiply(arz_m[:,None], M[j], out = work)
+                arx *= 1. - cd[j]
+                arx += work
+            
+            # Diagonal of C estimated from the directions
+            np.einsum("ij,ij->j", arx, arx, out = diagC)
+            diagC /= self._popsize
+            arx *= sigma
+            arx += xmean
+            np.copyto(arxvalid, arx)
+            self._tic(it, "sampling")
+                
+            # Evaluate fitness
+            if self._constrain:
+                arfitness, arxvalid, bnd_weights, dfithist, validfitval, iniphase = self._constrain_cma(
+                        arxvalid, arx, xmean, xold, sigma, diagC, mueff, it,
+                        bnd_weights, dfithist, validfitval, iniphase, work)
+            else:
+                arfitness = self._eval_models(arxvalid, it)
+            self._tic(it, "constraint")
+            if self._snap:
+                self._snapshot.record(it, arxvalid, arfitness, xmean)
+                self._tic(it, "snapshot")
+            
+            # Keep track of the best model seen so far
+            ibest = np.argmin(arfitness)
+            if xbest is None or arfitness[ibest] < fbest:
+                xbest = np.array(arxvalid[ibest])
+                fbest = arfitness[ibest]
+            
+            # Sort by fitness and compute weighted mean into xmean
+            arindex = np.argsort(arfitness)
+            np.take(arx, arindex[:mu], axis = 0, out = arsel)
+            xold[:] = xmean
+            np.dot(weights, arsel, out = xmean)
+            
+            # Update fitness history
+            equalfunvalues = stop_equalfunvalues.update(it, arfitness)
+            tolfun = stop_tolfun.update(it, arfitness)
+            self._tic(it, "selection")
+            
+            # Cumulation of the weighted mean of the selected steps
+            np.take(arz, arindex[:mu], axis = 0, out = arzsel)
+            np.dot(weights, arzsel, out = y)
+            ps *= 1. - cs
+            ps += np.multiply(y, np.sqrt( mueff * cs * ( 2. - cs ) ), out = dx)
+            
+            # Adapt direction vectors
+            for j in range(m):
+                M[j] *= 1. - cc[j]
+                M[j] += np.multiply(y, np.sqrt( mueff * cc[j] * ( 2. - cc[j] ) ), out = dx)
+            
+            # Adapt step size sigma
+            sigma *= np.exp( 0.5 * cs * ( np.dot(ps, ps) / self._n_dim - 1. ) )
+            self._tic(it, "covariance")
+            
+            # Stop if maximum iteration is reached
+            if it >= self._max_iter:
+                converge = True
+                self._flag = -1
+            
+            # Stop if maximum number of function evaluations or time is reached
+            if not converge and self._exhausted():
+                converge = True
+            
+            # Stop if mean position changes less than eps1
+            if not converge and np.linalg.norm(np.subtract(xmean, xold, out = dx)) <= self._eps1 \
+                and arfitness[arindex[0]] < self._eps2:
+                converge = True
+                self._flag = 0
+                
+            # Stop if fitness is less than eps2
+            if not converge and arfitness[arindex[0]] <= self._eps2:
+                converge = True
+                self._flag = 1
+                
+            # NoEffectCoord: stop if too low coordinate axis deviations
+            np.sqrt(diagC, out = sd)
+            if not converge and 0.2 * sigma * sd.min() < 1e-10:
+                converge = True
+                self._flag = 3
+            
+            # EqualFunValues: stop if the range of fitness values is zero
+            if not converge and equalfunvalues:
+                converge = True
+                self._flag = 5
+                    
+            # TolXUp: stop if x-changes larger than 1e3 times initial sigma
+            if not converge and sigma * sd.max() > 1e3 * insigma:
+                converge = True
+                self._flag = 6
+                
+            # TolFun: stop if fun-changes smaller than 1e-12
+            if not converge and tolfun:
+                converge = True
+                self._flag = 7
+                
+            # TolX: stop if x-changes smaller than 1e-11 times initial sigma
+            if not converge and sigma * sd.max() < 1e-11 * insigma:
+                converge = True
+                self._flag = 8
+                
+            # Stop if an additional stopping criterion is met
+            if not converge and self._stop(it, arfitness):
+                converge = True
+            self._tic(it, "selection")
+                
+            self._time_serial[it-1] = perf_counter() - starttime_serial
+            
+            # Stop if requested by a callback function
+            if self._callbacks:
+                if self._callback(it, arxvalid, arxvalid[arindex[0]], arfitness[arindex[0]],
+                                  sigma = sigma) and not converge:
+                    converge = True
+                    self._flag = 11
+                
+        xopt = self._unstandardize(xbest)
+        gfit = fbest
+        self._xopt = np.array(xopt)
+        self._gfit = gfit
+        self._n_iter = it
+        self._time_serial = self._time_serial[:it] - self._time_parallel[:it]
+        self._time_parallel = self._time_parallel[:it]
+        if self._profiler is not None:
+            self._profile_times = self._profiler.times(it)
+        if self._snap:
+            self._snapshot.trim()
+        return xopt, gfit
+    
+    def _block_cmaes(self, sigma = 0.5, mu_perc = 0.5, xstart = None):
+        """
+        Minimize an objective function using CMA-ES with a block diagonal
+        covariance matrix.
+        
+        One covariance matrix is adapted per group of parameters and the
+        covariances between groups are ignored. Blocks of the same size are
+        stacked so that their eigendecompositions are computed in a single
+        call, the cost of which grows as the sum of the cubed block sizes.
+        
+        Parameters
+        ----------
+        sigma : scalar, optional, default 0.5
+            Step size.
+        mu_perc : scalar, optional, default 0.5
+            Number of parents as a percentage of population size.
+        xstart : None or ndarray, optional, default None
+            Initial position of the mean.
+            
+        Returns
+        -------
+        xopt : ndarray
+            Optimal solution found by the optimizer.
+        gfit : scalar
+            Objective function value of the optimal solution.
+        
+        References
+        ----------
+        .. [1] N. Hansen, *The CMA evolution strategy: A tutorial*, Inria,
+               Université Paris-Saclay, LRI, 2011, 102: 1-34
+        """
+        # Check inputs
+        self._check_inputs(sigma, mu_perc, xstart)
+        
+        # Initialize saved outputs
+        if self._snap:
+            self._snapshot = self._snap.start(self._popsize, self._n_dim, self._max_iter,
+                                              self._mu_scale, self._std_scale,
+                                              means = True)
+        
+        # Population initial positions
+        if xstart is None:
+            xmean = np.random.uniform(-1., 1., self._n_dim)
+        else:
+            if np.asarray(xstart).ndim == 1:
+                xmean = self._standardize(xstart)
+            else:
+                arfitness = self._eval_models(self._standardize(xstart), 1)
+                xmean = self._standardize(xstart[np.argmin(arfitness)])
+        xold = np.empty_like(xmean)
+        
+        # Number of parents
+        mu = int(mu_perc * self._popsize)
+            
+        # Strategy parameter setting: Selection
+        weights = np.log(mu + 0.5) - np.log(np.arange(1, mu+1))
+        weights /= np.sum(weights)
+        mueff = np.sum(weights)**2 / np.sum(weights**2)
+        
+        # Strategy parameter setting: Adaptation
+        cc = ( 4. + mueff / self._n_dim ) / ( self._n_dim + 4. + 2. * mueff / self._n_dim )
+        cs = ( mueff + 2. ) / ( self._n_dim + mueff + 5. )
+        c1 = 2. / ( ( self._n_dim + 1.3 )**2 + mueff )
+        cmu = min(1. - c1, 2. * ( mueff - 2. + 1. / mueff ) / ( ( self._n_dim + 2. )**2 + mueff ) )
+        damps = 1. + 2. * max(0., np.sqrt( ( mueff - 1. ) / ( self._n_dim + 1. ) ) - 1.) + cs
+        
+        # Initialize dynamic (internal) strategy parameters and constants,
+        # blocks of same size are stacked in arrays of shape (n_blocks, size, size)
+        blocks = self._blocks
+        pc = np.zeros(self._n_dim)
+        ps = np.zeros(self._n_dim)
+        B = [ np.tile(np.eye(idx.shape[1]), (idx.shape[0], 1, 1)) for idx in blocks ]
+        D = [ np.ones(idx.shape) for idx in blocks ]
+        C = [ b.copy() for b in B ]
+        invsqrtC = [ b.copy() for b in B ]
+        diagC = np.ones(self._n_dim)
+        chind = np.sqrt(self._n_dim) * ( 1. - 1. / ( 4. * self._n_dim ) + 1. / ( 21. * self._n_dim**2 ) )
+        
+        # Principal axes as (block size, block, column)
+        axes = [ (k, b, j) for k, idx in enumerate(blocks)
+                 for b in range(idx.shape[0]) for j in range(idx.shape[1]) ]
+        
+        # Initialize boundaries weights
+        bnd_weights = np.zeros(self._n_dim)
+        dfithist = np.array([ 1. ])
+        
+        # (mu, lambda)-CMA-ES
+        it = 0
+        eigeneval = 0
+        ilim = int(10 + 30 * self._n_dim / self._popsize)
+        stop_equalfunvalues = EqualFunValues(ilim, 1e-10)
+        stop_tolfun = TolFun(ilim, 1e-12)
+        insigma = sigma
+        validfitval = False
+        iniphase = True
+        converge = False
+        
+        # Work arrays
+        arx = np.empty((self._popsize, self._n_dim))
+        arxvalid = np.empty_like(arx)
+        work = np.empty_like(arx)
+        arsel = np.empty((mu, self._n_dim))
+        artmp = np.empty((mu, self._n_dim))
+        dx = np.empty(self._n_dim)
+        y = np.empty(self._n_dim)
+        sd = np.ones(self._n_dim)
+        
+        # Best model seen so far
+        xbest, fbest = None, np.inf
+        
+        while not converge:
+            starttime_serial = perf_counter()
+            
+            it += 1
+            self._tic(it)
+            
+            # Generate lambda offsprings
+            Z = np.random.randn(self._popsize, self._n_dim)
+            for k, idx in enumerate(blocks):
+                Zk = np.transpose(Z[:,idx], (1, 2, 0))
+                Zk *= D[k][:,:,None]
+                arx[:,idx] = np.transpose(np.matmul(B[k], Zk), (2, 0, 1))
+            arx *= sigma
+            arx += xmean
+            np.copyto(arxvalid, arx)
+            self._tic(it, "sampling")
+                
+            # Evaluate fitness
+            if self._constrain:
+                arfitness, arxvalid, bnd_weights, dfithist, validfitval, iniphase = self._constrain_cma(
+                        arxvalid, arx, xmean, xold, sigma, diagC, mueff, it,
+                        bnd_weights, dfithist, validfitval, iniphase, work)
+            else:
+                arfitness = self._eval_models(arxvalid, it)
+            self._tic(it, "constraint")
+            if self._snap:
+                self._snapshot.record(it, arxvalid, arfitness, xmean)
+                self._tic(it, "snapshot")
+            
+            # Keep track of the best model seen so far
+            ibest = np.argmin(arfitness)
+            if xbest is None or arfitness[ibest] < fbest:
+                xbest = np.array(arxvalid[ibest])
+                fbest = arfitness[ibest]
+            
+            # Sort by fitness and compute weighted mean into xmean
+            arindex = np.argsort(arfitness)
+            np.take(arx, arindex[:mu], axis = 0, out = arsel)
+            xold[:] = xmean
+            np.dot(weights, arsel, out = xmean)
+            
+            # Update fitness history
+            equalfunvalues = stop_equalfunvalues.update(it, arfitness)
+            tolfun = stop_tolfun.update(it, arfitness)
+            self._tic(it, "selection")
+            
+            # Cumulation
+            np.subtract(xmean, xold, out = dx)
+            for k, idx in enumerate(blocks):
+                y[idx] = np.matmul(invsqrtC[k], dx[idx][:,:,None])[:,:,0]
+            y *= np.sqrt( cs * ( 2. - cs ) * mueff )
+            y /= sigma
+            ps *= 1. - cs
+            ps += y
+            pc *= 1. - cc
+            if np.linalg.norm(ps) / np.sqrt( 1. - ( 1. - cs )**(2.*it) ) / chind < 1.4 + 2. / ( self._n_dim + 1. ):
+                hsig = 1.
+                np.multiply(dx, np.sqrt( cc * ( 2. - cc ) * mueff ), out = y)
+                y /= sigma
+                pc += y
+            else:
+                hsig = 0.
+                 
+            # Adapt covariance matrix blocks
+            np.subtract(arsel, xold, out = artmp)
+            artmp /= sigma
+            for k, idx in enumerate(blocks):
+                pck = pc[idx]
+                Cwork = pck[:,:,None] * pck[:,None,:]
+                if not hsig:
+                    Cwork += cc * ( 2. - cc ) * C[k]
+                Cwork *= c1
+                C[k] *= 1. - c1 - cmu
+                C[k] += Cwork
+                artk = np.transpose(artmp[:,idx], (1, 2, 0))
+                Cwork = np.matmul(artk * weights, np.transpose(artk, (0, 2, 1)), out = Cwork)
+                Cwork *= cmu
+                C[k] += Cwork
+                diagC[idx] = np.diagonal(C[k], axis1 = 1, axis2 = 2)
+                
+            # Adapt step size sigma
+            sigma *= np.exp( ( cs / damps ) * ( np.linalg.norm(ps) / chind - 1. ) )
+            self._tic(it, "covariance")
+            
+            # Diagonalization of the blocks, eigenvalues in ascending order
+            if it * self._popsize - eigeneval > self._popsize / ( c1 + cmu ) / self._n_dim / 10.:
+                eigeneval = it * self._popsize
+                for k in range(len(blocks)):
+                    D[k], B[k] = np.linalg.eigh(C[k])
+                    D[k] = np.sqrt(D[k])
+                    invsqrtC[k] = np.matmul(B[k] / D[k][:,None,:], np.transpose(B[k], (0, 2, 1)))
+                self._tic(it, "eigendecomposition")
+            
+            # Stop if maximum iteration is reached
+            if it >= self._max_iter:
+                converge = True
+                self._flag = -1
+            
+            # Stop if maximum number of function evaluations or time is reached
+            if not converge and self._exhausted():
+                converge = True
+            
+            # Stop if mean position changes less than eps1
+            if not converge and np.linalg.norm(dx) <= self._eps1 \
+                and arfitness[arindex[0]] < self._eps2:
+                converge = True
+                self._flag = 0
+                
+            # Stop if fitness is less than eps2
+            if not converge and arfitness[arindex[0]] <= self._eps2:
+                converge = True
+                self._flag = 1
+                
+            # NoEffectAxis: stop if numerical precision problem
+            k, b, j = axes[int(np.mod(it, self._n_dim))]
+            if not converge and 0.1 * sigma * np.abs(B[k][b,:,j]).max() * D[k][b,j] < 1e-10:
+                converge = True
+                self._flag = 2
+                
+            # NoEffectCoord: stop if too low coordinate axis deviations
+            np.sqrt(diagC, out = sd)
+            if not converge and 0.2 * sigma * sd.min() < 1e-10:
+                converge = True
+                self._flag = 3
+            
+            # ConditionCov: stop if the condition number exceeds 1e14
+            if not converge and max(d.max() for d in D) > 1e7 * min(d.min() for d in D):
+                converge = True
+                self._flag = 4
+            
+            # EqualFunValues: stop if the range of fitness values is zero
+            if not converge and equalfunvalues:
+                converge = True
+                self._flag = 5
+                    
+            # TolXUp: stop if x-changes larger than 1e3 times initial sigma
+            if not converge and sigma * sd.max() > 1e3 * insigma:
+                converge = True
+                self._flag = 6
+                
+            # TolFun: stop if fun-changes smaller than 1e-12
+            if not converge and tolfun:
+                converge = True
+                self._flag = 7
+                
+            # TolX: stop if x-changes smaller than 1e-11 times initial sigma
+            if not converge and sigma * np.maximum(max(pc.max(), -pc.min()), sd.max()) < 1e-11 * insigma:
+                converge = True
+                self._flag = 8
+                
+            # Stop if an additional stopping criterion is met
+            if not converge and self._stop(it, arfitness):
+                converge = True
+            self._tic(it, "selection")
+                
+            self._time_serial[it-1] = perf_counter() - starttime_serial
+            
+            # Stop if requested by a callback function
+            if self._callbacks:
+                if self._callback(it, arxvalid, arxvalid[arindex[0]], arfitness[arindex[0]],
+                                  sigma = sigma) and not converge:
+                    converge = True
+                    self._flag = 11
+                
+        xopt = self._unstandardize(xbest)
+        gfit = fbest
+        self._xopt = np.array(xopt)
+        self._gfit = gfit
+        self._n_iter = it
+        self._time_serial = self._time_serial[:it] - self._time_parallel[:it]
+        self._time_parallel = self._time_parallel[:it]
+        if self._profiler is not None:
+            self._profile_times = self._profiler.times(it)
+        if self._snap:
+            self._snapshot.trim()
+        return xopt, gfit
+    
+    def _restart_cma(self, solver = "cmaes", restart = "ipop", incpopsize = 2,
+                     sigma = 0.5, mu_perc = 0.5, xstart = None):
+        """
+        Minimize an objective function using CMA-ES, Cholesky-CMA-ES, VD-CMA
+        or LM-MA-ES with restarts.
+        
+        Parameters
+        ----------
+        solver : {'cmaes', 'cholesky-cmaes', 'vdcma', 'lmmaes'}, default 'cmaes'
+            Optimization method.
+        restart : {'ipop', 'bipop'}, default 'ipop'
+            Restart strategy.
+        incpopsize : int, optional, default 2
+            Population size multiplication factor between two restarts with
+            large population sizes.
+        sigma : scalar, optional, default 0.5
+            Initial step size.
+        mu_perc : scalar, optional, default 0.5
+            Number of parents as a percentage of population size.
+        xstart : None or ndarray, optional, default None
+            Initial position of the mean for the first run.
+            
+        Returns
+        -------
+        xopt : ndarray
+            Best solution found over all the runs.
+        gfit : scalar
+            Objective function value of the best solution.
+        
+        References
+        ----------
+        .. [1] A. Auger and N. Hansen, *A restart CMA evolution strategy with
+               increasing population size*, 2005 IEEE Congress on
+               Evolutionary Computation, 2005, 2: 1769-1776
+        .. [2] N. Hansen, *Benchmarking a BI-population CMA-ES on the BBOB-2009
+               function testbed*, Proceedings of the 11th Annual Conference
+               Companion on Genetic and Evolutionary Computation Conference,
+               2009, 2389-2396
+        """
+        if solver == "cmaes":
+            solve = self._cmaes if self._blocks is None else self._block_cmaes
+        elif solver == "cholesky-cmaes":
+            solve = self._cholesky_cmaes
+        elif solver == "vdcma":
+            solve = self._vdcma
+        else:
+            solve = self._lmmaes
+        popsize = self._popsize
+        
+        # Run until the budget is exhausted or the target fitness is reached
+        runs = []
+        n_eval_large, n_eval_small = 0, 0
+        i_large = 0
+        run_popsize, run_sigma, run_xstart = popsize, sigma, xstart
+        large = True
+        try:
+            while True:
+                self._popsize = run_popsize
+                self._time_serial = np.zeros(self._max_iter)
+                self._time_parallel = np.zeros(self._max_iter)
+                self._profiler = PhaseProfiler(self._max_iter) if self._profile else None
+                if self._stopping is not None:
+                    self._stopping.reset()
+                n_eval = self._n_eval
+                xopt, gfit = solve(sigma = run_sigma, mu_perc = mu_perc, xstart = run_xstart)
+                n_eval = self._n_eval - n_eval
+                run = dict(xopt = xopt, gfit = gfit, n_iter = self._n_iter,
+                           n_eval = n_eval, popsize = self._popsize)
+                if self._snap and all(gfit < r["gfit"] for r in runs):
+                    snapshot = self._snapshot       # Only keep the best run
+                run.update(time_serial = self._time_serial, time_parallel = self._time_parallel)
+                if self._profile:
+                    run.update(profile = self._profile_times)
+                runs.append(run)
+                if large:
+                    n_eval_large += n_eval
+                else:
+                    n_eval_small += n_eval
+                if self._flag in [ 0, 1, 9, 10, 11 ] \
+                    or (self._flag == 12 and self._stopping.terminal):
+                    break
+                
+                # Population size and step size of next run
+                self._n_restart += 1
+                large = restart == "ipop" or n_eval_small >= n_eval_large
+                if not large:
+                    u = np.random.rand()
+                    popsize_large = popsize * incpopsize**i_large
+                    run_popsize = max(popsize, int(popsize * ( 0.5 * popsize_large / popsize )**(u**2)))
+                    run_sigma = sigma * 10.**(-2.*u)
+                else:
+                    i_large += 1
+                    run_popsize = popsize * incpopsize**i_large
+                    run_sigma = sigma
+                run_xstart = None
+        finally:
+            self._popsize = popsize
+        
+        # Return best solution
+        ibest = np.argmin([ run["gfit"] for run in runs ])
+        best = runs[ibest]
+        self._xopt = np.array(best["xopt"])
+        self._gfit = best["gfit"]
+        self._n_iter = np.sum([ run["n_iter"] for run in runs ])
+        self._restart_n_iter = np.array([ run["n_iter"] for run in runs ])
+        self._restart_n_eval = np.array([ run["n_eval"] for run in runs ])
+        self._restart_popsize = np.array([ run["popsize"] for run in runs ])
+        self._restart_fitness = np.array([ run["gfit"] for run in runs ])
+        if self._snap:
+            self._snapshot = snapshot
+        self._time_serial = np.concatenate([ run["time_serial"] for run in runs ])
+        self._time_parallel = np.concatenate([ run["time_parallel"] for run in runs ])
+        if self._profile:
+            self._profile_times = np.concatenate([ run["profile"] for run in runs ])
+        return self._xopt, self._gfit
+    
+    @staticmethod
+    def _cholesky_update(A, Ainv, V, beta, work):
+        """
+        Update in place the factor A of C = A A^T and its inverse such that
+        C becomes C + sum_j beta_j v_j v_j^T, with v_j the columns of V. The
+        rank-one updates of Igel et al. (2006) are applied one after the
+        other, but their products with A and its inverse are gathered into
+        matrix products. work is a work array of the same shape as A.
+        """
+        k = V.shape[1]
+        H = np.dot(Ainv, V)
+        Z = np.empty_like(V)
+        P = np.empty((k, k))
+        c = np.zeros(k)
+        d = np.zeros(k)
+        for j in range(k):
+            # z_j = Ainv_j v_j, and P[j,l] = z_j^T Ainv_j v_l
+            Z[:,j] = H[:,j] - np.dot(Z[:,:j], d[:j] * P[:j,j])
+            zz = d[:j] * np.dot(Z[:,j], Z[:,:j])
+            P[j] = np.dot(Z[:,j], H) - np.dot(zz, P[:j])
+            z2 = np.dot(Z[:,j], Z[:,j])
+            if z2 > 0.:
+                r = np.sqrt(1. + beta[j] * z2)
+                c[j] = ( r - 1. ) / z2
+                d[j] = ( 1. - 1. / r ) / z2
+        
+        # Rows of ZA are z_j^T Ainv_j
+        ZA = np.dot(Z.T, Ainv)
+        for j in range(1, k):
+            ZA[j] -= np.dot(d[:j] * np.dot(Z[:,j], Z[:,:j]), ZA[:j])
+        np.dot(V * c, Z.T, out = work)
+        A += work
+        np.dot(Z * d, ZA, out = work)
+        Ainv -= work
+    
+    @staticmethod
+    def _pvec_and_qvec(vn, norm_v2, y, weights = None, work = None):
+        y_vn = np.dot(y, vn)
+        if weights is None:
+            pvec = y**2 - norm_v2 / ( 1. + norm_v2 ) * ( y_vn * ( y * vn ) ) - 1.
+            qvec = y_vn * y - ( 0.5 * ( y_vn**2 + 1. + norm_v2 ) ) * vn
+        else:
+            W1, W2 = work if work is not None else ( np.empty_like(y), np.empty_like(y) )
+            np.multiply(y, vn, out = W1)
+            W1 *= y_vn[:,None]
+            W1 *= norm_v2 / ( 1. + norm_v2 )
+            np.square(y, out = W2)
+            W2 -= W1
+            W2 -= 1.
+            pvec = np.dot(weights, W2)
+            np.multiply(y, y_vn[:,None], out = W1)
+            np.multiply(( 0.5 * ( y_vn**2 + 1.0 + norm_v2 ) )[:,None], vn, out = W2)
+            W1 -= W2
+            qvec = np.dot(weights, W1)
+        return pvec, qvec
+    
+    @staticmethod
+    def _ngv_ngd(dvec, vn, vnn, norm_v, norm_v2, alpha, avec, bsca, invavnn, pvec, qvec):
+        rvec = pvec - alpha / ( 1. + norm_v2 ) * ( ( 2. + norm_v2 ) * ( qvec * vn ) - norm_v2 * np.dot(vn, qvec) * vnn )
+        svec = rvec / avec - bsca * np.dot(rvec, invavnn) / ( 1. + bsca * np.dot(vnn, invavnn) ) * invavnn
+        ngv = qvec / norm_v - alpha / norm_v * ( ( 2. + norm_v2 ) * ( vn * svec ) - np.dot(svec, vnn) * vn )
+        ngd = dvec * svec
+        return ngv, ngd
+    
+    def _split_groups(self, groups):
+        """
+        Check that groups is a partition of the parameter indices and stack
+        the groups of same size. Return a list of int ndarrays of shape
+        (n_blocks, block_size), sorted by block size.
+        """
+        try:
+            groups = [ np.sort(np.asarray(g, dtype = int).ravel()) for g in groups ]
+        except (TypeError, ValueError):
+            raise ValueError("groups must be a list of array_like of parameter indices")
+        if not groups or any(len(g) == 0 for g in groups):
+            raise ValueError("groups must be a list of non-empty array_like of parameter indices")
+        indices = np.concatenate(groups)
+        if indices.min() < 0 or indices.max() >= self._n_dim \
+            or np.any(np.bincount(indices, minlength = self._n_dim) != 1):
+            raise ValueError("groups must contain every parameter index in [ 0, %d ] exactly once" % (self._n_dim - 1))
+        sizes = sorted(set(len(g) for g in groups))
+        return [ np.array([ g for g in groups if len(g) == size ]) for size in sizes ]
+    
+    def _check_inputs(self, *args):
+        if self._solver == "de":
+            F, CR, strategy, xstart = args
+            if self._popsize <= 3 and strategy not in [ "rand2", "best2" ]:
+                self._popsize = 4
+                warn("\npopsize cannot be lower than 4 for DE, popsize set to 4", UserWarning)
+            elif self._popsize <= 4 and strategy == "best2":
+                self._popsize = 5
+                warn("\npopsize cannot be lower than 5 for DE, popsize set to 5", UserWarning)
+            elif self._popsize <= 5 and strategy == "rand2":
+                self._popsize = 6
+                warn("\npopsize cannot be lower than 6 for DE, popsize set to 6", UserWarning)
+            if not isinstance(F, float) and not isinstance(F, int) or not 0. <= F <= 2.:
+                raise ValueError("F must be an integer or float in [ 0, 2 ], got %s" % F)
+            if not isinstance(CR, float) and not isinstance(CR, int) or not 0. <= CR <= 1.:
+                raise ValueError("CR must be an integer or float in [ 0, 1 ], got %s" % CR)
+            if strategy not in [ "rand1", "rand2", "best1", "best2" ]:
+                raise ValueError("strategy should either be 'rand1', 'rand2', 'best1' or 'best2'")
+            if xstart is not None and isinstance(xstart, np.ndarray) \
+                and xstart.shape != (self._popsize, self._n_dim):
+                raise ValueError("xstart must be a ndarray of shape [ %d, %d ], got [ %d, %d ]" \
+                                 % (self._popsize, self._n_dim, xstart.shape[0], xstart.shape[1]))
+        elif self._solver in [ "pso", "cpso" ]:
+            w, c1, c2, gamma, xstart = args
+            if not isinstance(w, float) and not isinstance(w, int) or not 0. <= w <= 1.:
+                raise ValueError("w must be an integer or float in [ 0, 1 ], got %s" % w)
+            if not isinstance(c1, float) and not isinstance(c1, int) or not 0. <= c1 <= 4.:
+                raise ValueError("c1 must be an integer or float in [ 0, 4 ], got %s" % c1)
+            if not isinstance(c2, float) and not isinstance(c2, int) or not 0. <= c2 <= 4.:
+                raise ValueError("c2 must be an integer or float in [ 0, 4 ], got %s" % c2)
+            if not isinstance(gamma, float) and not isinstance(gamma, int) or not 0. <= gamma <= 2.:
+                raise ValueError("gamma must be an integer or float in [ 0, 2 ], got %s" % gamma)
+            if xstart is not None and isinstance(xstart, np.ndarray) \
+                and xstart.shape != (self._popsize, self._n_dim):
+                raise ValueError("xstart must be a ndarray of shape [ %d, %d ], got [ %d, %d ]" \
+                                 % (self._popsize, self._n_dim, xstart.shape[0], xstart.shape[1]))
+        elif self._solver in [ "cmaes", "cholesky-cmaes", "vdcma", "lmmaes" ]:
+            sigma, mu_perc, xstart = args
+            if self._popsize <= 3:
+                self._popsize = 4
+                warn("\npopsize cannot be lower than 4 for %s, popsize set to 4" % self._solver.upper(), UserWarning)
+            if not isinstance(sigma, float) and not isinstance(sigma, int) or sigma <= 0.:
+                raise ValueError("sigma must be positive, got %s" % sigma)
+            if not isinstance(mu_perc, float) and not isinstance(mu_perc, int) or not 0. < mu_perc <= 1.:
+                raise ValueError("mu_perc must be an integer or float in ] 0, 1 ], got %s" % mu_perc)
+            if xstart is not None and isinstance(xstart, (list, np.ndarray)) and np.asarray(xstart).ndim not in [ 1, 2 ]:
+                raise ValueError("xstart must be a 1-D or 2-D ndarray")
+            if np.asarray(xstart).ndim == 1 and len(xstart) != self._n_dim:
+                raise ValueError("xstart must be a list or ndarray of length %d, got %d" % (self._n_dim, len(xstart)))
+            elif np.asarray(xstart).ndim == 2 and xstart.shape != (self._popsize, self._n_dim):
+                raise ValueError("xstart must be a ndarray of shape [ %d, %d ], got [ %d, %d ]" \
+                                 % (self._popsize, self._n_dim, xstart.shape[0], xstart.shape[1]))
+    
+    @property
+    def xopt(self):
+        """
+        ndarray of shape (n_dim)
+        Optimal solution found by the optimizer.
+        """
+        return self._xopt
+    
+    @property
+    def gfit(self):
+        """
+        scalar
+        Objective function value of the optimal solution.
+        """
+        return self._gfit
+    
+    @property
+    def flag(self):
+        """
+        int
+        Stopping criterion.
+        """
+        if self._flag == -1:
+            return "maximum number of iterations is reached"
         elif self._flag == 0:
             return "best individual position changes less than eps1 (%g)" % self._eps1
         elif self._flag == 1:
@@ -1456,12 +3200,31 @@ class Evolutionary:
             return "TolFun"
         elif self._flag == 8:
             return "TolX"
+        elif self._flag == 9:
+            return "maximum number of function evaluations is reached"
+        elif self._flag == 10:
+            return "maximum wall-clock time is reached"
+        elif self._flag == 11:
+            return "stopped by callback"
+        elif self._flag == 12:
+            return "stopping criterion is met: %s" % self._stopping.message
+    
+    @property
+    def popsize(self):
+        """
+        int
+        Population size (of the first run with restarts).
+        """
+        return self._popsize
     
     @property
     def n_iter(self):
         """
         int
-        Number of iterations required to reach stopping criterion.
+        Number of iterations required to reach stopping criterion. With
+        restarts, total number of iterations of all the runs (see
+        'restart_n_iter'), while the saved models and energy are those of
+        the best run.
         """
         return self._n_iter
     
@@ -1473,32 +3236,128 @@ class Evolutionary:
         """
         return self._n_eval
     
+    @property
+    def n_restart(self):
+        """
+        int
+        Number of restarts. Available only when solver = 'cpso' or restart is
+        not None.
+        """
+        return self._n_restart
+    
+    @property
+    def restart_n_iter(self):
+        """
+        ndarray of length n_restart+1
+        Number of iterations performed by each run. Available only when
+        restart is not None.
+        """
+        return self._restart_n_iter
+    
+    @property
+    def restart_n_eval(self):
+        """
+        ndarray of length n_restart+1
+        Number of function evaluations performed by each run. Available only
+        when restart is not None.
+        """
+        return self._restart_n_eval
+    
+    @property
+    def restart_popsize(self):
+        """
+        ndarray of length n_restart+1
+        Population size of each run. Available only when restart is not None.
+        """
+        return self._restart_popsize
+    
+    @property
+    def restart_fitness(self):
+        """
+        ndarray of length n_restart+1
+        Objective function value of the best solution of each run. Available
+        only when restart is not None.
+        """
+        return self._restart_fitness
+    
     @property
     def models(self):
         """
         ndarray of shape (popsize, n_dim, n_iter)
         Models explored by every individuals at each iteration. Available only
-        when snap = True.
+        when snap is enabled. If restart is not None, models of the best run.
+        With Snapshot options, shape is (top_k, n_dim, n_snap).
         """
-        return self._models
+        return self._snapshot.models if self._snapshot is not None else None
     
     @property
     def energy(self):
         """
         ndarray of shape (popsize, n_iter)
         Energy of models explored by every individuals at each iteration.
-        Available only when snap = True.
+        Available only when snap is enabled.
         """
-        return self._energy
+        return self._snapshot.energy if self._snapshot is not None else None
     
     @property
     def means(self):
         """
         ndarray of shape (n_iter, n_dim)
         Mean models at every iterations. Available only when
-        solver = {'cmaes', 'vdcma'} and snap = True.
+        solver = {'cmaes', 'cholesky-cmaes', 'vdcma', 'lmmaes'} and snap is enabled.
+        """
+        return self._snapshot.means if self._snapshot is not None else None
+    
+    @property
+    def snapshot(self):
+        """
+        Snapshot or None
+        Saved generations, with their iteration numbers in attribute
+        'iterations'. Available only when snap is enabled.
+        """
+        return self._snapshot
+    
+    @property
+    def cache(self):
+        """
+        EvaluationCache or None
+        Cache of objective function values.
+        """
+        return self._cache
+    
+    @property
+    def surrogate(self):
+        """
+        RBFSurrogate, GaussianProcessSurrogate or None
+        Surrogate model used to pre-screen candidates.
         """
-        return self._means
+        return self._surrogate
+    
+    @property
+    def incidents(self):
+        """
+        list of dict
+        Evaluation incidents recorded by the fault policy (empty if
+        fault_policy is None).
+        """
+        return self._fault_policy.incidents if self._fault_policy is not None else []
+    
+    @property
+    def backend(self):
+        """
+        Backend object or None
+        Evaluation backend.
+        """
+        return self._backend
+    
+    @property
+    def task_farm(self):
+        """
+        TaskFarm object or None
+        Distribution of the evaluations over MPI processes, with the busy
+        and idle times of each process.
+        """
+        return self._farm
     
     @property
     def time_serial(self):
@@ -1514,4 +3373,14 @@ class Evolutionary:
         ndarray of length n_iter
         Parallel computation time in seconds at each iteration.
         """
-        return self._time_parallel
\ No newline at end of file
+        return self._time_parallel
+    
+    @property
+    def profile(self):
+        """
+        structured ndarray of length n_iter
+        Time in seconds spent in each phase ('sampling', 'constraint',
+        'evaluation', 'selection', 'covariance', 'eigendecomposition',
+        'snapshot') at each iteration. Available only when profile = True.
+        """
+        return self._profile_times
\ No newline at end of file
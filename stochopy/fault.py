@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+
+"""
+Fault-tolerant evaluation of objective functions that may crash, hang or
+return invalid values.
+
+Author: Keurfon Luu <keurfon.luu@mines-paristech.fr>
+License: MIT
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+import numpy as np
+import json
+import os
+import threading
+import traceback
+from time import time
+
+__all__ = [ "FaultPolicy" ]
+
+
+class FaultPolicy:
+    """
+    Fault policy.
+    
+    Failed evaluations (exceptions and timeouts) are retried, and models that
+    still fail, or whose objective function value is NaN or infinite, are
+    given a penalty fitness instead of stopping the optimization. Every
+    incident is recorded.
+    
+    Parameters
+    ----------
+    timeout : scalar or None, optional, default None
+        Maximum time in seconds of a single evaluation. A call that times out
+        is abandoned in a daemon thread (it cannot be killed), so that the
+        optimization can go on.
+    retries : int, optional, default 0
+        Number of additional attempts after an exception or a timeout.
+        Non-finite values are not retried.
+    penalty : scalar, optional, default numpy.inf
+        Objective function value given to failed models.
+    filename : str or None, optional, default None
+        File to which incidents are appended as JSON lines. Incidents that
+        occur in worker processes (process backend) are only recorded in this
+        file.
+    """
+    
+    _ATTRIBUTES = [ "timeout", "retries", "penalty", "n_incidents" ]
+    
+    def __init__(self, timeout = None, retries = 0, penalty = np.inf, filename = None):
+        # Check inputs
+        if timeout is not None and (not isinstance(timeout, (float, int)) or timeout <= 0.):
+            raise ValueError("timeout must be None or positive, got %s" % timeout)
+        else:
+            self._timeout = timeout
+        if not isinstance(retries, int) or retries < 0:
+            raise ValueError("retries must be a non-negative integer, got %s" % retries)
+        else:
+            self._retries = retries
+        if not isinstance(penalty, (float, int)) or np.isnan(penalty):
+            raise ValueError("penalty must be a number, got %s" % penalty)
+        else:
+            self._penalty = float(penalty)
+        if filename is not None and not isinstance(filename, str):
+            raise ValueError("filename must be a string")
+        else:
+            self._filename = filename
+        
+        # Initialize
+        self._incidents = []
+        self._lock = threading.Lock()
+    
+    def __repr__(self):
+        attributes = [ "%s: %s" % (attr.rjust(13), getattr(self, attr))
+                        for attr in self._ATTRIBUTES ]
+        return "\n".join(attributes) + "\n"
+    
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state["_lock"] = None
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+    
+    def wrap(self, func):
+        """
+        Return a fault-tolerant version of func.
+        
+        Parameters
+        ----------
+        func : callable
+            Objective function.
+        
+        Returns
+        -------
+        func : callable
+            Objective function that never raises and always returns a finite
+            value or the penalty.
+        """
+        return lambda x: self.evaluate(func, x)
+    
+    def evaluate(self, func, x):
+        """
+        Evaluate a model with retries, timeout and penalty.
+        
+        Parameters
+        ----------
+        func : callable
+            Objective function.
+        x : ndarray
+            Model to evaluate.
+        
+        Returns
+        -------
+        f : scalar
+            Objective function value or penalty.
+        """
+        for attempt in range(self._retries + 1):
+            try:
+                f = self._call(func, x)
+            except _Timeout:
+                self._record("timeout", x, attempt, "evaluation exceeded %g s" % self._timeout)
+                continue
+            except Exception as e:
+                self._record("exception", x, attempt, "".join(traceback.format_exception_only(type(e), e)).strip())
+                continue
+            try:
+                f = float(f)
+            except (TypeError, ValueError):
+                f = np.nan
+            if not np.isfinite(f):
+                self._record("nonfinite", x, attempt, "objective function returned %s" % f)
+                return self._penalty
+            return f
+        return self._penalty
+    
+    def clear(self):
+        """
+        Clear the recorded incidents.
+        """
+        with self._lock:
+            self._incidents = []
+    
+    def _call(self, func, x):
+        if self._timeout is None:
+            return func(x)
+        result = {}
+        def target():
+            try:
+                result["value"] = func(x)
+            except Exception as e:
+                result["error"] = e
+        thread = threading.Thread(target = target, daemon = True)
+        thread.start()
+        thread.join(self._timeout)
+        if thread.is_alive():
+            raise _Timeout()
+        if "error" in result:
+            raise result["error"]
+        return result["value"]
+    
+    def _record(self, kind, x, attempt, message):
+        incident = dict(time = time(), pid = os.getpid(), kind = kind, attempt = attempt,
+                        message = message, model = np.asarray(x, dtype = float).tolist())
+        with self._lock:
+            self._incidents.append(incident)
+            if self._filename is not None:
+                with open(self._filename, "a") as f:
+                    f.write(json.dumps(incident) + "\n")
+    
+    @property
+    def timeout(self):
+        """
+        scalar or None
+        Maximum time in seconds of a single evaluation.
+        """
+        return self._timeout
+    
+    @property
+    def retries(self):
+        """
+        int
+        Number of additional attempts after a failure.
+        """
+        return self._retries
+    
+    @property
+    def penalty(self):
+        """
+        scalar
+        Objective function value given to failed models.
+        """
+        return self._penalty
+    
+    @property
+    def incidents(self):
+        """
+        list of dict
+        Recorded incidents with keys 'time', 'pid', 'kind' ('exception',
+        'timeout' or 'nonfinite'), 'attempt', 'message' and 'model'.
+        """
+        return list(self._incidents)
+    
+    @property
+    def n_incidents(self):
+        """
+        int
+        Number of recorded incidents.
+        """
+        return len(self._incidents)
+
+
+class _Timeout(Exception):
+    pass
@@ -10,6 +10,14 @@ License: MIT
 
 from __future__ import absolute_import, division, print_function, unicode_literals
 import numpy as np
+import asyncio
+import inspect
+from time import perf_counter, time
+from .cache import EvaluationCache
+from .profiler import PhaseProfiler, PHASES
+from .backends import AsyncBackend, get_backend
+from .fault import FaultPolicy
+from .context import WorkerContext
 
 __all__ = [ "MonteCarlo" ]
 
@@ -35,10 +43,47 @@ class MonteCarlo:
         provided.
     max_iter : int, optional, default 1000
         Number of models to sample.
+    max_eval : int or None, optional, default None
+        Maximum number of function evaluations. Sampling stops before a new
+        model would exceed this budget.
+    max_time : scalar or None, optional, default None
+        Maximum wall-clock time in seconds. It is checked before sampling
+        each new model.
     constrain : bool, optional, default True
         Accept sample only within search space.
     random_state : int, optional, default None
         Seed for random number generator.
+    cache : bool or EvaluationCache, optional, default None
+        Cache of objective function values. Models already evaluated are
+        looked up in the cache instead of being evaluated again. If True, a
+        default exact-match cache is used.
+    callback : callable or list of callables, optional, default None
+        Function(s) called after each sampled model with a dictionary
+        describing the state of the sampler (keys 'sampler', 'it', 'n_eval',
+        'gfit', 'energy', 'acceptance_ratio', 'time'). Sampling stops if one
+        of them returns True.
+    profile : bool, optional, default False
+        Time each phase of every iteration (sampling, constraint, evaluation,
+        selection). Timings are stored in attribute 'profile'.
+    backend : {None, 'processes', 'threads'} or backend object, optional, default None
+        Evaluate batches of models (finite-difference gradients in
+        Hamiltonian Monte-Carlo) in parallel on a single machine.
+        - 'processes', ProcessBackend with one worker per CPU. Models are
+          passed to the workers through shared memory.
+        - 'threads', ThreadBackend with one thread per CPU. Only beneficial
+          if func releases the GIL (e.g. NumPy or compiled extensions).
+        A TCPBackend evaluates the models on workers started with
+        run_worker on other hosts.
+    fault_policy : bool or FaultPolicy, optional, default None
+        Retry failed evaluations, stop hanging evaluations after a timeout and
+        give a penalty energy to models whose evaluation fails or returns
+        NaN or inf. If True, a default policy without timeout nor retry and
+        with an infinite penalty is used. Incidents are stored in attribute
+        'incidents'.
+    context : WorkerContext or None, optional, default None
+        Heavy keyword arguments of func (observed data, grids...) built once
+        per process (worker of a process backend) instead of being shipped
+        with the evaluations.
     args : list or tuple, optional, default ()
         Arguments passed to func.
     kwargs : dict, optional, default {}
@@ -48,13 +93,16 @@ class MonteCarlo:
     _ATTRIBUTES = [ "solution", "fitness", "acceptance_ratio" ]
     
     def __init__(self, func, lower = None, upper = None, n_dim = 1,
-                 max_iter = 1000, constrain = True, random_state = None,
-                 args = (), kwargs = {}):
+                 max_iter = 1000, max_eval = None, max_time = None, constrain = True,
+                 random_state = None, cache = None, callback = None, profile = False,
+                 backend = None, fault_policy = None, context = None, args = (), kwargs = {}):
         # Check inputs
         if not hasattr(func, "__call__"):
             raise ValueError("func is not callable")
         else:
             self._func = lambda x: func(x, *args, **kwargs)
+            self._is_async = inspect.iscoroutinefunction(func) \
+                             or inspect.iscoroutinefunction(getattr(func, "__call__", None))
         if lower is None and upper is not None:
             raise ValueError("lower is not defined")
         elif upper is None and lower is not None:
@@ -75,12 +123,59 @@ class MonteCarlo:
             raise ValueError("max_iter must be a positive integer, got %s" % max_iter)
         else:
             self._max_iter = max_iter
+        if max_eval is not None and (not isinstance(max_eval, int) or max_eval <= 0):
+            raise ValueError("max_eval must be a positive integer, got %s" % max_eval)
+        else:
+            self._max_eval = max_eval
+        if max_time is not None and (not isinstance(max_time, (float, int)) or max_time <= 0.):
+            raise ValueError("max_time must be positive, got %s" % max_time)
+        else:
+            self._max_time = max_time
         if not isinstance(constrain, bool):
             raise ValueError("constrain must be either True or False, got %s" % constrain)
         else:
             self._constrain = constrain
         if random_state is not None and random_state >= 0:
             np.random.seed(random_state)
+        if cache is not None and not isinstance(cache, (bool, EvaluationCache)):
+            raise ValueError("cache must be either True, False or an EvaluationCache")
+        elif cache is True:
+            self._cache = EvaluationCache()
+        elif cache is False:
+            self._cache = None
+        else:
+            self._cache = cache
+        if callback is None:
+            self._callbacks = []
+        elif hasattr(callback, "__call__"):
+            self._callbacks = [ callback ]
+        elif isinstance(callback, (list, tuple)) and all(hasattr(c, "__call__") for c in callback):
+            self._callbacks = list(callback)
+        else:
+            raise ValueError("callback must be a callable or a list of callables")
+        if not isinstance(profile, bool):
+            raise ValueError("profile must be either True or False, got %s" % profile)
+        else:
+            self._profile = profile
+        self._backend, self._own_backend = get_backend(backend)
+        if context is not None and not isinstance(context, WorkerContext):
+            raise ValueError("context must be None or a WorkerContext")
+        else:
+            self._context = context
+            if context is not None:
+                self._func = lambda x: func(x, *args, **kwargs, **context.kwargs)
+        if fault_policy is not None and not isinstance(fault_policy, (bool, FaultPolicy)):
+            raise ValueError("fault_policy must be either True, False or a FaultPolicy")
+        elif fault_policy is True:
+            self._fault_policy = FaultPolicy()
+        elif fault_policy is False:
+            self._fault_policy = None
+        else:
+            self._fault_policy = fault_policy
+        if self._fault_policy is not None:
+            if self._is_async:
+                raise ValueError("fault_policy cannot be used with a coroutine function")
+            self._func = self._fault_policy.wrap(self._func)
         if not isinstance(args, (list, tuple)):
             raise ValueError("args must be a list or tuple")
         if not isinstance(kwargs, dict):
@@ -202,6 +297,8 @@ class MonteCarlo:
                                    n_leap = 20, fprime = grad, xstart = x0)
         """
         # Check inputs
+        if self._is_async and not isinstance(self._backend, AsyncBackend):
+            raise ValueError("func is a coroutine function, use sample_async")
         if not isinstance(sampler, str) or sampler not in [ "pure", "hastings", "hamiltonian" ]:
             raise ValueError("sampler must either be 'pure', 'hastings' or 'hamiltonian', got %s" % sampler)
         if xstart is not None and (not isinstance(xstart, (list, tuple, np.ndarray)) \
@@ -213,27 +310,136 @@ class MonteCarlo:
         
         # Initialize
         self._solver = sampler
+        self._start_time = time()
+        self._n_eval = 0
+        self._flag = -1
+        self._best_energy = np.inf
+        self._profiler = PhaseProfiler(self._max_iter) if self._profile else None
         self._init_models()
         self._mu_scale = 0.5 * (self._upper + self._lower)
         self._std_scale = 0.5 * (self._upper - self._lower)
+        if self._backend is not None:
+            self._backend.start(self._func)
         
         # Sample
-        if sampler == "pure":
-            xopt, gfit = self._pure()
-        elif sampler == "hastings":
-            xopt, gfit = self._hastings(stepsize = stepsize,
-                                        perc = perc,
-                                        xstart = xstart)
-        elif sampler == "hamiltonian":
-            xopt, gfit = self._hamiltonian(fprime = fprime,
-                                           stepsize = stepsize,
-                                           n_leap = n_leap,
-                                           xstart = xstart,
-                                           delta = delta,
-                                           snap_leap = snap_leap,
-                                           args = args, kwargs = kwargs)
+        try:
+            if sampler == "pure":
+                xopt, gfit = self._pure()
+            elif sampler == "hastings":
+                xopt, gfit = self._hastings(stepsize = stepsize,
+                                            perc = perc,
+                                            xstart = xstart)
+            elif sampler == "hamiltonian":
+                xopt, gfit = self._hamiltonian(fprime = fprime,
+                                               stepsize = stepsize,
+                                               n_leap = n_leap,
+                                               xstart = xstart,
+                                               delta = delta,
+                                               snap_leap = snap_leap,
+                                               args = args, kwargs = kwargs)
+        finally:
+            if self._own_backend:
+                self._backend.close()
+        for callback in self._callbacks:
+            if hasattr(callback, "flush"):
+                callback.flush()
         return xopt, gfit
     
+    async def sample_async(self, max_concurrency = None, **kwargs):
+        """
+        Coroutine version of 'sample' for I/O-bound objective functions.
+        
+        func must be a coroutine function (async def). The sampler runs
+        in a separate thread while the models of each batch are evaluated
+        concurrently on the running event loop.
+        
+        Parameters
+        ----------
+        max_concurrency : int or None, optional, default None
+            Maximum number of concurrent evaluations. If None, all the models
+            of a batch are evaluated concurrently.
+        **kwargs
+            Keyworded arguments passed to 'sample'.
+        
+        Returns
+        -------
+        xopt : ndarray
+            Maximum a posteriori (MAP) model.
+        gfit : scalar
+            Energy of the MAP model.
+        
+        Examples
+        --------
+        >>> import asyncio
+        >>> async def f(x):
+                await asyncio.sleep(0.01)
+                return np.sum(x**2)
+        >>> mc = MonteCarlo(f, n_dim = 2, max_iter = 100)
+        >>> xopt, gfit = asyncio.run(mc.sample_async(sampler = "hamiltonian"))
+        """
+        if not self._is_async:
+            raise ValueError("func must be a coroutine function, use sample")
+        if self._backend is not None:
+            raise ValueError("cannot use sample_async with an evaluation backend")
+        backend = AsyncBackend(max_concurrency)
+        try:
+            self._backend = backend
+            return await asyncio.get_running_loop().run_in_executor(None, lambda: self.sample(**kwargs))
+        finally:
+            self._backend = None
+    
+    def estimate_memory(self, sampler = "hastings", n_leap = 10, fprime = None,
+                        snap_leap = False, detail = False):
+        """
+        Estimate the peak memory used by 'sample' with this configuration.
+        
+        The estimate covers the Markov chain, the leap-frog positions, the
+        numerical gradient, the timers and the evaluation cache. The memory
+        used by the objective function is not included.
+        
+        Parameters
+        ----------
+        sampler : {'pure', 'hastings', 'hamiltonian'}, default 'hastings'
+            Sampling method.
+        n_leap : int, optional, default 10
+            Number of leap-frog steps. Only used when sampler = 'hamiltonian'.
+        fprime : callable, optional, default None
+            Gradient of the objective function. If None, the gradient is
+            computed numerically. Only used when sampler = 'hamiltonian'.
+        snap_leap : bool, optional, default False
+            Save the leap-frog positions. Only used when
+            sampler = 'hamiltonian'.
+        detail : bool, optional, default False
+            Return the memory of each component.
+        
+        Returns
+        -------
+        nbytes : int or dict
+            Estimated peak memory in bytes. If detail = True, dict with keys
+            'history', 'leap_frog', 'gradient', 'buffers', 'cache' and
+            'total'.
+        """
+        if not isinstance(sampler, str) or sampler not in [ "pure", "hastings", "hamiltonian" ]:
+            raise ValueError("sampler must either be 'pure', 'hastings' or 'hamiltonian', got %s" % sampler)
+        if not isinstance(n_leap, int) or n_leap <= 0:
+            raise ValueError("n_leap must be a positive integer, got %s" % n_leap)
+        
+        n = self._n_dim
+        nbytes = dict(history = 8 * self._max_iter * (n + 1), leap_frog = 0, gradient = 0,
+                      buffers = 0, cache = 0)
+        if sampler == "hamiltonian":
+            if snap_leap:
+                nbytes["leap_frog"] = 8 * (self._max_iter - 1) * n * (n_leap + 1)
+            if fprime is None:
+                nbytes["gradient"] = 8 * 4 * n**2
+        if self._profile:
+            nbytes["buffers"] = 8 * len(PHASES) * self._max_iter
+        if self._cache is not None:
+            nbytes["cache"] = self._cache.estimate_memory(n)
+        nbytes = dict((k, int(v)) for k, v in nbytes.items())
+        nbytes["total"] = sum(nbytes.values())
+        return nbytes if detail else nbytes["total"]
+    
     def _standardize(self, models):
         return (models - self._mu_scale) / self._std_scale
     
@@ -243,6 +449,82 @@ class MonteCarlo:
     def _init_models(self):
         self._models = np.zeros((self._max_iter, self._n_dim))
         self._energy = np.zeros(self._max_iter)
+    
+    def _eval_models(self, models):
+        """
+        Evaluate unstandardized models, looking them up in the cache first.
+        """
+        starttime = perf_counter()
+        n = models.shape[0]
+        if self._cache is not None:
+            fit, idx, duplicates = self._cache.lookup(models)
+        else:
+            fit, idx, duplicates = np.zeros(n), np.arange(n), None
+        if self._backend is not None:
+            fit[idx] = self._backend.evaluate(models[idx])
+        else:
+            for i in idx:
+                fit[i] = self._func(models[i])
+        if self._cache is not None:
+            for i in idx:
+                self._cache.set(models[i], fit[i])
+            self._cache.flush()
+            fit[duplicates[:,0]] = fit[duplicates[:,1]]
+        n_eval = len(idx)
+        self._n_eval += n_eval
+        if self._profiler is not None:
+            self._profiler.add_eval(perf_counter() - starttime)
+        return fit
+    
+    def _exhausted(self, n_next = 1):
+        """
+        Check whether evaluating n_next more models would exceed the maximum
+        number of function evaluations or whether the maximum wall-clock time
+        is reached, and set the stopping flag.
+        """
+        if self._max_eval is not None and self._n_eval + n_next > self._max_eval:
+            self._flag = 9
+            return True
+        elif self._max_time is not None and time() - self._start_time >= self._max_time:
+            self._flag = 10
+            return True
+        else:
+            return False
+    
+    def _tic(self, it, phase = None):
+        """
+        Close the current profiled phase of iteration it.
+        """
+        if self._profiler is not None:
+            self._profiler.tic(it, phase)
+    
+    def _callback(self, it, rejected):
+        """
+        Call the callback functions with the current state of the sampler
+        and return True if one of them requests to stop.
+        """
+        self._best_energy = min(self._best_energy, self._energy[it-1])
+        state = {
+            "sampler": self._solver,
+            "it": it,
+            "n_eval": self._n_eval,
+            "gfit": self._best_energy,
+            "energy": self._energy[it-1],
+            "acceptance_ratio": 1. - rejected / it,
+            "time": time() - self._start_time,
+            }
+        if any([ bool(callback(state)) for callback in self._callbacks ]):
+            self._flag = 11
+            return True
+        else:
+            return False
+    
+    def _trim_models(self, n_iter):
+        self._n_iter = n_iter
+        self._models = self._models[:n_iter]
+        self._energy = self._energy[:n_iter]
+        if self._profiler is not None:
+            self._profile_times = self._profiler.times(n_iter)
         
     def _pure(self):
         """
@@ -255,10 +537,26 @@ class MonteCarlo:
         gfit : scalar
             Energy of the MAP model.
         """
-        self._models = np.random.uniform(-1., 1., (self._max_iter, self._n_dim))
-        self._energy = np.array([ self._func(self._unstandardize(self._models[i])) for i in range(self._max_iter) ])
+        self._tic(1)
+        self._models = None         # Release the preallocated chain first
+        self._models = np.random.random_sample((self._max_iter, self._n_dim))
+        self._models *= 2.
+        self._models -= 1.
+        self._models *= self._std_scale
+        self._models += self._mu_scale
+        self._tic(1, "sampling")
+        for i in range(self._max_iter):
+            if i > 0 and self._exhausted():
+                break
+            self._energy[i] = self._eval_models(self._models[None,i])[0]
+            self._tic(i+1, "selection")
+            if self._callbacks and self._callback(i+1, 0):
+                i += 1
+                break
+        else:
+            i = self._max_iter
+        self._trim_models(i)
         idx = np.argmin(self._energy)
-        self._models = self._unstandardize(self._models)
         self._xopt = self._models[idx]
         self._gfit = self._energy[idx]
         self._acceptance_ratio = 1.
@@ -310,23 +608,33 @@ class MonteCarlo:
             n_dim_per_iter = max(1, int(perc * self._n_dim))
         
         # Initialize models
+        self._tic(1)
         if xstart is None:
             self._models[0] = np.random.uniform(-1., 1., self._n_dim)
         else:
             self._models[0] = self._standardize(xstart)
-        self._energy[0] = self._func(self._unstandardize(self._models[0]))
+        self._tic(1, "sampling")
+        self._energy[0] = self._eval_models(self._unstandardize(self._models[None,0]))[0]
+        self._tic(1, "selection")
         
         # Metropolis-Hastings algorithm
         rejected = 0
         i = 0
-        while i < self._max_iter-1:
+        converge = bool(self._callbacks) and self._callback(1, 0)
+        while not converge and i < self._max_iter-1:
             for j in np.arange(0, self._n_dim, n_dim_per_iter):
+                if self._exhausted():
+                    converge = True
+                    break
                 i += 1
                 jmax = min(self._n_dim, j + n_dim_per_iter - 1)
                 self._models[i] = self._models[i-1]
                 self._models[i,j:jmax+1] += np.random.randn(jmax-j+1) * stepsize[j:jmax+1]
-                if self._in_search_space(self._models[i]):
-                    self._energy[i] = self._func(self._unstandardize(self._models[i]))
+                self._tic(i+1, "sampling")
+                inside = self._in_search_space(self._models[i])
+                self._tic(i+1, "constraint")
+                if inside:
+                    self._energy[i] = self._eval_models(self._unstandardize(self._models[None,i]))[0]
                     log_alpha = min(0., self._energy[i-1] - self._energy[i])
                     if log_alpha < np.log(np.random.rand()):
                         rejected += 1
@@ -336,16 +644,22 @@ class MonteCarlo:
                     rejected += 1
                     self._models[i] = self._models[i-1]
                     self._energy[i] = self._energy[i-1]
+                self._tic(i+1, "selection")
                     
+                if self._callbacks and self._callback(i+1, rejected):
+                    converge = True
+                    break
                 if i == self._max_iter-1:
                     break
                 
         # Return best model
+        self._trim_models(i+1)
         idx = np.argmin(self._energy)
-        self._models = self._unstandardize(self._models)
+        self._models *= self._std_scale
+        self._models += self._mu_scale
         self._xopt = self._models[idx]
         self._gfit = self._energy[idx]
-        self._acceptance_ratio = 1. - rejected / self._max_iter
+        self._acceptance_ratio = 1. - rejected / self._n_iter
         return self._xopt, self._gfit
         
     def _hamiltonian(self, fprime = None, stepsize = 0.01, n_leap = 10, xstart = None,
@@ -409,11 +723,14 @@ class MonteCarlo:
             raise ValueError("kwargs must be a dictionary")
         
         # Initialize models
+        self._tic(1)
         if xstart is None:
             self._models[0] = np.random.uniform(-1., 1., self._n_dim)
         else:
             self._models[0] = self._standardize(xstart)
-        self._energy[0] = self._func(self._unstandardize(self._models[0]))
+        self._tic(1, "sampling")
+        self._energy[0] = self._eval_models(self._unstandardize(self._models[None,0]))[0]
+        self._tic(1, "selection")
         
         # Save leap frog trajectory
         if snap_leap:
@@ -421,7 +738,14 @@ class MonteCarlo:
         
         # Leap-frog algorithm
         rejected = 0
-        for i in range(1, self._max_iter):
+        n_eval_per_iter = 2 if fprime is not None else 2 + 2 * self._n_dim * (n_leap+2)
+        n_iter = self._max_iter
+        if self._callbacks and self._callback(1, 0):
+            n_iter = 1
+        for i in range(1, n_iter):
+            if self._exhausted(n_eval_per_iter):
+                n_iter = i
+                break
             q = np.array(self._models[i-1])
             p = np.random.randn(self._n_dim)            # Random momentum
             q0, p0 = np.array(q), np.array(p)
@@ -434,12 +758,12 @@ class MonteCarlo:
                 p -= stepsize * grad(q)                 # Momentum
                 q += stepsize * p                       # Position
                 if snap_leap:
-                    self._leap_frog[:,l+1,i-1] = self._unstandardize(q)
+                    self._leap_frog[i-1,:,l+1] = self._unstandardize(q)
             p -= 0.5 * stepsize * grad(q)               # Last half momentum step
+            self._tic(i+1, "sampling")
             
-            U0 = self._func(self._unstandardize(q0))
+            U0, U = self._eval_models(self._unstandardize(np.array([ q0, q ])))
             K0 = 0.5 * np.sum(p0**2)
-            U = self._func(self._unstandardize(q))
             K = 0.5 * np.sum(p**2)
             log_alpha = min(0., U0 - U + K0 - K)
             if log_alpha < np.log(np.random.rand()) \
@@ -450,24 +774,30 @@ class MonteCarlo:
             else:
                 self._models[i] = q
                 self._energy[i] = U
-        self._acceptance_ratio = 1. - rejected / self._max_iter
+            self._tic(i+1, "selection")
+            if self._callbacks and self._callback(i+1, rejected):
+                n_iter = i+1
+                break
         
         # Return best model
+        self._trim_models(n_iter)
+        if snap_leap:
+            self._leap_frog = self._leap_frog[:n_iter-1]
         idx = np.argmin(self._energy)
-        self._models = self._unstandardize(self._models)
+        self._models *= self._std_scale
+        self._models += self._mu_scale
         self._xopt = self._models[idx]
         self._gfit = self._energy[idx]
-        self._acceptance_ratio = 1. - rejected / self._max_iter
+        self._acceptance_ratio = 1. - rejected / self._n_iter
         return self._xopt, self._gfit
     
     def _approx_grad(self, x, delta = 1e-3):
-        grad = np.zeros(self._n_dim)
-        for i in range(self._n_dim):
-            x1, x2 = self._unstandardize(x), self._unstandardize(x)
-            x1[i] -= delta
-            x2[i] += delta
-            grad[i] = 0.5 * ( self._func(x2) - self._func(x1) ) / delta
-        return grad
+        x1 = np.tile(self._unstandardize(x), (self._n_dim, 1))
+        x2 = np.array(x1)
+        x1[np.diag_indices(self._n_dim)] -= delta
+        x2[np.diag_indices(self._n_dim)] += delta
+        fit = self._eval_models(np.concatenate((x2, x1)))
+        return 0.5 * ( fit[:self._n_dim] - fit[self._n_dim:] ) / delta
     
     def _in_search_space(self, x):
         if self._constrain:
@@ -494,7 +824,7 @@ class MonteCarlo:
     @property
     def models(self):
         """
-        ndarray of shape (max_iter, n_dim)
+        ndarray of shape (n_iter, n_dim)
         Sampled models.
         """
         return self._models
@@ -502,11 +832,67 @@ class MonteCarlo:
     @property
     def energy(self):
         """
-        ndarray of shape (max_iter)
+        ndarray of shape (n_iter)
         Energy of sampled models.
         """
         return self._energy
     
+    @property
+    def incidents(self):
+        """
+        list of dict
+        Evaluation incidents recorded by the fault policy (empty if
+        fault_policy is None).
+        """
+        return self._fault_policy.incidents if self._fault_policy is not None else []
+    
+    @property
+    def backend(self):
+        """
+        Backend object or None
+        Evaluation backend.
+        """
+        return self._backend
+    
+    @property
+    def n_iter(self):
+        """
+        int
+        Number of sampled models.
+        """
+        return self._n_iter
+    
+    @property
+    def flag(self):
+        """
+        str
+        Stopping criterion.
+        """
+        if self._flag == -1:
+            return "maximum number of iterations is reached"
+        elif self._flag == 9:
+            return "maximum number of function evaluations is reached"
+        elif self._flag == 10:
+            return "maximum wall-clock time is reached"
+        elif self._flag == 11:
+            return "stopped by callback"
+    
+    @property
+    def n_eval(self):
+        """
+        int
+        Number of function evaluations performed.
+        """
+        return self._n_eval
+    
+    @property
+    def cache(self):
+        """
+        EvaluationCache or None
+        Cache of objective function values.
+        """
+        return self._cache
+    
     @property
     def acceptance_ratio(self):
         """
@@ -515,10 +901,20 @@ class MonteCarlo:
         """
         return self._acceptance_ratio
     
+    @property
+    def profile(self):
+        """
+        structured ndarray of length n_iter
+        Time in seconds spent in each phase ('sampling', 'constraint',
+        'evaluation', 'selection') for each sampled model. Available only
+        when profile = True.
+        """
+        return self._profile_times
+    
     @property
     def leap_frog(self):
         """
-        ndarray of shape (max_iter-1, n_dim, n_leap+1)
+        ndarray of shape (n_iter-1, n_dim, n_leap+1)
         Leap frog positions. Available only when sampler = 'hamiltonian' and
         snap_leap = True.
         """
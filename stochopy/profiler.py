@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+
+"""
+Per-iteration profiler of the phases of optimizers and samplers.
+
+Author: Keurfon Luu <keurfon.luu@mines-paristech.fr>
+License: MIT
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+import numpy as np
+from time import perf_counter
+
+__all__ = [ "PhaseProfiler", "PHASES" ]
+
+
+PHASES = ( "sampling", "constraint", "evaluation", "selection", "covariance",
+           "eigendecomposition", "snapshot" )
+
+
+class PhaseProfiler:
+    """
+    Phase profiler.
+    
+    The iteration of a solver is split into consecutive phases delimited by
+    calls to 'tic'. The time spent in the objective function, reported with
+    'add_eval', is removed from the phase it occurred in and accumulated in
+    the 'evaluation' phase instead.
+    
+    Parameters
+    ----------
+    max_iter : int
+        Maximum number of iterations.
+    """
+    
+    def __init__(self, max_iter):
+        self._times = np.zeros(max_iter, dtype = [ (phase, np.float64) for phase in PHASES ])
+        self._tic = perf_counter()
+        self._eval = 0.
+    
+    def tic(self, it, phase = None):
+        """
+        Close the current phase of iteration 'it' and start a new one.
+        
+        Parameters
+        ----------
+        it : int
+            Iteration number (starting from 1).
+        phase : str or None, optional, default None
+            Name of the phase to close. If None, the elapsed time is
+            discarded.
+        """
+        t = perf_counter()
+        if phase is not None:
+            times = self._times[it-1]
+            times[phase] += t - self._tic - self._eval
+            times["evaluation"] += self._eval
+        self._tic = t
+        self._eval = 0.
+    
+    def add_eval(self, dt):
+        """
+        Report time spent in the objective function during the current phase.
+        """
+        self._eval += dt
+    
+    def times(self, n_iter):
+        """
+        Structured ndarray of shape (n_iter,) with the time in seconds spent
+        in each phase at each iteration.
+        """
+        return self._times[:n_iter]
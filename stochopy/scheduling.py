@@ -0,0 +1,182 @@
+# -*- coding: utf-8 -*-
+
+"""
+Cost-aware scheduling of the evaluations of a batch of models. Models are
+dispatched longest first, given their costs estimated by a user function or
+learnt online from past evaluation times, which reduces the time of a batch
+(makespan) when the cost of the objective function varies between models.
+
+Author: Keurfon Luu <keurfon.luu@mines-paristech.fr>
+License: MIT
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+import numpy as np
+import heapq
+
+__all__ = [ "CostModel", "get_cost_model", "longest_first" ]
+
+
+class CostModel:
+    """
+    Online cost model.
+    
+    The cost of a model is estimated as the mean evaluation time of the
+    'n_neighbors' nearest models evaluated so far (Euclidean distance after
+    scaling each parameter by its standard deviation). All the models have
+    the same cost until 'n_neighbors' timings are known.
+    
+    Parameters
+    ----------
+    n_neighbors : int, optional, default 5
+        Number of nearest models.
+    max_size : int, optional, default 2000
+        Maximum number of timings kept (most recent).
+    """
+    
+    def __init__(self, n_neighbors = 5, max_size = 2000):
+        if not isinstance(n_neighbors, int) or n_neighbors < 1:
+            raise ValueError("n_neighbors must be a positive integer, got %s" % n_neighbors)
+        else:
+            self._n_neighbors = n_neighbors
+        if not isinstance(max_size, int) or max_size < n_neighbors:
+            raise ValueError("max_size must be an integer greater than n_neighbors, got %s" % max_size)
+        else:
+            self._max_size = max_size
+        self._models = None
+        self._times = None
+    
+    def __call__(self, models):
+        """
+        Estimate the costs of a batch of models.
+        
+        Parameters
+        ----------
+        models : ndarray of shape (n_models, n_dim)
+            Models.
+        
+        Returns
+        -------
+        costs : ndarray of shape (n_models)
+            Estimated costs.
+        """
+        if self.size < self._n_neighbors or self._models.shape[1] != models.shape[1]:
+            return np.ones(len(models))
+        scale = np.std(self._models, axis = 0)
+        scale[scale == 0.] = 1.
+        X = self._models / scale
+        Y = models / scale
+        dist = np.sum(Y**2, axis = 1)[:,None] + np.sum(X**2, axis = 1)[None,:] - 2. * np.dot(Y, X.T)
+        idx = np.argpartition(dist, self._n_neighbors - 1, axis = 1)[:,:self._n_neighbors]
+        return np.mean(self._times[idx], axis = 1)
+    
+    def update(self, models, times):
+        """
+        Add evaluation times.
+        
+        Parameters
+        ----------
+        models : ndarray of shape (n_models, n_dim)
+            Evaluated models.
+        times : ndarray of shape (n_models)
+            Evaluation times in seconds.
+        """
+        if self._models is None or self._models.shape[1] != models.shape[1]:
+            self._models = np.array(models, dtype = float)
+            self._times = np.array(times, dtype = float)
+        else:
+            self._models = np.concatenate((self._models, models))
+            self._times = np.concatenate((self._times, times))
+        self._models = self._models[-self._max_size:]
+        self._times = self._times[-self._max_size:]
+    
+    @property
+    def size(self):
+        """
+        int
+        Number of timings kept.
+        """
+        return len(self._times) if self._times is not None else 0
+
+
+class _CostFunction:
+    """
+    Cost estimated by a user function of a model.
+    """
+    
+    def __init__(self, func):
+        self._func = func
+    
+    def __call__(self, models):
+        return np.array([ self._func(x) for x in models ], dtype = float)
+    
+    def update(self, models, times):
+        pass
+
+
+def get_cost_model(cost):
+    """
+    Return a cost model given a cost option.
+    
+    Parameters
+    ----------
+    cost : {None, 'online'}, callable or CostModel
+        Cost of the objective function.
+        - 'online', CostModel with default parameters.
+        - callable, function returning the estimated cost of a model.
+    
+    Returns
+    -------
+    cost_model : cost model or None
+        Object returning the costs of a batch of models when called, and
+        updated with the evaluation times.
+    """
+    if cost is None:
+        return None
+    elif isinstance(cost, CostModel):
+        return cost
+    elif isinstance(cost, str):
+        if cost == "online":
+            return CostModel()
+        else:
+            raise ValueError("cost must be either None, 'online', a callable or a CostModel, got %s" % cost)
+    elif hasattr(cost, "__call__"):
+        return _CostFunction(cost)
+    else:
+        raise ValueError("cost must be either None, 'online', a callable or a CostModel")
+
+
+def longest_first(costs, n_workers, chunksize = None):
+    """
+    Split the indices of a batch of models into chunks, longest first.
+    
+    Parameters
+    ----------
+    costs : ndarray of shape (n_models)
+        Estimated costs of the models.
+    n_workers : int
+        Number of workers.
+    chunksize : int or None, optional, default None
+        Number of models per chunk. Chunks are meant to be dispatched in
+        order to idle workers. If None, the models are packed into one chunk
+        per worker with the longest processing time first rule (each model,
+        longest first, goes to the least loaded worker).
+    
+    Returns
+    -------
+    chunks : list of ndarray
+        Indices of the models of each chunk, in dispatch order.
+    """
+    n = len(costs)
+    order = np.argsort(-np.asarray(costs), kind = "stable").astype(np.int64)
+    if chunksize is not None:
+        return [ order[i:i+chunksize] for i in range(0, n, chunksize) ]
+    
+    # Longest processing time first
+    bins = [ [] for i in range(min(n_workers, n)) ]
+    loads = [ (0., i) for i in range(len(bins)) ]
+    for k in order:
+        load, i = heapq.heappop(loads)
+        bins[i].append(k)
+        heapq.heappush(loads, (load + costs[k], i))
+    return [ np.array(b, dtype = np.int64) for b in bins ]
@@ -0,0 +1,286 @@
+# -*- coding: utf-8 -*-
+
+"""
+Compact snapshots of the populations explored by evolutionary algorithms.
+
+Author: Keurfon Luu <keurfon.luu@mines-paristech.fr>
+License: MIT
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+import numpy as np
+import copy
+
+__all__ = [ "Snapshot" ]
+
+
+class Snapshot:
+    """
+    Snapshot options.
+    
+    By default, the models and energy of every individual are saved in
+    double precision at every iteration. The memory footprint can be reduced
+    by saving in lower precision, every few iterations and/or only the best
+    individuals of each saved generation.
+    
+    Parameters
+    ----------
+    dtype : {'float64', 'float32', 'float16'}, optional, default 'float64'
+        Precision of the saved models and mean models. Energy is saved at
+        least in single precision as objective function values often
+        overflow half precision.
+    every : int, optional, default 1
+        Save every 'every' iterations (first iteration included).
+    top_k : int or None, optional, default None
+        Only save the 'top_k' individuals with the lowest energy of each
+        saved generation, sorted by increasing energy. If None, save all the
+        individuals in population order.
+    delta : bool, optional, default False
+        Save the difference between consecutive saved generations instead of
+        the models themselves. Differences are small once the population has
+        converged, which improves the accuracy of low precision snapshots.
+        Models are decoded in double precision when accessed.
+    """
+    
+    _ATTRIBUTES = [ "dtype", "every", "top_k", "delta", "nbytes" ]
+    
+    def __init__(self, dtype = "float64", every = 1, top_k = None, delta = False):
+        # Check inputs
+        if np.dtype(dtype) not in [ np.float64, np.float32, np.float16 ]:
+            raise ValueError("dtype must be either 'float64', 'float32' or 'float16', got %s" % dtype)
+        else:
+            self._dtype = np.dtype(dtype)
+        if not isinstance(every, int) or every < 1:
+            raise ValueError("every must be a positive integer, got %s" % every)
+        else:
+            self._every = every
+        if top_k is not None and (not isinstance(top_k, int) or top_k < 1):
+            raise ValueError("top_k must be None or a positive integer, got %s" % top_k)
+        else:
+            self._top_k = top_k
+        if not isinstance(delta, bool):
+            raise ValueError("delta must be either True or False, got %s" % delta)
+        else:
+            self._delta = delta
+        
+        # Initialize
+        self._models = None
+        self._energy = None
+        self._means = None
+        self._iterations = None
+        self._n = 0
+    
+    def __repr__(self):
+        attributes = [ "%s: %s" % (attr.rjust(13), getattr(self, attr))
+                        for attr in self._ATTRIBUTES ]
+        return "\n".join(attributes) + "\n"
+    
+    def start(self, popsize, n_dim, max_iter, mu_scale, std_scale, means = False):
+        """
+        Allocate a new snapshot with these options.
+        
+        Parameters
+        ----------
+        popsize : int
+            Population size.
+        n_dim : int
+            Number of dimensions.
+        max_iter : int
+            Maximum number of iterations.
+        mu_scale, std_scale : ndarray of shape (n_dim)
+            Center and half-width of the search space used to unstandardize
+            the models.
+        means : bool, optional, default False
+            Also save mean models.
+        
+        Returns
+        -------
+        snapshot : Snapshot
+            Empty snapshot.
+        """
+        snapshot = copy.copy(self)
+        k = min(self._top_k, popsize) if self._top_k is not None else popsize
+        n_snap = (max_iter - 1) // self._every + 1
+        snapshot._mu_scale = mu_scale
+        snapshot._std_scale = std_scale
+        snapshot._models = np.zeros((k, n_dim, n_snap), dtype = self._dtype)
+        snapshot._energy = np.zeros((k, n_snap), dtype = np.promote_types(self._dtype, np.float32))
+        snapshot._means = np.zeros((n_snap, n_dim), dtype = self._dtype) if means else None
+        snapshot._iterations = np.zeros(n_snap, dtype = int)
+        snapshot._buffer = np.zeros((k, n_dim))
+        snapshot._last = np.zeros((k, n_dim)) if self._delta else None
+        snapshot._last_mean = np.zeros(n_dim) if self._delta and means else None
+        snapshot._n = 0
+        return snapshot
+    
+    def estimate_memory(self, popsize, n_dim, max_iter, means = False):
+        """
+        Estimate the memory allocated by 'start' with these options.
+        
+        Parameters
+        ----------
+        popsize : int
+            Population size.
+        n_dim : int
+            Number of dimensions.
+        max_iter : int
+            Maximum number of iterations.
+        means : bool, optional, default False
+            Also save mean models.
+        
+        Returns
+        -------
+        nbytes : int
+            Memory in bytes, including the work arrays used while saving.
+        """
+        k = min(self._top_k, popsize) if self._top_k is not None else popsize
+        n_snap = (max_iter - 1) // self._every + 1
+        itemsize = self._dtype.itemsize
+        nbytes = k * n_dim * n_snap * itemsize
+        nbytes += k * n_snap * np.promote_types(self._dtype, np.float32).itemsize
+        nbytes += n_snap * n_dim * itemsize if means else 0
+        nbytes += n_snap * np.dtype(int).itemsize
+        nbytes += k * n_dim * 8 * (2 if self._delta else 1)
+        nbytes += n_dim * 8 if self._delta and means else 0
+        return int(nbytes)
+    
+    def record(self, it, models, energy, xmean = None):
+        """
+        Save a generation if iteration 'it' is to be saved.
+        
+        Parameters
+        ----------
+        it : int
+            Iteration number (starting from 1).
+        models : ndarray of shape (popsize, n_dim)
+            Standardized models.
+        energy : ndarray of shape (popsize)
+            Energy of the models.
+        xmean : ndarray of shape (n_dim) or None, optional, default None
+            Standardized mean model.
+        """
+        if (it - 1) % self._every:
+            return
+        j = self._n
+        buf = self._buffer
+        if self._top_k is not None and self._top_k < len(energy):
+            idx = np.argpartition(energy, self._top_k - 1)[:self._top_k]
+            idx = idx[np.argsort(energy[idx])]
+            np.take(models, idx, axis = 0, out = buf)
+            self._energy[:,j] = energy[idx]
+        else:
+            buf[...] = models
+            self._energy[:,j] = energy
+        buf *= self._std_scale
+        buf += self._mu_scale
+        if self._delta:
+            buf -= self._last
+            self._models[:,:,j] = buf
+            self._last += self._models[:,:,j]
+        else:
+            self._models[:,:,j] = buf
+        if self._means is not None:
+            mean = xmean * self._std_scale + self._mu_scale
+            if self._delta:
+                self._means[j] = mean - self._last_mean
+                self._last_mean += self._means[j]
+            else:
+                self._means[j] = mean
+        self._iterations[j] = it
+        self._n += 1
+    
+    def trim(self):
+        """
+        Release the storage of the generations that were not saved.
+        """
+        n = self._n
+        if n < len(self._iterations):
+            self._models = np.array(self._models[:,:,:n])
+            self._energy = np.array(self._energy[:,:n])
+            if self._means is not None:
+                self._means = np.array(self._means[:n])
+            self._iterations = np.array(self._iterations[:n])
+        self._buffer = self._last = self._last_mean = None
+    
+    @property
+    def dtype(self):
+        """
+        numpy.dtype
+        Precision of the saved models.
+        """
+        return self._dtype
+    
+    @property
+    def every(self):
+        """
+        int
+        Saving interval in iterations.
+        """
+        return self._every
+    
+    @property
+    def top_k(self):
+        """
+        int or None
+        Number of best individuals saved per generation.
+        """
+        return self._top_k
+    
+    @property
+    def delta(self):
+        """
+        bool
+        Whether differences between consecutive generations are saved.
+        """
+        return self._delta
+    
+    @property
+    def models(self):
+        """
+        ndarray of shape (k, n_dim, n_snap)
+        Saved models (decoded in double precision if delta = True).
+        """
+        if self._models is None:
+            return None
+        elif self._delta:
+            return np.cumsum(self._models[:,:,:self._n], axis = 2, dtype = np.float64)
+        else:
+            return self._models[:,:,:self._n]
+    
+    @property
+    def energy(self):
+        """
+        ndarray of shape (k, n_snap)
+        Energy of the saved models.
+        """
+        return self._energy[:,:self._n] if self._energy is not None else None
+    
+    @property
+    def means(self):
+        """
+        ndarray of shape (n_snap, n_dim) or None
+        Saved mean models (decoded in double precision if delta = True).
+        """
+        if self._means is None:
+            return None
+        elif self._delta:
+            return np.cumsum(self._means[:self._n], axis = 0, dtype = np.float64)
+        else:
+            return self._means[:self._n]
+    
+    @property
+    def iterations(self):
+        """
+        ndarray of shape (n_snap)
+        Iteration numbers of the saved generations.
+        """
+        return self._iterations[:self._n] if self._iterations is not None else None
+    
+    @property
+    def nbytes(self):
+        """
+        int
+        Memory used by the saved arrays in bytes.
+        """
+        return sum(a.nbytes for a in [ self._models, self._energy, self._means, self._iterations ]
+                   if a is not None)
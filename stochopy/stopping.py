@@ -0,0 +1,388 @@
+# -*- coding: utf-8 -*-
+
+"""
+Stopping criteria evaluated at each iteration of evolutionary algorithms.
+Criteria over the last iterations keep their values in ring buffers with
+running minimum and maximum, so that their cost per iteration does not
+depend on the number of iterations.
+
+Author: Keurfon Luu <keurfon.luu@mines-paristech.fr>
+License: MIT
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+import numpy as np
+from collections import deque
+
+__all__ = [ "RingBuffer", "StoppingCriterion", "AnyOf", "AllOf", "EqualFunValues",
+            "TolFun", "Stagnation", "Target" ]
+
+
+class RingBuffer:
+    """
+    Ring buffer of the last values of a scalar series with running minimum
+    and maximum.
+    
+    Pushing a value and querying the minimum or the maximum are O(1)
+    (amortized), using monotonic queues of the buffered values.
+    
+    Parameters
+    ----------
+    size : int
+        Number of values kept.
+    """
+    
+    def __init__(self, size):
+        if not isinstance(size, (int, np.integer)) or size < 1:
+            raise ValueError("size must be a positive integer, got %s" % size)
+        else:
+            self._size = int(size)
+        self._values = np.zeros(self._size)
+        self.clear()
+    
+    def __len__(self):
+        return min(self._n, self._size)
+    
+    def clear(self):
+        """
+        Remove all the values.
+        """
+        self._n = 0
+        self._min = deque()
+        self._max = deque()
+    
+    def push(self, value):
+        """
+        Append a value, dropping the oldest one if the buffer is full.
+        
+        Parameters
+        ----------
+        value : scalar
+            New value.
+        """
+        i = self._n
+        self._values[i % self._size] = value
+        self._n += 1
+        
+        # Monotonic queues of (index, value), oldest first
+        while self._min and self._min[-1][1] >= value:
+            self._min.pop()
+        self._min.append((i, value))
+        while self._max and self._max[-1][1] <= value:
+            self._max.pop()
+        self._max.append((i, value))
+        
+        # Drop the values that left the window
+        if self._min[0][0] <= i - self._size:
+            self._min.popleft()
+        if self._max[0][0] <= i - self._size:
+            self._max.popleft()
+    
+    def min(self):
+        """
+        Minimum of the buffered values (NaN if empty).
+        """
+        return self._min[0][1] if self._min else np.nan
+    
+    def max(self):
+        """
+        Maximum of the buffered values (NaN if empty).
+        """
+        return self._max[0][1] if self._max else np.nan
+    
+    @property
+    def size(self):
+        """
+        int
+        Number of values kept.
+        """
+        return self._size
+    
+    @property
+    def full(self):
+        """
+        bool
+        Whether 'size' values have been pushed.
+        """
+        return self._n >= self._size
+    
+    @property
+    def values(self):
+        """
+        ndarray
+        Buffered values, oldest first.
+        """
+        if self._n <= self._size:
+            return np.array(self._values[:self._n])
+        else:
+            i = self._n % self._size
+            return np.concatenate((self._values[i:], self._values[:i]))
+
+
+class StoppingCriterion:
+    """
+    Base class of stopping criteria.
+    
+    A criterion is updated once per iteration with the objective function
+    values of the current population and returns True when the optimization
+    should stop. Subclasses implement 'update' and, if they keep a state,
+    'reset'. Criteria are combined with the operators | (any is met) and &
+    (all are met).
+    
+    A criterion is terminal by default: it also ends the restarts of IPOP
+    and BIPOP CMA-ES. Criteria of local convergence (Stagnation, TolFun,
+    EqualFunValues) are restartable, the solver is restarted when they are
+    met.
+    """
+    
+    def __or__(self, other):
+        return AnyOf([ self, other ])
+    
+    def __and__(self, other):
+        return AllOf([ self, other ])
+    
+    def __repr__(self):
+        return self.message
+    
+    def reset(self):
+        """
+        Reset the state of the criterion before a new run.
+        """
+        pass
+    
+    def update(self, it, fitness):
+        """
+        Update the criterion with a new iteration.
+        
+        Parameters
+        ----------
+        it : int
+            Iteration number (starting from 1).
+        fitness : ndarray
+            Objective function values of the current population.
+        
+        Returns
+        -------
+        stop : bool
+            True if the criterion is met.
+        """
+        raise NotImplementedError
+    
+    @property
+    def message(self):
+        """
+        str
+        Description of the criterion.
+        """
+        return type(self).__name__
+    
+    @property
+    def terminal(self):
+        """
+        bool
+        Whether the criterion ends the restarts.
+        """
+        return True
+
+
+class AnyOf(StoppingCriterion):
+    """
+    Met when any of the criteria is met. Every criterion is updated at each
+    iteration.
+    
+    Parameters
+    ----------
+    criteria : list of StoppingCriterion
+        Criteria to combine.
+    """
+    
+    def __init__(self, criteria):
+        if not isinstance(criteria, (list, tuple)) or not criteria \
+            or not all(isinstance(c, StoppingCriterion) for c in criteria):
+            raise ValueError("criteria must be a non-empty list of StoppingCriterion")
+        self._criteria = list(criteria)
+        self._met = []
+    
+    def reset(self):
+        self._met = []
+        for criterion in self._criteria:
+            criterion.reset()
+    
+    def update(self, it, fitness):
+        self._met = [ c for c in self._criteria if c.update(it, fitness) ]
+        return bool(self._met)
+    
+    @property
+    def message(self):
+        if self._met:
+            return self._met[0].message
+        return " or ".join("(%s)" % c.message for c in self._criteria)
+    
+    @property
+    def terminal(self):
+        return any(c.terminal for c in (self._met or self._criteria))
+    
+    @property
+    def criteria(self):
+        """
+        list of StoppingCriterion
+        Combined criteria.
+        """
+        return list(self._criteria)
+
+
+class AllOf(AnyOf):
+    """
+    Met when all the criteria are met at the same iteration.
+    
+    Parameters
+    ----------
+    criteria : list of StoppingCriterion
+        Criteria to combine.
+    """
+    
+    def update(self, it, fitness):
+        met = [ c.update(it, fitness) for c in self._criteria ]
+        return all(met)
+    
+    @property
+    def message(self):
+        return " and ".join("(%s)" % c.message for c in self._criteria)
+    
+    @property
+    def terminal(self):
+        return any(c.terminal for c in self._criteria)
+
+
+class EqualFunValues(StoppingCriterion):
+    """
+    Met when the range of the best objective function values over the last
+    'window' iterations is lower than 'tol'.
+    
+    Parameters
+    ----------
+    window : int
+        Number of iterations.
+    tol : scalar, optional, default 1e-10
+        Tolerance.
+    """
+    
+    def __init__(self, window, tol = 1e-10):
+        self._best = RingBuffer(window)
+        self._tol = tol
+    
+    def reset(self):
+        self._best.clear()
+    
+    def update(self, it, fitness):
+        self._best.push(fitness.min())
+        return self._best.full and self._best.max() - self._best.min() < self._tol
+    
+    @property
+    def message(self):
+        return "EqualFunValues"
+    
+    @property
+    def terminal(self):
+        return False
+
+
+class TolFun(StoppingCriterion):
+    """
+    Met when the range of the best objective function values over the last
+    'window' iterations and of the values of the current population is
+    lower than 'tol'. Not tested over the first two iterations.
+    
+    Parameters
+    ----------
+    window : int
+        Number of iterations.
+    tol : scalar, optional, default 1e-12
+        Tolerance.
+    """
+    
+    def __init__(self, window, tol = 1e-12):
+        self._best = RingBuffer(window)
+        self._tol = tol
+    
+    def reset(self):
+        self._best.clear()
+    
+    def update(self, it, fitness):
+        fmin, fmax = fitness.min(), fitness.max()
+        self._best.push(fmin)
+        return len(self._best) > 2 \
+               and max(fmax, self._best.max()) - min(fmin, self._best.min()) < self._tol
+    
+    @property
+    def message(self):
+        return "TolFun"
+    
+    @property
+    def terminal(self):
+        return False
+
+
+class Stagnation(StoppingCriterion):
+    """
+    Met when the best objective function value found so far has not
+    decreased by more than 'tol' over the last 'window' iterations.
+    
+    Parameters
+    ----------
+    window : int
+        Number of iterations.
+    tol : scalar, optional, default 0.
+        Minimum decrease.
+    """
+    
+    def __init__(self, window, tol = 0.):
+        if not isinstance(window, int) or window < 1:
+            raise ValueError("window must be a positive integer, got %s" % window)
+        if not isinstance(tol, (float, int)) or tol < 0.:
+            raise ValueError("tol must be positive, got %s" % tol)
+        self._best = RingBuffer(window + 1)
+        self._window = window
+        self._tol = tol
+        self._gfit = np.inf
+    
+    def reset(self):
+        self._best.clear()
+        self._gfit = np.inf
+    
+    def update(self, it, fitness):
+        self._gfit = min(self._gfit, fitness.min())
+        self._best.push(self._gfit)
+        return self._best.full and self._best.max() - self._gfit <= self._tol
+    
+    @property
+    def message(self):
+        return "best fitness decreases by at most %g in %d iterations" % (self._tol, self._window)
+    
+    @property
+    def terminal(self):
+        return False
+
+
+class Target(StoppingCriterion):
+    """
+    Met when an objective function value lower than or equal to 'target'
+    is found.
+    
+    Parameters
+    ----------
+    target : scalar
+        Target objective function value.
+    """
+    
+    def __init__(self, target):
+        if not isinstance(target, (float, int)):
+            raise ValueError("target must be a number, got %s" % target)
+        self._target = target
+    
+    def update(self, it, fitness):
+        return fitness.min() <= self._target
+    
+    @property
+    def message(self):
+        return "fitness is lower than target %g" % self._target
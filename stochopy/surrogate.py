@@ -0,0 +1,314 @@
+# -*- coding: utf-8 -*-
+
+"""
+Surrogate models used to pre-screen candidate models before evaluating them
+with the true objective function.
+
+Author: Keurfon Luu <keurfon.luu@mines-paristech.fr>
+License: MIT
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+import numpy as np
+
+__all__ = [ "RBFSurrogate", "GaussianProcessSurrogate" ]
+
+
+class RBFSurrogate:
+    """
+    Radial Basis Function surrogate.
+    
+    This surrogate interpolates the archive of evaluated models with cubic
+    radial basis functions and a linear polynomial tail. At each generation,
+    candidate models are ranked by predicted objective function value and
+    only the most promising fraction is evaluated with the true objective
+    function. If the rank correlation between predicted and true values
+    drops below a threshold, the remaining candidates are evaluated too.
+    
+    Parameters
+    ----------
+    ratio : scalar, optional, default 0.5
+        Fraction of candidates evaluated with the true objective function at
+        each generation.
+    min_corr : scalar, optional, default 0.5
+        Minimum Spearman rank correlation between predicted and true values
+        of the evaluated candidates. Below this threshold, the surrogate is
+        deemed unreliable and all candidates are evaluated.
+    n_min : int or None, optional, default None
+        Minimum number of models in the archive before the surrogate is used.
+        If None, n_min = 2 * (n_dim + 1).
+    max_archive : int, optional, default 500
+        Maximum number of most recently evaluated models used to build the
+        surrogate.
+    """
+    
+    def __init__(self, ratio = 0.5, min_corr = 0.5, n_min = None, max_archive = 500):
+        # Check inputs
+        if not isinstance(ratio, (float, int)) or not 0. < ratio <= 1.:
+            raise ValueError("ratio must be an integer or float in ] 0, 1 ], got %s" % ratio)
+        else:
+            self._ratio = ratio
+        if not isinstance(min_corr, (float, int)) or not -1. <= min_corr <= 1.:
+            raise ValueError("min_corr must be an integer or float in [ -1, 1 ], got %s" % min_corr)
+        else:
+            self._min_corr = min_corr
+        if n_min is not None and (not isinstance(n_min, int) or n_min < 2):
+            raise ValueError("n_min must be an integer > 1, got %s" % n_min)
+        else:
+            self._n_min = n_min
+        if not isinstance(max_archive, int) or max_archive < 2:
+            raise ValueError("max_archive must be an integer > 1, got %s" % max_archive)
+        else:
+            self._max_archive = max_archive
+        self.reset()
+    
+    def reset(self):
+        """
+        Empty the archive and reset statistics.
+        """
+        self._X = None
+        self._y = None
+        self._fitted = False
+        self._n_skip = 0
+        self._n_fallback = 0
+        self._corr = []
+    
+    def update(self, X, y):
+        """
+        Add evaluated models to the archive.
+        
+        Parameters
+        ----------
+        X : ndarray of shape (n_models, n_dim)
+            Evaluated models.
+        y : ndarray of shape (n_models)
+            Objective function values.
+        """
+        mask = np.isfinite(y)
+        if not np.any(mask):
+            return
+        if self._X is None:
+            self._X = np.array(X[mask])
+            self._y = np.array(y[mask])
+        else:
+            self._X = np.concatenate((self._X, X[mask]))[-self._max_archive:]
+            self._y = np.concatenate((self._y, y[mask]))[-self._max_archive:]
+        self._fitted = False
+    
+    def ready(self):
+        """
+        Check whether the archive is large enough for the surrogate to be used.
+        """
+        if self._X is None:
+            return False
+        n_min = self._n_min if self._n_min is not None else 2 * ( self._X.shape[1] + 1 )
+        return len(self._y) >= n_min
+    
+    def predict(self, X):
+        """
+        Predict the objective function values of models.
+        
+        Parameters
+        ----------
+        X : ndarray of shape (n_models, n_dim)
+            Models.
+        
+        Returns
+        -------
+        y : ndarray of shape (n_models)
+            Predicted objective function values.
+        """
+        if not self._fitted:
+            self._fit()
+            self._fitted = True
+        return self._predict(np.atleast_2d(X))
+    
+    def screen(self, pred):
+        """
+        Select the candidates to evaluate with the true objective function.
+        
+        Parameters
+        ----------
+        pred : ndarray of shape (n_models)
+            Predicted objective function values.
+        
+        Returns
+        -------
+        idx : ndarray
+            Indices of the most promising candidates.
+        """
+        n_true = max(1, int(np.ceil(self._ratio * len(pred))))
+        return np.argsort(pred)[:n_true]
+    
+    def accept(self, pred, fit, n_skip = 0):
+        """
+        Check the rank correlation between predicted and true values.
+        
+        Parameters
+        ----------
+        pred : ndarray
+            Predicted objective function values.
+        fit : ndarray
+            True objective function values.
+        n_skip : int, optional, default 0
+            Number of candidates that are not evaluated if the surrogate is
+            deemed reliable.
+        
+        Returns
+        -------
+        accept : bool
+            False if the surrogate is deemed unreliable.
+        """
+        if len(pred) >= 3:
+            corr = spearman(pred, fit)
+            self._corr.append(corr)
+            if corr < self._min_corr:
+                self._n_fallback += 1
+                return False
+        self._n_skip += n_skip
+        return True
+    
+    def estimate_memory(self, n_dim):
+        """
+        Estimate the peak memory used by a full archive.
+        
+        Parameters
+        ----------
+        n_dim : int
+            Number of dimensions of the models.
+        
+        Returns
+        -------
+        nbytes : int
+            Memory in bytes of the archive and of the linear system solved
+            to build the surrogate.
+        """
+        m = self._max_archive
+        return int(8 * ( 2 * m * (n_dim + 1) + 6 * (m + n_dim + 1)**2 ))
+    
+    def _fit(self):
+        X, y = self._X, self._y
+        n, n_dim = X.shape
+        Phi = self._kernel(X, X)
+        P = np.hstack((np.ones((n, 1)), X))
+        A = np.zeros((n + n_dim + 1, n + n_dim + 1))
+        A[:n,:n] = Phi
+        A[:n,n:] = P
+        A[n:,:n] = P.T
+        b = np.concatenate((y, np.zeros(n_dim + 1)))
+        coef = np.linalg.lstsq(A, b, rcond = None)[0]
+        self._weights = coef[:n]
+        self._poly = coef[n:]
+    
+    def _predict(self, X):
+        return np.dot(self._kernel(X, self._X), self._weights) \
+               + self._poly[0] + np.dot(X, self._poly[1:])
+    
+    @staticmethod
+    def _kernel(X1, X2):
+        return cdist(X1, X2)**3
+    
+    @property
+    def max_archive(self):
+        """
+        int
+        Maximum number of models used to build the surrogate.
+        """
+        return self._max_archive
+    
+    @property
+    def n_skip(self):
+        """
+        int
+        Number of true evaluations avoided thanks to the surrogate.
+        """
+        return self._n_skip
+    
+    @property
+    def n_fallback(self):
+        """
+        int
+        Number of generations fully evaluated because the surrogate was
+        deemed unreliable.
+        """
+        return self._n_fallback
+    
+    @property
+    def corr(self):
+        """
+        ndarray
+        Rank correlation between predicted and true values at each screened
+        generation.
+        """
+        return np.array(self._corr)
+
+
+class GaussianProcessSurrogate(RBFSurrogate):
+    """
+    Gaussian Process regression surrogate.
+    
+    This surrogate predicts the posterior mean of a Gaussian Process with a
+    squared exponential kernel fitted on the archive of evaluated models. The
+    length scale is set to the median distance between archived models.
+    Screening parameters are the same as RBFSurrogate.
+    
+    Parameters
+    ----------
+    ratio : scalar, optional, default 0.5
+        Fraction of candidates evaluated with the true objective function at
+        each generation.
+    min_corr : scalar, optional, default 0.5
+        Minimum Spearman rank correlation between predicted and true values
+        of the evaluated candidates.
+    n_min : int or None, optional, default None
+        Minimum number of models in the archive before the surrogate is used.
+        If None, n_min = 2 * (n_dim + 1).
+    max_archive : int, optional, default 500
+        Maximum number of most recently evaluated models used to build the
+        surrogate.
+    nugget : scalar, optional, default 1e-8
+        Regularization added to the diagonal of the covariance matrix.
+    """
+    
+    def __init__(self, ratio = 0.5, min_corr = 0.5, n_min = None, max_archive = 500,
+                 nugget = 1e-8):
+        super(GaussianProcessSurrogate, self).__init__(ratio = ratio,
+                                                       min_corr = min_corr,
+                                                       n_min = n_min,
+                                                       max_archive = max_archive)
+        if not isinstance(nugget, (float, int)) or nugget < 0.:
+            raise ValueError("nugget must be positive, got %s" % nugget)
+        else:
+            self._nugget = nugget
+    
+    def _fit(self):
+        X, y = self._X, self._y
+        dist = cdist(X, X)
+        self._length = max(np.median(dist[np.triu_indices(len(y), 1)]), 1e-12)
+        self._ymean = np.mean(y)
+        self._ystd = max(np.std(y), 1e-12)
+        K = np.exp(-0.5 * (dist / self._length)**2) + self._nugget * np.eye(len(y))
+        self._weights = np.linalg.lstsq(K, (y - self._ymean) / self._ystd, rcond = None)[0]
+    
+    def _predict(self, X):
+        K = np.exp(-0.5 * (cdist(X, self._X) / self._length)**2)
+        return self._ymean + self._ystd * np.dot(K, self._weights)
+
+
+def cdist(X1, X2):
+    """
+    Euclidean distances between two sets of models.
+    """
+    d2 = np.sum(X1**2, axis = 1)[:,None] + np.sum(X2**2, axis = 1)[None,:] - 2. * np.dot(X1, X2.T)
+    return np.sqrt(np.maximum(d2, 0.))
+
+
+def spearman(x, y):
+    """
+    Spearman rank correlation coefficient.
+    """
+    rx = np.argsort(np.argsort(x)).astype(float)
+    ry = np.argsort(np.argsort(y)).astype(float)
+    if np.std(rx) == 0. or np.std(ry) == 0.:
+        return 0.
+    return np.corrcoef(rx, ry)[0,1]
@@ -0,0 +1,310 @@
+# -*- coding: utf-8 -*-
+
+"""
+Distribution of the models of a generation over MPI processes.
+
+Author: Keurfon Luu <keurfon.luu@mines-paristech.fr>
+License: MIT
+"""
+
+from __future__ import absolute_import, division, print_function, unicode_literals
+import numpy as np
+import sys
+import traceback
+from time import perf_counter
+from .scheduling import get_cost_model, longest_first
+try:
+    from mpi4py import MPI
+except ImportError:
+    mpi_exist = False
+else:
+    mpi_exist = True
+
+__all__ = [ "TaskFarm" ]
+
+
+class TaskFarm:
+    """
+    MPI task farm.
+    
+    Every process runs the optimizer and takes part in the evaluation of
+    each generation. With the static schedule, the models are split
+    round-robin between the processes and the fastest processes wait for
+    the slowest ones. With the dynamic schedule, the processes take the next
+    chunk of models from a shared counter (MPI one-sided atomic operation on
+    the root process) as soon as they are done with the previous one, which
+    balances the load when the cost of the objective function varies. No
+    process is dedicated to the distribution of the models.
+    
+    When the objective function is itself an MPI program, the processes can
+    be split into evaluation groups of 'group_size' processes. The models
+    are then distributed between the groups, every process of a group calls
+    the objective function with the same model (and the communicator of the
+    group in attribute 'group_comm'), and the value returned on the first
+    process of the group is kept.
+    
+    Parameters
+    ----------
+    schedule : {'dynamic', 'static'}, optional, default 'dynamic'
+        Distribution of the models.
+        - 'dynamic', idle processes take the next chunk of models.
+        - 'static', the models are split round-robin between the
+          processes.
+    chunksize : int, optional, default 1
+        Number of models taken by a process at once. Only used when
+        schedule = 'dynamic'.
+    group_size : int or None, optional, default None
+        Number of processes per evaluation. If not None, the communicator
+        is split into groups of 'group_size' processes and Evolutionary
+        passes the communicator of the group to the objective function as
+        keyword argument 'comm'. The number of processes must be a multiple
+        of 'group_size'.
+    cost : {None, 'online'}, callable or CostModel, optional, default None
+        Cost of the objective function. If not None, models are dispatched
+        longest first with the dynamic schedule, and packed between the
+        processes (longest processing time first) with the static
+        schedule. The costs must be the same on every process.
+        - 'online', costs learnt from past evaluation times.
+        - callable, function returning the estimated cost of a model.
+    """
+    
+    _ATTRIBUTES = [ "schedule", "chunksize", "group_size", "efficiency" ]
+    
+    def __init__(self, schedule = "dynamic", chunksize = 1, group_size = None, cost = None):
+        if schedule not in [ "dynamic", "static" ]:
+            raise ValueError("schedule must either be 'dynamic' or 'static', got %s" % schedule)
+        else:
+            self._schedule = schedule
+        if not isinstance(chunksize, int) or chunksize < 1:
+            raise ValueError("chunksize must be a positive integer, got %s" % chunksize)
+        else:
+            self._chunksize = chunksize
+        if group_size is not None and (not isinstance(group_size, int) or group_size < 1):
+            raise ValueError("group_size must be None or a positive integer, got %s" % group_size)
+        else:
+            self._group_size = group_size
+        self._cost = get_cost_model(cost)
+        self._comm = None
+        self._group_comm = None
+        self._rank = 0
+        self._size = 1
+        self._busy = np.zeros(1)
+        self._idle = np.zeros(1)
+        self._n_tasks = np.zeros(1, dtype = int)
+    
+    def __repr__(self):
+        attributes = [ "%s: %s" % (attr.rjust(10), getattr(self, attr))
+                        for attr in self._ATTRIBUTES ]
+        return "\n".join(attributes) + "\n"
+    
+    def start(self, comm):
+        """
+        Attach the farm to a communicator and reset the statistics. Must be
+        called by every process.
+        
+        Parameters
+        ----------
+        comm : MPI.Comm
+            Communicator of the processes.
+        """
+        if not mpi_exist:
+            raise ValueError("mpi4py is not installed or not properly installed")
+        self._comm = comm
+        self._rank = comm.Get_rank()
+        self._size = comm.Get_size()
+        
+        # Evaluation groups of consecutive ranks
+        group_size = self._group_size if self._group_size is not None else 1
+        if self._size % group_size:
+            raise ValueError("the number of processes (%d) must be a multiple of group_size (%d)"
+                             % (self._size, group_size))
+        self._n_groups = self._size // group_size
+        self._group = self._rank // group_size
+        self._leader = self._rank % group_size == 0
+        if self._group_comm is not None:
+            self._group_comm.Free()
+            self._group_comm = None
+        if self._group_size is not None:
+            self._group_comm = comm.Split(self._group, self._rank)
+        self._busy = np.zeros(self._size)
+        self._idle = np.zeros(self._size)
+        self._n_tasks = np.zeros(self._size, dtype = int)
+    
+    def evaluate(self, func, models):
+        """
+        Evaluate a batch of models. Must be called by every process with the
+        same models.
+        
+        Parameters
+        ----------
+        func : callable
+            Objective function.
+        models : ndarray of shape (n_models, n_dim)
+            Models to evaluate.
+        
+        Returns
+        -------
+        fit : ndarray of shape (n_models)
+            Objective function values, on every process.
+        """
+        starttime = perf_counter()
+        self._t_busy, self._n = 0., 0
+        try:
+            costs = self._cost(models) if self._cost is not None else None
+            if self._schedule == "dynamic" and self._n_groups > 1:
+                fit, times = self._dynamic(func, models, costs)
+            else:
+                fit, times = self._static(func, models, costs)
+            if self._cost is not None:
+                self._cost.update(models, times)
+        except Exception:
+            # Other processes would wait forever
+            traceback.print_exc()
+            sys.stderr.flush()
+            self._comm.Abort(1)
+        
+        # Gather busy and idle times of every process
+        elapsed = perf_counter() - starttime
+        stats = self._comm.allgather((self._t_busy, elapsed - self._t_busy, self._n))
+        for i, (busy, idle, n) in enumerate(stats):
+            self._busy[i] += busy
+            self._idle[i] += idle
+            self._n_tasks[i] += n
+        return np.array(fit)
+    
+    def _call(self, func, x):
+        starttime = perf_counter()
+        f = func(x)
+        dt = perf_counter() - starttime
+        self._t_busy += dt
+        self._n += 1
+        return f, dt
+    
+    def _run(self, func, models, idx, values):
+        for k in idx:
+            f, dt = self._call(func, models[k])
+            if self._leader:
+                values[:,k] = f, dt
+    
+    def _static(self, func, models, costs):
+        n = len(models)
+        values = np.zeros((2, n))
+        if costs is None:
+            idx = range(self._group, n, self._n_groups)
+        else:
+            chunks = longest_first(costs, self._n_groups)
+            idx = chunks[self._group] if self._group < len(chunks) else []
+        self._run(func, models, idx, values)
+        return self._reduce(values)
+    
+    def _dynamic(self, func, models, costs):
+        n = len(models)
+        values = np.zeros((2, n))
+        if costs is None:
+            chunks = [ range(i, min(i + self._chunksize, n)) for i in range(0, n, self._chunksize) ]
+        else:
+            chunks = longest_first(costs, self._n_groups, self._chunksize)
+        
+        # Counter of the next chunk, held by the root process
+        itemsize = MPI.LONG.Get_size()
+        win = MPI.Win.Allocate(itemsize if self._rank == 0 else 0, itemsize, comm = self._comm)
+        if self._rank == 0:
+            np.frombuffer(win.tomemory(), dtype = np.dtype("l"))[0] = 0
+        self._comm.Barrier()
+        one = np.ones(1, dtype = np.dtype("l"))
+        i = np.zeros(1, dtype = np.dtype("l"))
+        while True:
+            # The first process of a group takes the chunk of the group
+            if self._leader:
+                win.Lock(0, MPI.LOCK_SHARED)
+                win.Fetch_and_op([ one, MPI.LONG ], [ i, MPI.LONG ], 0, 0, op = MPI.SUM)
+                win.Unlock(0)
+            if self._group_comm is not None:
+                self._group_comm.Bcast([ i, MPI.LONG ], root = 0)
+            if i[0] >= len(chunks):
+                break
+            self._run(func, models, chunks[i[0]], values)
+        win.Free()
+        return self._reduce(values)
+    
+    def _reduce(self, values):
+        # Objective function values and evaluation times of all the models
+        out = np.zeros_like(values)
+        self._comm.Allreduce([ values, MPI.DOUBLE ], [ out, MPI.DOUBLE ], op = MPI.SUM)
+        return out
+    
+    @property
+    def schedule(self):
+        """
+        str
+        Distribution of the models.
+        """
+        return self._schedule
+    
+    @property
+    def chunksize(self):
+        """
+        int
+        Number of models taken by a process at once.
+        """
+        return self._chunksize
+    
+    @property
+    def rank(self):
+        """
+        int
+        Rank of the process in the communicator.
+        """
+        return self._rank
+    
+    @property
+    def group_size(self):
+        """
+        int or None
+        Number of processes per evaluation.
+        """
+        return self._group_size
+    
+    @property
+    def group_comm(self):
+        """
+        MPI.Comm or None
+        Communicator of the evaluation group of the process.
+        """
+        return self._group_comm
+    
+    @property
+    def busy(self):
+        """
+        ndarray of shape (n_processes)
+        Time in seconds spent by each process in the objective function.
+        """
+        return self._busy
+    
+    @property
+    def idle(self):
+        """
+        ndarray of shape (n_processes)
+        Time in seconds spent by each process waiting or communicating
+        during evaluations.
+        """
+        return self._idle
+    
+    @property
+    def n_tasks(self):
+        """
+        ndarray of shape (n_processes)
+        Number of models evaluated by each process (by its group with
+        evaluation groups).
+        """
+        return self._n_tasks
+    
+    @property
+    def efficiency(self):
+        """
+        scalar
+        Fraction of the time of all the processes spent in the objective
+        function during evaluations.
+        """
+        total = np.sum(self._busy) + np.sum(self._idle)
+        return np.sum(self._busy) / total if total > 0. else 0.
@@ -0,0 +1,50 @@
+import numpy
+import pytest
+
+from stochopy import Evolutionary
+
+
+def _rosenbrock(x):
+    return 100.0 * numpy.sum((x[1:] - x[:-1]**2)**2) + numpy.sum((1.0 - x[:-1])**2)
+
+
+def _run_serial_vs(option, solver="cmaes", func=_rosenbrock, serial_option=None, run=None, **kwargs):
+    """
+    Optimize with Evolutionary keyword arguments 'option' (e.g. backend or
+    mpi) and serially with 'serial_option', check that both runs return the
+    same solution after the same number of evaluations, and return the
+    optimizer run with 'option'. Key 'func' of 'option' replaces the
+    objective function of the tested run, and 'run' (called with the
+    optimizer) replaces its call to optimize. Other keyword arguments are
+    passed to both runs.
+    """
+    def optimize(opt, run=None):
+        params = dict(
+            lower=numpy.full(4, -5.12),
+            upper=numpy.full(4, 5.12),
+            popsize=10,
+            max_iter=30,
+            random_state=42,
+        )
+        params.update(kwargs)
+        params.update(opt)
+        ea = Evolutionary(params.pop("func", func), **params)
+        xopt, gfit = run(ea) if run is not None else ea.optimize(solver=solver)
+        return ea, xopt, gfit
+
+    ea, xopt, gfit = optimize(option, run)
+    ea_ref, xopt_ref, gfit_ref = optimize(serial_option or {})
+    assert numpy.array_equal(xopt, xopt_ref)
+    assert gfit == gfit_ref
+    assert ea.n_eval == ea_ref.n_eval
+    return ea
+
+
+@pytest.fixture
+def rosenbrock():
+    return _rosenbrock
+
+
+@pytest.fixture
+def run_serial_vs():
+    return _run_serial_vs
@@ -0,0 +1,137 @@
+import asyncio
+
+import numpy
+import pytest
+
+from stochopy import Evolutionary, MonteCarlo, ProcessBackend, ThreadBackend
+
+
+def failing(x):
+    if x[0] > 0.0:
+        raise ValueError("bad model")
+    return 0.0
+
+
+@pytest.mark.parametrize("solver", ["cpso", "de", "cmaes", "vdcma"])
+@pytest.mark.parametrize("cls", [ProcessBackend, ThreadBackend])
+def test_backend_evolutionary(solver, cls, run_serial_vs):
+    with cls(n_workers=2, chunksize=3) as backend:
+        run_serial_vs({"backend": backend}, solver=solver)
+
+
+@pytest.mark.parametrize("backend", ["processes", "threads"])
+def test_backend_monte_carlo(backend, rosenbrock):
+    def sample(backend):
+        mc = MonteCarlo(
+            rosenbrock,
+            lower=numpy.full(3, -5.12),
+            upper=numpy.full(3, 5.12),
+            max_iter=20,
+            random_state=42,
+            backend=backend,
+        )
+        mc.sample(sampler="hamiltonian", stepsize=0.05, n_leap=5)
+        return mc.models, mc.energy
+
+    models, energy = sample(backend)
+    models_ref, energy_ref = sample(None)
+    assert numpy.allclose(models, models_ref)
+    assert numpy.allclose(energy, energy_ref)
+
+
+def test_process_backend_ipc(rosenbrock):
+    ipc = []
+    for n_dim in [10, 1000]:
+        with ProcessBackend(n_workers=2) as backend:
+            backend.start(rosenbrock)
+            models = numpy.random.uniform(-1.0, 1.0, (20, n_dim))
+            fit = backend.evaluate(models)
+            ipc.append(backend.ipc_bytes)
+        assert numpy.allclose(fit, [rosenbrock(x) for x in models])
+    assert ipc[0] == ipc[1]
+
+
+def test_process_backend_error():
+    with ProcessBackend(n_workers=2) as backend:
+        backend.start(failing)
+        with pytest.raises(RuntimeError):
+            backend.evaluate(numpy.ones((4, 2)))
+        assert numpy.allclose(backend.evaluate(-numpy.ones((4, 2))), 0.0)
+
+
+
+def test_thread_backend_error():
+    with ThreadBackend(n_workers=2) as backend:
+        backend.start(failing)
+        with pytest.raises(ValueError):
+            backend.evaluate(numpy.ones((4, 2)))
+        assert numpy.allclose(backend.evaluate(-numpy.ones((4, 2))), 0.0)
+
+
+def test_optimize_async(rosenbrock, run_serial_vs):
+    state = {"running": 0, "max_running": 0}
+
+    async def afunc(x):
+        state["running"] += 1
+        state["max_running"] = max(state["max_running"], state["running"])
+        await asyncio.sleep(0.001)
+        state["running"] -= 1
+        return rosenbrock(x)
+
+    run_serial_vs(
+        {"func": afunc},
+        run=lambda ea: asyncio.run(ea.optimize_async(max_concurrency=8, solver="cmaes")),
+        popsize=20,
+        max_iter=10,
+    )
+    assert state["max_running"] == 8
+
+    with pytest.raises(ValueError):
+        Evolutionary(afunc, n_dim=4).optimize(solver="cmaes")
+    with pytest.raises(ValueError):
+        asyncio.run(Evolutionary(rosenbrock, n_dim=4).optimize_async(solver="cmaes"))
+
+
+def test_sample_async_server(rosenbrock):
+    async def handle(reader, writer):
+        x = numpy.frombuffer(await reader.readexactly(24))
+        writer.write(numpy.float64(rosenbrock(x)).tobytes())
+        await writer.drain()
+        writer.close()
+
+    async def run():
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+
+        async def afunc(x):
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(numpy.asarray(x, dtype=numpy.float64).tobytes())
+            f = numpy.frombuffer(await reader.readexactly(8))[0]
+            writer.close()
+            return f
+
+        mc = MonteCarlo(
+            afunc,
+            lower=numpy.full(3, -5.12),
+            upper=numpy.full(3, 5.12),
+            max_iter=10,
+            random_state=42,
+        )
+        async with server:
+            await mc.sample_async(sampler="hamiltonian", stepsize=0.05, n_leap=3)
+        return mc.models, mc.energy
+
+    models, energy = asyncio.run(run())
+    mc = MonteCarlo(
+        rosenbrock,
+        lower=numpy.full(3, -5.12),
+        upper=numpy.full(3, 5.12),
+        max_iter=10,
+        random_state=42,
+    )
+    mc.sample(sampler="hamiltonian", stepsize=0.05, n_leap=3)
+    assert numpy.allclose(models, mc.models)
+    assert numpy.allclose(energy, mc.energy)
+
+    with pytest.raises(ValueError):
+        asyncio.run(mc.sample_async(sampler="hamiltonian"))
@@ -0,0 +1,102 @@
+import copy
+
+from stochopy.bench import compare, load, main, run_suite, save
+
+
+def test_bench(tmp_path):
+    results = run_suite(
+        solvers=["de", "cmaes"],
+        samplers=["hastings"],
+        functions=["sphere"],
+        n_dims=[2, 20],
+        popsizes=[6],
+        max_iter=5,
+        n_samples=20,
+        repeat=1,
+        max_dim={"cmaes": 10},
+    )
+    assert len(results) == 6
+    assert sum("skipped" in r for r in results) == 1
+    for r in results:
+        if "skipped" not in r:
+            assert r["gens_per_sec"] > 0.0
+            assert r["peak_memory"] > 0
+
+    filename = str(tmp_path / "bench.json")
+    save(results, filename)
+    baseline = load(filename)
+    assert compare(baseline, results) == []
+
+    current = copy.deepcopy(baseline)
+    current[0]["gens_per_sec"] *= 0.5
+    regressions = compare(baseline, current, threshold=0.1)
+    assert len(regressions) == 1
+    assert regressions[0]["metric"] == "gens_per_sec"
+
+    save(current, str(tmp_path / "current.json"))
+    assert main(["compare", filename, str(tmp_path / "current.json")]) == 1
+
+
+def test_bbob():
+    from stochopy.bench import run_bbob, summarize
+
+    targets = [1.0e1, 1.0e-1, 1.0e-3]
+    runs = run_bbob(
+        solvers=["cmaes"],
+        functions=["sphere"],
+        n_dims=[2],
+        n_instances=4,
+        budget=200,
+        targets=targets,
+        n_jobs=2,
+    )
+    assert len(runs) == 4
+    for run in runs:
+        assert run["n_eval"] <= 400
+        hits = [h for h in run["hits"] if h is not None]
+        assert hits == sorted(hits)
+
+    summary = summarize(runs, targets)
+    assert len(summary["ert"]) == 1
+    assert summary["ert"][0]["success_rate"] == [1.0, 1.0, 1.0]
+    assert summary["ecdf"][0]["fractions"][-1] == 1.0
+
+
+def test_scaling():
+    from stochopy.bench import run_scaling
+
+    results = run_scaling(
+        objectives=["numpy", "sleep"],
+        n_workers=[1, 2],
+        popsize=8,
+        size=50,
+        n_batches=2,
+    )
+    assert len(results) == 2 * 5
+    for record in results:
+        assert record["evals_per_sec"] > 0.0
+        if record["backend"] == "serial":
+            assert record["speedup"] == 1.0
+
+
+def test_allocations():
+    from stochopy.bench import run_allocations
+
+    results = run_allocations(n_dims=[10, 200], popsize=10, max_iter=10)
+    assert len(results) == 6 * 2
+    for record in results:
+        assert record["time_per_gen"] > 0.0
+        # No work array of shape (n_dim, n_dim) is allocated per generation
+        assert record["transient_bytes"] < 8 * 200 * 200
+
+
+def test_covariance():
+    from stochopy.bench import run_covariance
+
+    results = run_covariance(n_dims=[10, 50], max_iter=5)
+    assert len(results) == 4 * 2
+    for record in results:
+        assert record["time_per_gen"] > 0.0
+        assert record["adaptation_per_gen"] > 0.0
+        assert record["speedup"] > 0.0
+    assert all(r["speedup"] == 1.0 for r in results if r["solver"] == "cmaes")
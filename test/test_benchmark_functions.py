@@ -0,0 +1,37 @@
+import time
+
+import numpy
+import pytest
+
+from stochopy import BenchmarkFunction
+
+
+@pytest.mark.parametrize("func", [
+    "ackley", "bent-cigar", "discus", "ellipsoid", "griewank", "quartic",
+    "rastrigin", "rosenbrock", "sphere", "styblinski-tang",
+])
+def test_transform(func):
+    numpy.random.seed(42)
+    X = numpy.random.uniform(-2.0, 2.0, (6, 4))
+
+    bf = BenchmarkFunction(func, n_dim=4, shift=True, rotate=True, random_state=0)
+    f = bf.get()["func"]
+    assert numpy.allclose(f(X), [f(x) for x in X])
+    assert numpy.allclose(f(bf.xopt), bf.fmin)
+    assert numpy.all(f(X) >= bf.fmin - 1.0e-8)
+    assert numpy.allclose(numpy.dot(bf.rotation, bf.rotation.T), numpy.eye(4))
+
+
+def test_rotation_cache():
+    bf1 = BenchmarkFunction("ellipsoid", n_dim=10, rotate=True, random_state=1)
+    bf2 = BenchmarkFunction("discus", n_dim=10, rotate=True, random_state=1)
+    assert bf1.rotation is bf2.rotation
+
+
+@pytest.mark.parametrize("cost_mode", ["sleep", "spin"])
+def test_cost(cost_mode):
+    bf = BenchmarkFunction("sphere", n_dim=2, cost=0.01, cost_mode=cost_mode)
+    f = bf.get()["func"]
+    starttime = time.perf_counter()
+    f(numpy.zeros((3, 2)))
+    assert time.perf_counter() - starttime >= 0.03
@@ -0,0 +1,85 @@
+import numpy
+import pytest
+
+from stochopy import Evolutionary, EvaluationCache
+
+
+def test_cache_lru():
+    cache = EvaluationCache(tol=0.1, max_size=2)
+    cache.set([0.0, 0.0], 1.0)
+    cache.set([1.0, 1.0], 2.0)
+    assert cache.get([0.01, -0.02]) == 1.0
+    cache.set([2.0, 2.0], 3.0)
+    assert cache.get([1.0, 1.0]) is None
+    assert len(cache) == 2
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_cache_persistent(tmp_path):
+    filename = str(tmp_path / "cache.db")
+    cache = EvaluationCache(filename=filename)
+    cache.set([0.5, 0.5], 4.0)
+    cache.close()
+
+    cache = EvaluationCache(filename=filename)
+    assert cache.get([0.5, 0.5]) == 4.0
+
+
+def test_cache_lookup():
+    cache = EvaluationCache()
+    cache.set([1.0, 1.0], 2.0)
+    models = numpy.array([[0.0, 0.0], [1.0, 1.0], [0.0, 0.0], [3.0, 3.0], [0.0, 0.0], [3.0, 3.0]])
+    values, idx, duplicates = cache.lookup(models)
+    assert values[1] == 2.0
+    assert idx.tolist() == [0, 3]
+    assert duplicates.tolist() == [[2, 0], [4, 0], [5, 3]]
+    assert (cache.hits, cache.misses) == (4, 2)
+
+
+@pytest.mark.parametrize("solver", ["de", "cmaes"])
+def test_cache_evolutionary(solver):
+    func = lambda x: 100.0 * numpy.sum((x[1:] - x[:-1]**2)**2) + numpy.sum((1.0 - x[:-1])**2)
+    kws = dict(
+        func=func,
+        lower=numpy.full(2, -5.12),
+        upper=numpy.full(2, 5.12),
+        popsize=5,
+        max_iter=50,
+    )
+    numpy.random.seed(42)
+    xopt_ref, _ = Evolutionary(**kws).optimize(solver=solver)
+
+    numpy.random.seed(42)
+    ea = Evolutionary(cache=True, **kws)
+    xopt, _ = ea.optimize(solver=solver)
+
+    assert numpy.allclose(xopt_ref, xopt)
+    assert ea.n_eval + ea.cache.hits == ea.n_iter * ea.popsize
+
+
+def test_cache_duplicates():
+    # Offspring clipped to the same corners of the box
+    calls = []
+
+    def func(x):
+        calls.append(x)
+        return numpy.sum((x - 0.3)**2)
+
+    ea = Evolutionary(
+        func,
+        lower=numpy.zeros(2),
+        upper=numpy.ones(2),
+        popsize=20,
+        max_iter=5,
+        cache=True,
+        snap=True,
+        random_state=42,
+    )
+    ea.optimize(solver="cmaes", sigma=5.0)
+
+    models = numpy.concatenate([ea.models[:, :, i] for i in range(ea.n_iter)])
+    n_keys = len(numpy.unique(models, axis=0))
+    assert n_keys < len(models)
+    assert ea.n_eval == len(calls) == n_keys
+    assert ea.n_eval + ea.cache.hits == ea.n_iter * ea.popsize
+
@@ -0,0 +1,118 @@
+import json
+
+import numpy
+import pytest
+
+from stochopy import Evolutionary, MonteCarlo, Recorder
+
+
+func = lambda x: 100.0 * numpy.sum((x[1:] - x[:-1]**2)**2) + numpy.sum((1.0 - x[:-1])**2)
+
+
+@pytest.mark.parametrize("solver, sync", [
+    ("cpso", True), ("cpso", False), ("de", True), ("de", False), ("cmaes", True), ("vdcma", True),
+])
+def test_recorder_evolutionary(solver, sync, tmp_path):
+    filename = str(tmp_path / "history.jsonl")
+    recorder = Recorder(filename=filename, flush_every=7)
+    ea = Evolutionary(
+        func,
+        lower=numpy.full(2, -5.12),
+        upper=numpy.full(2, 5.12),
+        popsize=6,
+        max_iter=50,
+        callback=recorder,
+    )
+    ea.optimize(solver=solver, sync=sync)
+
+    history = recorder.history
+    assert history["it"][-1] == ea.n_iter
+    assert history["n_eval"][-1] == ea.n_eval
+    assert "xopt" not in history
+    with open(filename, "r") as f:
+        lines = [json.loads(line) for line in f]
+    assert len(lines) == len(history["it"])
+    assert lines[-1]["gfit"] == history["gfit"][-1]
+
+
+def test_callback_stop():
+    ea = Evolutionary(
+        func,
+        lower=numpy.full(2, -5.12),
+        upper=numpy.full(2, 5.12),
+        popsize=6,
+        max_iter=50,
+        callback=lambda state: state["it"] >= 10,
+    )
+    ea.optimize(solver="cmaes")
+    assert ea.n_iter == 10
+    assert ea.flag == "stopped by callback"
+
+
+@pytest.mark.parametrize("sampler", ["pure", "hastings", "hamiltonian"])
+def test_callback_montecarlo(sampler, tmp_path):
+    filename = str(tmp_path / "history.csv")
+    recorder = Recorder(filename=filename)
+    mc = MonteCarlo(
+        func,
+        lower=numpy.full(2, -5.12),
+        upper=numpy.full(2, 5.12),
+        max_iter=50,
+        callback=[recorder, lambda state: state["it"] >= 20],
+    )
+    mc.sample(sampler=sampler)
+    assert mc.n_iter == 20
+    assert mc.flag == "stopped by callback"
+    with open(filename, "r") as f:
+        lines = f.read().splitlines()
+    assert lines[0].split(",")[:2] == ["sampler", "it"]
+    assert len(lines) == 21
+
+
+def test_recorder_csv_keys(tmp_path):
+    filename = str(tmp_path / "history.csv")
+    recorder = Recorder(filename=filename, keys=["it", "gfit"])
+    for it in range(1, 4):
+        recorder({"it": it, "gfit": 1.0 / it, "sigma": 0.5})
+    recorder.flush()
+    with open(filename, "r") as f:
+        lines = f.read().splitlines()
+    assert lines[0] == "it,gfit"
+    assert len(lines) == 4
+
+
+def test_recorder_mode(tmp_path):
+    filename = str(tmp_path / "history.csv")
+    with open(filename, "w") as f:
+        f.write("it,gfit\n0,1.0\n")
+
+    with pytest.raises(ValueError):
+        Recorder(filename=filename)
+
+    recorder = Recorder(filename=filename, keys=["it", "gfit"], mode="a")
+    recorder({"it": 1, "gfit": 0.5})
+    recorder.flush()
+    with open(filename, "r") as f:
+        assert f.read().splitlines() == ["it,gfit", "0,1.0", "1,0.5"]
+
+    recorder = Recorder(filename=filename, keys=["it", "gfit"], mode="w")
+    recorder({"it": 1, "gfit": 0.5})
+    recorder.flush()
+    with open(filename, "r") as f:
+        assert f.read().splitlines() == ["it,gfit", "1,0.5"]
+
+
+@pytest.mark.parametrize("sampler", ["pure", "hastings", "hamiltonian"])
+def test_callback_montecarlo_first(sampler):
+    states = []
+    mc = MonteCarlo(
+        func,
+        lower=numpy.full(2, -5.12),
+        upper=numpy.full(2, 5.12),
+        max_iter=50,
+        callback=lambda state: states.append(state) or True,
+    )
+    mc.sample(sampler=sampler)
+    assert mc.n_iter == 1
+    assert [state["it"] for state in states] == [1]
+    assert states[0]["energy"] == mc.energy[0]
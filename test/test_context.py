@@ -0,0 +1,66 @@
+import os
+
+import numpy
+import pytest
+
+from stochopy import MonteCarlo, ProcessBackend, WorkerContext
+
+
+def func(x, data, offset):
+    return numpy.sum((x - data[:len(x)])**2) + offset
+
+
+def test_context_arrays():
+    data = numpy.linspace(-1.0, 1.0, 1000)
+    with WorkerContext(arrays={"data": data}, setup=lambda: {"offset": 1.0}) as context:
+        path = context.paths["data"]
+        assert os.path.isfile(path)
+        kwargs = context.kwargs
+        assert isinstance(kwargs["data"], numpy.memmap)
+        assert numpy.array_equal(kwargs["data"], data)
+        assert kwargs["offset"] == 1.0
+        assert context.kwargs is kwargs
+    assert not os.path.exists(path)
+
+    with pytest.raises(ValueError):
+        WorkerContext(arrays={"data": [1.0, 2.0]})
+    with pytest.raises(ValueError):
+        WorkerContext(setup=1.0)
+
+
+def test_context_process_backend(tmp_path, run_serial_vs):
+    data = numpy.linspace(-1.0, 1.0, 1000)
+    log = str(tmp_path / "setup.log")
+
+    def setup():
+        with open(log, "a") as f:
+            f.write("%d\n" % os.getpid())
+        return {"offset": 0.0}
+
+    with WorkerContext(setup=setup, arrays={"data": data}) as context, \
+        ProcessBackend(n_workers=2) as backend:
+        run_serial_vs(
+            {"backend": backend, "context": context},
+            func=func,
+            serial_option={"kwargs": {"data": data, "offset": 0.0}},
+            max_iter=20,
+        )
+
+    # Setup is called once per worker
+    with open(log) as f:
+        pids = f.read().split()
+    assert len(pids) == len(set(pids)) == 2
+
+
+def test_context_monte_carlo():
+    data = numpy.zeros(3)
+    with WorkerContext(arrays={"data": data}, setup=lambda: {"offset": 0.0}) as context:
+        mc = MonteCarlo(func, n_dim=3, max_iter=20, random_state=42, context=context)
+        xopt, gfit = mc.sample(sampler="hastings")
+    mc_ref = MonteCarlo(func, n_dim=3, max_iter=20, random_state=42, kwargs={"data": data, "offset": 0.0})
+    xopt_ref, gfit_ref = mc_ref.sample(sampler="hastings")
+    assert numpy.allclose(mc.models, mc_ref.models)
+    assert numpy.allclose(mc.energy, mc_ref.energy)
+
+    with pytest.raises(ValueError):
+        MonteCarlo(func, n_dim=3, context={"data": data})
@@ -0,0 +1,129 @@
+import multiprocessing
+import os
+import socket
+import threading
+import time
+
+import numpy
+import pytest
+
+from stochopy import TCPBackend, run_worker
+
+
+def failing(x):
+    if x[0] > 0.0:
+        raise ValueError("bad model")
+    return 0.0
+
+
+def dying(x):
+    os._exit(1)
+
+
+def start_workers(backend, f, n_workers=2, **kwargs):
+    host, port = backend.address
+    workers = [
+        threading.Thread(target=run_worker, args=(f, host, port), kwargs=dict(heartbeat=0.1, timeout=1.0, **kwargs), daemon=True)
+        for i in range(n_workers)
+    ]
+    for worker in workers:
+        worker.start()
+    return workers
+
+
+def test_tcp_backend_evolutionary(rosenbrock, run_serial_vs):
+    with TCPBackend(chunksize=3, authkey=b"key", heartbeat=0.1, timeout=1.0) as backend:
+        backend.start()
+        workers = start_workers(backend, rosenbrock, authkey=b"key")
+        run_serial_vs({"backend": backend})
+
+    # Workers quit with the server
+    for worker in workers:
+        worker.join(timeout=5.0)
+        assert not worker.is_alive()
+
+
+def test_tcp_backend_error():
+    with TCPBackend(heartbeat=0.1, timeout=1.0) as backend:
+        backend.start()
+        start_workers(backend, failing)
+        with pytest.raises(RuntimeError):
+            backend.evaluate(numpy.ones((4, 2)))
+        assert numpy.allclose(backend.evaluate(-numpy.ones((4, 2))), 0.0)
+
+
+def test_tcp_backend_lost_worker(rosenbrock, monkeypatch):
+    sockets = []
+    create_connection = socket.create_connection
+
+    def connect(*args, **kwargs):
+        sock = create_connection(*args, **kwargs)
+        sockets.append(sock)
+        return sock
+
+    monkeypatch.setattr(socket, "create_connection", connect)
+    models = numpy.random.uniform(-1.0, 1.0, (20, 3))
+    with TCPBackend(heartbeat=0.1, timeout=1.0) as backend:
+        backend.start()
+        host, port = backend.address
+
+        # Worker process dying on its first task
+        ctx = multiprocessing.get_context("fork")
+        worker = ctx.Process(target=run_worker, args=(dying, host, port))
+        worker.start()
+        while backend.n_workers < 1:
+            time.sleep(0.01)
+        start_workers(backend, rosenbrock, n_workers=1)
+        fit = backend.evaluate(models)
+        worker.join()
+        assert numpy.allclose(fit, [rosenbrock(x) for x in models])
+        assert backend.n_requeued == 1
+
+        # Workers reconnect after the connection is lost
+        sockets[-1].shutdown(socket.SHUT_RDWR)
+        fit = backend.evaluate(models)
+        assert numpy.allclose(fit, [rosenbrock(x) for x in models])
+        assert backend.n_workers == 1
+
+
+def test_tcp_backend_authkey(rosenbrock):
+    with TCPBackend(authkey=b"key", heartbeat=0.1, timeout=1.0) as backend:
+        backend.start()
+        host, port = backend.address
+        with pytest.raises(RuntimeError):
+            run_worker(rosenbrock, host, port, authkey=b"bad", heartbeat=0.1, timeout=1.0, reconnect=1.0)
+        assert backend.n_workers == 0
+
+
+def test_tcp_worker_reconnect(rosenbrock):
+    # Server closing every connection without a word
+    server = socket.create_server(("127.0.0.1", 0))
+    host, port = server.getsockname()
+    n_connections = []
+
+    def serve():
+        while True:
+            try:
+                sock, _ = server.accept()
+            except OSError:
+                break
+            n_connections.append(1)
+            sock.close()
+
+    threading.Thread(target=serve, daemon=True).start()
+    starttime = time.monotonic()
+    n_eval = run_worker(rosenbrock, host, port, heartbeat=0.1, timeout=1.0, reconnect=0.5)
+    elapsed = time.monotonic() - starttime
+    server.close()
+    assert n_eval == 0
+    assert elapsed < 2.0
+    assert 0 < len(n_connections) <= 10
+
+
+def test_tcp_backend_invalid():
+    with pytest.raises(ValueError):
+        TCPBackend(chunksize=0)
+    with pytest.raises(ValueError):
+        TCPBackend(heartbeat=1.0, timeout=0.5)
+    with pytest.raises(ValueError):
+        TCPBackend(authkey="key")
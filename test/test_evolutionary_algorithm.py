@@ -11,7 +11,9 @@ from stochopy import Evolutionary
         ("cpso", {"w": 0.42, "c1": 1.409, "c2": 1.991, "gamma": 0.8}, [0.55554141, 0.30918171]),
         ("de", {"CR": 0.42, "F": 1.491}, [1.35183858, 1.81825907]),
         ("cmaes", {"sigma": 0.1, "mu_perc": 0.2, "xstart": [-3.0, -3.0]}, [0.80575841, 0.649243]),
+        ("cholesky-cmaes", {"sigma": 0.1, "mu_perc": 0.2, "xstart": [-3.0, -3.0]}, [0.96617058, 0.93428893]),
         ("vdcma", {"sigma": 0.1, "mu_perc": 0.2, "xstart": [-3.0, -3.0]}, [1.38032658, 1.89976049]),
+        ("lmmaes", {"sigma": 0.1, "mu_perc": 0.2, "xstart": [-3.0, -3.0]}, [0.82567348, 0.68087601]),
     ],
 )
 def test_evolutionary(solver, solver_kws, xopt_ref):
@@ -26,3 +28,215 @@ def test_evolutionary(solver, solver_kws, xopt_ref):
     xopt, _ = ea.optimize(solver=solver, **solver_kws)
 
     assert numpy.allclose(xopt_ref, xopt)
+
+
+@pytest.mark.parametrize("solver", ["cmaes", "cholesky-cmaes", "vdcma", "lmmaes"])
+@pytest.mark.parametrize("restart", ["ipop", "bipop"])
+def test_restart(solver, restart):
+    ea = Evolutionary(
+        func=lambda x: 10.0 * len(x) + numpy.sum(x**2 - 10.0 * numpy.cos(2.0 * numpy.pi * x)),
+        lower=numpy.full(3, -5.12),
+        upper=numpy.full(3, 5.12),
+        popsize=6,
+        max_iter=200,
+        max_eval=5000,
+        random_state=42,
+    )
+    _, gfit = ea.optimize(solver=solver, restart=restart)
+
+    assert ea.n_restart > 0
+    assert ea.restart_n_eval.sum() == ea.n_eval
+    assert ea.restart_n_iter.sum() == ea.n_iter
+    assert ea.popsize == 6
+    assert gfit == ea.restart_fitness.min()
+    assert ea.n_eval < 5000 + ea.restart_popsize[-1]
+
+
+
+def test_restart_error():
+    def func(x):
+        if len(state) > 20:
+            raise RuntimeError("failed evaluation")
+        state.append(x)
+        return numpy.sum(x**2)
+
+    state = []
+    ea = Evolutionary(func, n_dim=2, popsize=6, max_iter=3, max_eval=1000, random_state=42)
+    with pytest.raises(RuntimeError):
+        ea.optimize(solver="cmaes", restart="ipop")
+    assert ea.popsize == 6
+
+@pytest.mark.parametrize("solver", ["de", "pso", "cpso", "cmaes", "cholesky-cmaes", "vdcma", "lmmaes"])
+@pytest.mark.parametrize("sync", [True, False])
+def test_max_eval(solver, sync):
+    ea = Evolutionary(
+        func=lambda x: numpy.sum(x**2),
+        lower=numpy.full(2, -5.12),
+        upper=numpy.full(2, 5.12),
+        popsize=10,
+        max_iter=100,
+        max_eval=123,
+        eps2=-numpy.inf,
+        snap=True,
+        random_state=42,
+    )
+    xopt, gfit = ea.optimize(solver=solver, sync=sync)
+
+    assert ea.n_eval == 123
+    assert ea.flag == "maximum number of function evaluations is reached"
+    assert ea.models.shape == (10, 2, ea.n_iter)
+    assert numpy.isfinite(gfit) and numpy.allclose(gfit, numpy.sum(xopt**2))
+
+
+@pytest.mark.parametrize(
+    "solver, solver_kws",
+    [
+        ("cmaes", {}),
+        ("cmaes", {"groups": [[0, 1, 2], [3, 4]]}),
+        ("cholesky-cmaes", {}),
+        ("vdcma", {}),
+        ("lmmaes", {}),
+    ],
+)
+def test_best_so_far(solver, solver_kws):
+    values = []
+
+    def func(x):
+        values.append(numpy.sum(x**2))
+        return values[-1]
+
+    ea = Evolutionary(
+        func=func,
+        lower=numpy.full(5, -5.12),
+        upper=numpy.full(5, 5.12),
+        popsize=10,
+        max_eval=41,
+        random_state=42,
+    )
+    xopt, gfit = ea.optimize(solver=solver, **solver_kws)
+
+    assert len(values) == 41
+    assert gfit == min(values)
+    assert numpy.allclose(gfit, numpy.sum(xopt**2))
+
+
+def test_cholesky_cmaes():
+    n_dim = 10
+    ea = Evolutionary(
+        func=lambda x: numpy.sum(10.0**(6.0 * numpy.arange(n_dim) / (n_dim - 1)) * x**2),
+        lower=numpy.full(n_dim, -5.12),
+        upper=numpy.full(n_dim, 5.12),
+        popsize=10,
+        max_iter=2000,
+        eps2=1e-8,
+        random_state=42,
+    )
+    ea.optimize(solver="cholesky-cmaes")
+
+    # Ill-conditioned ellipsoid is solved without eigendecomposition
+    assert ea.flag == "fitness is lower than threshold eps2 (1e-08)"
+    assert ea.n_iter < 1000
+
+
+def test_block_cmaes():
+    # Ellipsoid rotated within interleaved groups of parameters
+    rng = numpy.random.RandomState(0)
+    groups = [numpy.arange(i, 12, 3) for i in range(3)]
+    rotations = [numpy.linalg.qr(rng.randn(4, 4))[0] for _ in groups]
+    scales = 10.0**numpy.arange(4)
+
+    def func(x):
+        return sum(numpy.sum(scales * numpy.dot(r, x[g])**2) for r, g in zip(rotations, groups))
+
+    ea = Evolutionary(
+        func=func,
+        lower=numpy.full(12, -5.12),
+        upper=numpy.full(12, 5.12),
+        popsize=10,
+        max_iter=2000,
+        eps2=1e-8,
+        random_state=42,
+    )
+    ea.optimize(solver="cmaes", groups=groups)
+
+    assert ea.flag == "fitness is lower than threshold eps2 (1e-08)"
+    nbytes = ea.estimate_memory(solver="cmaes", groups=groups, detail=True)
+    assert nbytes["covariance"] < ea.estimate_memory(solver="cmaes", detail=True)["covariance"]
+
+    with pytest.raises(ValueError):
+        ea.optimize(solver="cmaes", groups=[[0, 1], [1, 2]])
+    with pytest.raises(ValueError):
+        ea.optimize(solver="vdcma", groups=groups)
+
+
+def test_lmmaes():
+    n_dim = 100
+    ea = Evolutionary(
+        func=lambda x: numpy.sum(x**2),
+        lower=numpy.full(n_dim, -5.12),
+        upper=numpy.full(n_dim, 5.12),
+        popsize=int(4 + numpy.floor(3.0 * numpy.log(n_dim))),
+        max_iter=5000,
+        eps2=1e-8,
+        random_state=42,
+    )
+    ea.optimize(solver="lmmaes")
+
+    assert ea.flag == "fitness is lower than threshold eps2 (1e-08)"
+
+    # Memory of the direction vectors grows linearly with n_dim
+    nbytes = [
+        Evolutionary(func=lambda x: 0.0, n_dim=n, popsize=10).estimate_memory(solver="lmmaes", detail=True)
+        for n in [10**5, 10**6]
+    ]
+    assert nbytes[0]["covariance"] <= 8 * 50 * 10**5
+    assert nbytes[1]["total"] < 11 * nbytes[0]["total"]
+
+
+def test_max_time():
+    ea = Evolutionary(
+        func=lambda x: numpy.sum(x**2),
+        n_dim=2,
+        max_iter=10000000,
+        max_time=0.2,
+        eps2=-numpy.inf,
+    )
+    ea.optimize(solver="de", sync=False)
+
+    assert ea.flag == "maximum wall-clock time is reached"
+
+
+def test_estimate_memory():
+    import tracemalloc
+
+    ea = Evolutionary(
+        func=lambda x: numpy.sum(x**2),
+        n_dim=100,
+        popsize=20,
+        max_iter=1000000,
+        max_eval=2000,
+        eps2=-numpy.inf,
+    )
+    nbytes = ea.estimate_memory(solver="cmaes", detail=True)
+    assert nbytes["history"] == 0
+    assert nbytes["covariance"] > 8 * 100 * 100
+    assert nbytes["total"] == sum(v for k, v in nbytes.items() if k != "total")
+
+    # No history is allocated when snap is disabled
+    tracemalloc.start()
+    ea.optimize(solver="cmaes")
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    assert ea.models is None and ea.energy is None
+    assert peak < 2 * nbytes["total"]
+
+    ea = Evolutionary(
+        func=lambda x: numpy.sum(x**2),
+        n_dim=100,
+        popsize=20,
+        max_iter=1000,
+        max_eval=2000,
+        snap=True,
+    )
+    assert ea.estimate_memory(solver="cmaes", detail=True)["history"] >= 8 * 20 * 100 * 1000
+    assert ea.estimate_memory(solver="cmaes", restart="ipop") > ea.estimate_memory(solver="cmaes")
@@ -0,0 +1,113 @@
+import json
+import time
+
+import numpy
+import pytest
+
+from stochopy import Evolutionary, FaultPolicy, MonteCarlo
+
+
+def sphere(x):
+    return numpy.sum(x**2)
+
+
+def crashing(x):
+    if x[0] > 1.0:
+        raise RuntimeError("forward model crashed")
+    if x[1] > 1.0:
+        return numpy.nan
+    return sphere(x)
+
+
+class Flaky:
+    def __init__(self, n_failures):
+        self.n_failures = n_failures
+        self.n_calls = 0
+
+    def __call__(self, x):
+        self.n_calls += 1
+        if self.n_calls <= self.n_failures:
+            raise IOError("connection reset")
+        return sphere(x)
+
+
+def test_fault_policy_penalty():
+    policy = FaultPolicy(penalty=1.0e10)
+    func = policy.wrap(crashing)
+    assert func(numpy.array([2.0, 0.0])) == 1.0e10
+    assert func(numpy.array([0.0, 2.0])) == 1.0e10
+    assert func(numpy.array([0.5, 0.5])) == 0.5
+    assert [incident["kind"] for incident in policy.incidents] == ["exception", "nonfinite"]
+    assert "forward model crashed" in policy.incidents[0]["message"]
+    assert policy.incidents[0]["model"] == [2.0, 0.0]
+
+
+def test_fault_policy_retries():
+    flaky = Flaky(2)
+    policy = FaultPolicy(retries=2)
+    assert policy.evaluate(flaky, numpy.ones(2)) == 2.0
+    assert flaky.n_calls == 3
+    assert policy.n_incidents == 2
+
+    flaky = Flaky(3)
+    policy = FaultPolicy(retries=1)
+    assert policy.evaluate(flaky, numpy.ones(2)) == numpy.inf
+    assert flaky.n_calls == 2
+
+
+def test_fault_policy_timeout(tmp_path):
+    filename = str(tmp_path / "incidents.jsonl")
+
+    def hanging(x):
+        if x[0] > 0.0:
+            time.sleep(10.0)
+        return sphere(x)
+
+    policy = FaultPolicy(timeout=0.05, filename=filename)
+    starttime = time.time()
+    assert policy.evaluate(hanging, numpy.ones(2)) == numpy.inf
+    assert time.time() - starttime < 5.0
+    assert policy.evaluate(hanging, -numpy.ones(2)) == 2.0
+    with open(filename) as f:
+        incidents = [json.loads(line) for line in f]
+    assert [incident["kind"] for incident in incidents] == ["timeout"]
+
+
+@pytest.mark.parametrize("solver", ["cpso", "de", "cmaes", "vdcma"])
+def test_fault_policy_evolutionary(solver):
+    ea = Evolutionary(
+        crashing,
+        lower=numpy.full(2, -5.12),
+        upper=numpy.full(2, 5.12),
+        popsize=10,
+        max_iter=50,
+        random_state=42,
+        fault_policy=True,
+    )
+    xopt, gfit = ea.optimize(solver=solver)
+    assert numpy.isfinite(gfit)
+    assert len(ea.incidents) > 0
+
+    with pytest.raises(RuntimeError):
+        Evolutionary(
+            crashing,
+            lower=numpy.full(2, -5.12),
+            upper=numpy.full(2, 5.12),
+            popsize=10,
+            max_iter=50,
+            random_state=42,
+        ).optimize(solver=solver)
+
+
+def test_fault_policy_monte_carlo():
+    mc = MonteCarlo(
+        crashing,
+        lower=numpy.full(2, -5.12),
+        upper=numpy.full(2, 5.12),
+        max_iter=200,
+        random_state=42,
+        fault_policy=FaultPolicy(penalty=1.0e10),
+    )
+    xopt, gfit = mc.sample(sampler="hastings", stepsize=0.5)
+    assert numpy.isfinite(gfit)
+    assert len(mc.incidents) > 0
@@ -23,3 +23,33 @@ def test_montecarlo(sampler, sampler_kws, mean_ref):
     mc.sample(sampler=sampler, **sampler_kws)
 
     assert numpy.allclose(mean_ref, mc.models.mean(axis=0))
+
+
+@pytest.mark.parametrize("sampler", ["pure", "hastings", "hamiltonian"])
+def test_max_eval(sampler):
+    mc = MonteCarlo(
+        func=lambda x: numpy.sum(x**2),
+        lower=numpy.full(2, -5.12),
+        upper=numpy.full(2, 5.12),
+        max_iter=1000,
+        max_eval=200,
+        random_state=42,
+    )
+    mc.sample(sampler=sampler)
+
+    assert mc.n_eval <= 200
+    assert mc.flag == "maximum number of function evaluations is reached"
+    assert mc.models.shape == (mc.n_iter, 2)
+    assert mc.energy.shape == (mc.n_iter,)
+
+
+def test_estimate_memory():
+    mc = MonteCarlo(
+        func=lambda x: numpy.sum(x**2),
+        n_dim=10,
+        max_iter=1000,
+    )
+    nbytes = mc.estimate_memory(sampler="hamiltonian", snap_leap=True, detail=True)
+    assert nbytes["history"] == 8 * 1000 * 11
+    assert nbytes["leap_frog"] == 8 * 999 * 10 * 11
+    assert mc.estimate_memory(sampler="hastings") == nbytes["history"]
@@ -0,0 +1,49 @@
+import numpy
+import pytest
+
+from stochopy import Evolutionary, MonteCarlo
+
+
+func = lambda x: 100.0 * numpy.sum((x[1:] - x[:-1]**2)**2) + numpy.sum((1.0 - x[:-1])**2)
+
+
+@pytest.mark.parametrize("solver, sync", [
+    ("cpso", True), ("cpso", False), ("de", True), ("de", False), ("cmaes", True), ("vdcma", True),
+])
+def test_profile_evolutionary(solver, sync):
+    kws = dict(
+        func=func,
+        lower=numpy.full(2, -5.12),
+        upper=numpy.full(2, 5.12),
+        popsize=6,
+        max_iter=50,
+        snap=True,
+    )
+    numpy.random.seed(42)
+    xopt_ref, _ = Evolutionary(**kws).optimize(solver=solver, sync=sync)
+
+    numpy.random.seed(42)
+    ea = Evolutionary(profile=True, **kws)
+    xopt, _ = ea.optimize(solver=solver, sync=sync)
+
+    assert numpy.allclose(xopt_ref, xopt)
+    assert len(ea.profile) == ea.n_iter
+    assert numpy.allclose(ea.profile["evaluation"], ea.time_parallel)
+    assert ea.profile["sampling"].sum() > 0.0
+    assert ea.profile["snapshot"].sum() > 0.0
+    if solver == "cmaes":
+        assert ea.profile["eigendecomposition"].sum() > 0.0
+
+
+@pytest.mark.parametrize("sampler", ["pure", "hastings", "hamiltonian"])
+def test_profile_montecarlo(sampler):
+    mc = MonteCarlo(
+        func,
+        lower=numpy.full(2, -5.12),
+        upper=numpy.full(2, 5.12),
+        max_iter=50,
+        profile=True,
+    )
+    mc.sample(sampler=sampler)
+    assert len(mc.profile) == mc.n_iter
+    assert mc.profile["evaluation"].sum() > 0.0
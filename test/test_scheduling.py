@@ -0,0 +1,63 @@
+import numpy
+import pytest
+
+from stochopy import CostModel, ProcessBackend, TCPBackend, ThreadBackend, TaskFarm, run_worker
+from stochopy.scheduling import get_cost_model, longest_first
+
+
+cost = lambda x: numpy.exp(x[0])
+
+
+def test_longest_first():
+    costs = numpy.array([1.0, 5.0, 2.0, 4.0, 3.0, 3.0])
+    chunks = longest_first(costs, 2, chunksize=2)
+    assert [c.tolist() for c in chunks] == [[1, 3], [4, 5], [2, 0]]
+
+    # Longest processing time first packing
+    chunks = longest_first(costs, 2)
+    assert sorted(numpy.concatenate(chunks).tolist()) == list(range(6))
+    assert [costs[c].sum() for c in chunks] == [9.0, 9.0]
+    assert len(longest_first(costs[:1], 4)) == 1
+
+
+def test_cost_model():
+    model = CostModel(n_neighbors=3)
+    X = numpy.random.uniform(-1.0, 1.0, (20, 2))
+    assert numpy.allclose(model(X), 1.0)
+    model.update(X, numpy.where(X[:, 0] > 0.0, 10.0, 1.0))
+    costs = model(numpy.array([[0.9, 0.0], [-0.9, 0.0]]))
+    assert costs[0] > costs[1]
+
+    assert get_cost_model(None) is None
+    assert get_cost_model(model) is model
+    assert isinstance(get_cost_model("online"), CostModel)
+    with pytest.raises(ValueError):
+        get_cost_model("offline")
+    with pytest.raises(ValueError):
+        ThreadBackend(cost=1.0)
+
+
+@pytest.mark.parametrize("cost", [cost, "online"])
+@pytest.mark.parametrize("cls, chunksize", [(ThreadBackend, None), (ThreadBackend, 2), (ProcessBackend, None), (ProcessBackend, 2)])
+def test_cost_backend(cls, chunksize, cost, run_serial_vs):
+    with cls(n_workers=2, chunksize=chunksize, cost=cost) as backend:
+        run_serial_vs({"backend": backend}, solver="de")
+
+
+def test_cost_tcp_backend(rosenbrock):
+    import threading
+
+    models = numpy.random.uniform(-1.0, 1.0, (20, 3))
+    with TCPBackend(chunksize=3, heartbeat=0.1, timeout=1.0, cost=cost) as backend:
+        backend.start()
+        host, port = backend.address
+        threading.Thread(target=run_worker, args=(rosenbrock, host, port), daemon=True).start()
+        assert numpy.allclose(backend.evaluate(models), [rosenbrock(x) for x in models])
+
+
+@pytest.mark.parametrize("schedule", ["static", "dynamic"])
+@pytest.mark.parametrize("cost", [cost, "online"])
+def test_cost_task_farm(schedule, cost, run_serial_vs):
+    pytest.importorskip("mpi4py")
+
+    run_serial_vs({"mpi": TaskFarm(schedule, cost=cost)})
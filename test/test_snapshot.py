@@ -0,0 +1,64 @@
+import numpy
+import pytest
+
+from stochopy import Evolutionary, Snapshot
+
+
+func = lambda x: 100.0 * numpy.sum((x[1:] - x[:-1]**2)**2) + numpy.sum((1.0 - x[:-1])**2)
+
+
+def optimize(solver, snap, **kwargs):
+    ea = Evolutionary(
+        func,
+        lower=numpy.full(4, -5.12),
+        upper=numpy.full(4, 5.12),
+        popsize=20,
+        max_iter=100,
+        random_state=42,
+        snap=snap,
+        **kwargs
+    )
+    ea.optimize(solver=solver)
+    return ea
+
+
+@pytest.mark.parametrize("solver", ["cpso", "de", "cmaes", "vdcma"])
+def test_snapshot(solver):
+    ref = optimize(solver, True)
+    ea = optimize(solver, Snapshot(dtype="float32", every=5, top_k=3))
+
+    iterations = numpy.arange(1, ref.n_iter + 1, 5)
+    assert numpy.array_equal(ea.snapshot.iterations, iterations)
+    assert ea.models.dtype == numpy.float32
+    assert ea.models.shape == (3, 4, len(iterations))
+    for j, it in enumerate(iterations):
+        idx = numpy.argsort(ref.energy[:, it - 1], kind="stable")[:3]
+        assert numpy.allclose(ea.energy[:, j], ref.energy[idx, it - 1], rtol=1.0e-6)
+    if solver in ["cmaes", "vdcma"]:
+        assert numpy.allclose(ea.means, ref.means[iterations - 1], rtol=1.0e-5, atol=1.0e-5)
+    assert ref.snapshot.nbytes / ea.snapshot.nbytes > 10.0
+
+
+def test_snapshot_delta():
+    ref = optimize("cmaes", True)
+    ea = optimize("cmaes", Snapshot(dtype="float16", delta=True))
+    assert ea.models.dtype == numpy.float64
+    assert numpy.allclose(ea.models, ref.models, atol=1.0e-2)
+    assert numpy.allclose(ea.means, ref.means, atol=1.0e-2)
+
+
+def test_snapshot_restart():
+    ea = optimize("cmaes", Snapshot(every=2), max_eval=5000)
+    ea_restart = Evolutionary(
+        func,
+        lower=numpy.full(4, -5.12),
+        upper=numpy.full(4, 5.12),
+        popsize=20,
+        max_iter=100,
+        max_eval=5000,
+        random_state=42,
+        snap=Snapshot(every=2),
+    )
+    ea_restart.optimize(solver="cmaes", restart="ipop")
+    assert ea_restart.models.shape[2] == len(ea_restart.snapshot.iterations)
+    assert ea.models.shape[2] == (ea.n_iter - 1) // 2 + 1
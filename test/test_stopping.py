@@ -0,0 +1,83 @@
+import numpy
+import pytest
+
+from stochopy import Evolutionary, Stagnation, Target
+from stochopy.stopping import RingBuffer
+
+
+def test_ring_buffer():
+    x = numpy.random.RandomState(0).randn(200)
+    buf = RingBuffer(7)
+    for i, v in enumerate(x):
+        buf.push(v)
+        window = x[max(0, i - 6) : i + 1]
+        assert buf.min() == window.min()
+        assert buf.max() == window.max()
+        assert numpy.array_equal(buf.values, window)
+    assert buf.full and len(buf) == 7
+
+
+@pytest.mark.parametrize("solver", ["de", "cpso", "cmaes", "vdcma"])
+def test_target(solver):
+    ea = Evolutionary(
+        func=lambda x: numpy.sum(x**2),
+        lower=numpy.full(3, -5.12),
+        upper=numpy.full(3, 5.12),
+        popsize=10,
+        max_iter=1000,
+        eps1=0.0,
+        eps2=-numpy.inf,
+        stopping=Stagnation(1000) | Target(1.0e-2),
+        random_state=42,
+    )
+    _, gfit = ea.optimize(solver=solver)
+
+    assert ea.n_iter < 1000
+    assert gfit <= 1.0e-2
+    assert ea.flag == "stopping criterion is met: fitness is lower than target 0.01"
+
+
+def test_stagnation():
+    ea = Evolutionary(
+        func=lambda x: 1.0,
+        n_dim=2,
+        popsize=10,
+        max_iter=1000,
+        eps2=-numpy.inf,
+        stopping=[Stagnation(20)],
+    )
+    ea.optimize(solver="de")
+
+    assert ea.n_iter == 22  # Initial population at iteration 1 is not tested
+    assert ea.flag.startswith("stopping criterion is met: best fitness decreases")
+
+
+@pytest.mark.parametrize("restart", ["ipop", "bipop"])
+def test_restart(restart):
+    def optimize(stopping):
+        ea = Evolutionary(
+            func=lambda x: numpy.sum(x**2),
+            lower=numpy.full(3, -5.12),
+            upper=numpy.full(3, 5.12),
+            popsize=10,
+            max_iter=1000,
+            max_eval=3000,
+            eps1=0.0,
+            eps2=-numpy.inf,
+            stopping=stopping,
+            random_state=42,
+        )
+        _, gfit = ea.optimize(solver="cmaes", restart=restart)
+        return ea, gfit
+
+    # Target ends the optimization
+    ea, gfit = optimize(Stagnation(1000) | Target(1.0))
+    assert ea.n_restart == 0
+    assert ea.n_eval < 3000
+    assert gfit <= 1.0
+    assert ea.flag == "stopping criterion is met: fitness is lower than target 1"
+
+    # Stagnation restarts the solver
+    ea, _ = optimize(Stagnation(5))
+    assert ea.n_restart > 0
+    assert ea.flag == "maximum number of function evaluations is reached"
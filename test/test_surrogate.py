@@ -0,0 +1,35 @@
+import numpy
+import pytest
+
+from stochopy import Evolutionary, RBFSurrogate, GaussianProcessSurrogate
+
+
+@pytest.mark.parametrize("surrogate", [RBFSurrogate, GaussianProcessSurrogate])
+def test_surrogate_predict(surrogate):
+    numpy.random.seed(42)
+    X = numpy.random.uniform(-1.0, 1.0, (50, 2))
+    y = numpy.sum(X**2, axis=1)
+    sur = surrogate()
+    sur.update(X, y)
+    Xtest = numpy.random.uniform(-0.5, 0.5, (20, 2))
+
+    assert sur.ready()
+    assert numpy.allclose(sur.predict(Xtest), numpy.sum(Xtest**2, axis=1), atol=0.05)
+
+
+@pytest.mark.parametrize("solver", ["de", "cpso", "cmaes"])
+def test_surrogate_evolutionary(solver):
+    ea = Evolutionary(
+        func=lambda x: numpy.sum(x**2),
+        lower=numpy.full(3, -5.12),
+        upper=numpy.full(3, 5.12),
+        popsize=10,
+        max_iter=50,
+        surrogate="rbf",
+        random_state=42,
+    )
+    _, gfit = ea.optimize(solver=solver)
+
+    assert ea.surrogate.n_skip > 0
+    assert ea.n_eval + ea.surrogate.n_skip == ea.n_iter * ea.popsize
+    assert gfit < 1e-2
@@ -0,0 +1,38 @@
+import pytest
+
+from stochopy import Evolutionary, TaskFarm
+
+
+def test_task_farm_invalid():
+    with pytest.raises(ValueError):
+        TaskFarm("guided")
+    with pytest.raises(ValueError):
+        TaskFarm(chunksize=0)
+    with pytest.raises(ValueError):
+        TaskFarm(group_size=0)
+
+
+@pytest.mark.parametrize("mpi", [True, TaskFarm("static"), TaskFarm(), TaskFarm(chunksize=4)])
+def test_task_farm_evolutionary(mpi, run_serial_vs):
+    pytest.importorskip("mpi4py")
+
+    ea = run_serial_vs({"mpi": mpi})
+    farm = ea.task_farm
+    assert farm.n_tasks.sum() == ea.n_eval
+    assert farm.busy.sum() > 0.0
+    assert 0.0 < farm.efficiency <= 1.0
+
+
+def test_task_farm_group(rosenbrock, run_serial_vs):
+    MPI = pytest.importorskip("mpi4py.MPI")
+
+    def fgroup(x, comm):
+        return comm.allreduce(rosenbrock(x) / comm.Get_size())
+
+    ea = run_serial_vs({"func": fgroup, "mpi": TaskFarm(group_size=1)})
+    assert ea.task_farm.group_comm.Get_size() == 1
+
+    group_size = MPI.COMM_WORLD.Get_size() + 1
+    ea = Evolutionary(rosenbrock, n_dim=2, mpi=TaskFarm(group_size=group_size))
+    with pytest.raises(ValueError):
+        ea.optimize(solver="cmaes")